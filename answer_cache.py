@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Birbirine çok benzeyen sorular için anlamsal yanıt önbelleği.
+
+Trafiğin çoğu aynı birkaç yüz sorunun farklı ifadeleridir ("TBMM ne zaman
+kuruldu?", "TBMM'nin kuruluş tarihi nedir?"). Önbellek, yeni sorunun
+embedding'ini önbellekteki soruların embedding'leriyle karşılaştırır. Benzerlik
+eşiği aşılsa bile yanıt ancak aramada bulunan chunk'lar (kanıt) da aynıysa
+kullanılır. Böylece yanıt, dayandığı belgelerden hiçbir zaman kopmaz.
+
+Girdiler LRU sırasıyla tutulur; `max_entries` aşılınca en eskisi çıkar,
+`ttl_seconds`ten eski girdiler aramada atılır.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain.schema import Document
+
+from embedding_cache import normalize_query
+from hybrid_fusion import chunk_key
+
+DEFAULT_ANSWER_CACHE_SIZE = 512
+DEFAULT_SIMILARITY_THRESHOLD = 0.92  # Kosinüs benzerliği
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+
+def evidence_key(documents: Iterable[Document]) -> Tuple[str, ...]:
+    """Yanıtın dayandığı chunk'lar; prompt sayfa sırasıyla kurulduğu için sırasız"""
+    return tuple(sorted(chunk_key(doc) for doc in documents))
+
+
+class SemanticAnswerCache:
+    """
+    Soru embedding'i + kanıt chunk'larıyla aranan, bellek içi LRU/TTL yanıt önbelleği.
+
+    Soru vektörleri önceden ayrılmış bir matriste, girdi başına bir satırda
+    durur; arama tek bir matris-vektör çarpımıdır.
+
+    Args:
+        max_entries: Tutulacak en fazla yanıt.
+        threshold: İsabet için en düşük kosinüs benzerliği.
+        ttl_seconds: Girdinin geçerlilik süresi (None: süresiz).
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_ANSWER_CACHE_SIZE,
+                 threshold: float = DEFAULT_SIMILARITY_THRESHOLD,
+                 ttl_seconds: Optional[float] = DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        # satır -> (soru, kanıt, yanıt, eklenme zamanı); LRU sırasında
+        self.entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._vectors = None  # (max_entries, boyut) normalize soru vektörleri
+        self._free_rows = []  # Boş matris satırları
+        self.hits = 0
+        self.misses = 0
+        self.evidence_mismatches = 0  # Benzer soru bulunup kanıtı farklı olan aramalar
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def lookup(self, question_vector: Sequence[float], evidence: Tuple[str, ...]) -> Optional[str]:
+        """
+        Benzer ve aynı kanıta dayanan önbellekteki yanıt; yoksa None.
+
+        Eşiği aşan adaylar benzerliğe göre azalan sırada denenir; ilk kanıtı
+        eşleşen kullanılır.
+        """
+        query = _unit(question_vector)
+        with self._lock:
+            self._expire()
+            if not self.entries:
+                self.misses += 1
+                return None
+            rows = np.fromiter(self.entries.keys(), dtype=np.int64, count=len(self.entries))
+            similarities = self._vectors[rows] @ query
+            similar = False
+            for i in np.argsort(-similarities, kind="stable"):
+                if similarities[i] < self.threshold:
+                    break
+                similar = True
+                row = int(rows[i])
+                _, cached_evidence, answer, _ = self.entries[row]
+                if cached_evidence == evidence:
+                    self.entries.move_to_end(row)
+                    self.hits += 1
+                    return answer
+            self.misses += 1
+            if similar:
+                self.evidence_mismatches += 1
+            return None
+
+    def put(self, question: str, question_vector: Sequence[float], evidence: Tuple[str, ...], answer: str):
+        """
+        Yanıtı ekler; aynı (normalize) soru ve kanıt zaten varsa o satırın yerine
+        yazar. Önbellek doluysa en uzun süredir kullanılmayan çıkar.
+        """
+        if self.max_entries <= 0:
+            return
+        vector = _unit(question_vector)
+        key = normalize_query(question)
+        with self._lock:
+            if self._vectors is None or self._vectors.shape[1] != len(vector):
+                self._vectors = np.zeros((self.max_entries, len(vector)), dtype=np.float32)
+                self.entries.clear()
+                self._free_rows = list(range(self.max_entries - 1, -1, -1))
+            row = next((row for row, (cached_question, cached_evidence, _, _) in self.entries.items()
+                        if cached_evidence == evidence and normalize_query(cached_question) == key), None)
+            if row is not None:
+                # Eşzamanlı aynı istekler tek girdi bırakır; kopyalar önbelleği doldurmaz
+                del self.entries[row]
+            elif self._free_rows:
+                row = self._free_rows.pop()
+            else:
+                row, _ = self.entries.popitem(last=False)
+                self.evictions += 1
+            self._vectors[row] = vector
+            self.entries[row] = (question, evidence, answer, time.monotonic())
+
+    def clear(self):
+        with self._lock:
+            self._free_rows.extend(self.entries)
+            self.entries.clear()
+
+    def _expire(self):
+        """Süresi dolan girdileri atar (kilit altında çağrılır)"""
+        if not self.ttl_seconds:
+            return
+        now = time.monotonic()
+        expired = [row for row, entry in self.entries.items() if now - entry[3] > self.ttl_seconds]
+        for row in expired:
+            del self.entries[row]
+        self._free_rows.extend(expired)
+        self.evictions += len(expired)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evidence_mismatches": self.evidence_mismatches,
+            "evictions": self.evictions,
+        }
+
+
+def _unit(vector: Sequence[float]) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    return vector / max(float(np.linalg.norm(vector)), 1e-12)
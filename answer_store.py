@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Yeniden başlatmalarda kaybolmayan, birebir eşleşmeli yanıt deposu (SQLite).
+
+Anahtar; normalize edilmiş soru, aramada bulunan chunk id'leri (sırasıyla),
+LLM modeli ve prompt şablonunun hash'inden üretilen tek bir SHA-256'dır.
+Bunlardan biri değişen yanıt ayrı bir girdidir; bu yüzden eski kanıta, başka
+bir modele veya eski şablona ait yanıt hiçbir zaman dönmez. Arama birincil
+anahtar üzerinden tek bir SELECT'tir.
+
+Eski girdiler arka plan thread'inde, `compact_interval` saniyede bir silinir
+(yaş ve girdi sayısı sınırı). Yeniden indekslemeden sonra artık indekste
+olmayan chunk'lara dayanan girdiler `invalidate` ile atılır.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Container, Optional, Sequence
+
+from embedding_cache import normalize_query
+
+DEFAULT_MAX_AGE_SECONDS = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 100_000
+DEFAULT_COMPACT_INTERVAL = 3600
+
+
+def template_hash(template_text: str) -> str:
+    """Prompt şablonunun kısa hash'i"""
+    return hashlib.sha256(template_text.encode("utf-8")).hexdigest()[:16]
+
+
+class AnswerStore:
+    """
+    SQLite tabanlı kalıcı yanıt deposu.
+
+    Tek bağlantı thread'ler arasında bir kilitle paylaşılır; WAL kipinde
+    okuma ve yazma birbirini uzun süre bekletmez.
+
+    Args:
+        path: SQLite dosyası.
+        max_entries: Sıkıştırmada tutulacak en fazla yanıt (en yeniler kalır).
+        max_age_seconds: Bundan eski yanıtlar sıkıştırmada silinir (None: sınırsız).
+        compact_interval: Arka plan sıkıştırma aralığı, saniye (0: kapalı).
+    """
+
+    def __init__(self, path: str, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_age_seconds: Optional[float] = DEFAULT_MAX_AGE_SECONDS,
+                 compact_interval: float = DEFAULT_COMPACT_INTERVAL):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_age_seconds = max_age_seconds
+        self.hits = 0
+        self.misses = 0
+        self.compacted = 0  # Sıkıştırma ve geçersiz kılmada silinen toplam girdi
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.execute("""
+            CREATE TABLE IF NOT EXISTS answers (
+                key TEXT PRIMARY KEY,
+                question TEXT NOT NULL,
+                chunk_ids TEXT NOT NULL,
+                model TEXT NOT NULL,
+                template_hash TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                created_at REAL NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self._connection.execute("CREATE INDEX IF NOT EXISTS answers_created_at ON answers (created_at)")
+
+        self._stop = threading.Event()
+        self._compactor = None
+        if compact_interval:
+            self._compactor = threading.Thread(
+                target=self._compact_loop, args=(compact_interval,), name="answer-store-compactor", daemon=True
+            )
+            self._compactor.start()
+
+    @staticmethod
+    def key(question: str, chunk_ids: Sequence[str], model: str, prompt_hash: str) -> str:
+        """Normalize soru, sıralı chunk id'leri, model ve şablon hash'inden anahtar"""
+        payload = json.dumps([normalize_query(question), list(chunk_ids), model, prompt_hash], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, question: str, chunk_ids: Sequence[str], model: str, prompt_hash: str) -> Optional[str]:
+        """Birebir eşleşen yanıt; yoksa None"""
+        key = self.key(question, chunk_ids, model, prompt_hash)
+        with self._lock:
+            row = self._connection.execute("SELECT answer FROM answers WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, question: str, chunk_ids: Sequence[str], model: str, prompt_hash: str, answer: str):
+        """Yanıtı kaydeder (aynı anahtar varsa üzerine yazar)"""
+        key = self.key(question, chunk_ids, model, prompt_hash)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, question, json.dumps(list(chunk_ids)), model, prompt_hash, answer, time.time()),
+            )
+
+    def compact(self) -> int:
+        """Yaşı veya sayı sınırını aşan en eski girdileri siler; silinen sayısını döndürür"""
+        with self._lock:
+            removed = 0
+            if self.max_age_seconds:
+                cursor = self._connection.execute(
+                    "DELETE FROM answers WHERE created_at < ?", (time.time() - self.max_age_seconds,)
+                )
+                removed += cursor.rowcount
+            cursor = self._connection.execute(
+                "DELETE FROM answers WHERE key IN "
+                "(SELECT key FROM answers ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            removed += cursor.rowcount
+            if removed:
+                self._connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.compacted += removed
+            return removed
+
+    def invalidate(self, live_chunk_ids: Optional[Container[str]] = None) -> int:
+        """
+        Yanıtları geçersiz kılar.
+
+        Args:
+            live_chunk_ids: Güncel indeksteki chunk id'leri; verilirse sadece
+                bunların dışındaki bir chunk'a dayanan yanıtlar silinir, None
+                ise tüm yanıtlar. Chunk id'si olmayan dokümanların "sha1:"
+                içerik anahtarları indekste aranmaz; bu anahtarlar içerik
+                değişince zaten eşleşmez.
+
+        Returns:
+            Silinen yanıt sayısı.
+        """
+        with self._lock:
+            if live_chunk_ids is None:
+                removed = self._connection.execute("DELETE FROM answers").rowcount
+            else:
+                rows = self._connection.execute("SELECT key, chunk_ids FROM answers").fetchall()
+                stale = [(key,) for key, chunk_ids in rows
+                         if not all(chunk_id in live_chunk_ids or chunk_id.startswith("sha1:")
+                                    for chunk_id in json.loads(chunk_ids))]
+                self._connection.execute("BEGIN")
+                self._connection.executemany("DELETE FROM answers WHERE key = ?", stale)
+                self._connection.execute("COMMIT")
+                removed = len(stale)
+            self.compacted += removed
+            return removed
+
+    def _compact_loop(self, interval: float):
+        while not self._stop.wait(interval):
+            try:
+                removed = self.compact()
+            except sqlite3.Error as e:
+                print(f"⚠️ Yanıt deposu sıkıştırılamadı: {e}")
+                continue
+            if removed:
+                print(f"🧹 Yanıt deposundan {removed} eski yanıt silindi")
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "compacted": self.compacted,
+        }
+
+    def close(self):
+        self._stop.set()
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+LLM bağlamını token bütçesiyle kuran aşama.
+
+`chunk_overlap` yüzünden aynı sayfadaki ardışık chunk'lar metin tekrar eder;
+hepsi olduğu gibi prompt'a konunca Ollama aynı metni her istekte yeniden
+işler (prefill). Burada:
+
+- aynı sayfanın ardışık (`chunk_index`) veya metni örtüşen chunk'ları tek
+  bloğa birleştirilir, tekrar eden kısım bir kez yazılır,
+- başka bir chunk'ın içinde kalan chunk atılır,
+- chunk'lar alaka sırasıyla, birleştirilmiş bağlam bütçeyi aşmadığı sürece
+  eklenir.
+
+Token sayısı tahminidir (karakter / CHARS_PER_TOKEN); Ollama modelinin
+tokenizer'ı bağımlılıklar arasında yok.
+"""
+
+import math
+from typing import Callable, List, Optional, Sequence
+
+from langchain.schema import Document
+
+CHARS_PER_TOKEN = 3.5  # Türkçe metinde BPE token başına ortalama karakter
+MIN_OVERLAP_CHARS = 10  # Daha kısa ortak kısım tesadüfi sayılır
+
+
+def estimate_tokens(text: str) -> int:
+    """Metnin yaklaşık token sayısı"""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _overlap(left: str, right: str) -> int:
+    """`left`in sonuyla `right`ın başının ortak olduğu en uzun kısmın uzunluğu"""
+    for length in range(min(len(left), len(right)), 0, -1):
+        if left.endswith(right[:length]):
+            return length
+    return 0
+
+
+def _page(doc: Document):
+    return doc.metadata.get("page", 0)
+
+
+class PackedContext:
+    """Kurulan bağlam metni, blokları ve token özeti"""
+
+    def __init__(self, text: str, blocks: List[Document], stats: dict):
+        self.text = text
+        self.blocks = blocks
+        self.stats = stats
+
+
+def format_block(doc: Document) -> str:
+    return f"Sayfa {doc.metadata.get('page', '?')}: {doc.page_content}"
+
+
+def merge_chunks(documents: Sequence[Document]) -> List[Document]:
+    """
+    Aynı kaynak ve sayfadaki ardışık veya örtüşen chunk'ları bloklara birleştirir.
+
+    Returns:
+        Sayfa, kaynak ve sayfa içi sıraya göre bloklar; her bloğun metadata'sı ilk
+        chunk'ınkidir, "merged_chunk_ids" birleşen chunk'ları listeler.
+    """
+    ordered = sorted(
+        enumerate(documents),
+        key=lambda item: (_page(item[1]), str(item[1].metadata.get("source", "")),
+                          item[1].metadata.get("chunk_index", item[0]), item[0])
+    )
+    blocks: List[Document] = []
+    last_key = last_index = None
+    for _, doc in ordered:
+        key = (str(doc.metadata.get("source", "")), _page(doc))
+        index = doc.metadata.get("chunk_index")
+        text = doc.page_content
+        if blocks and key == last_key:
+            block = blocks[-1]
+            merged_ids = block.metadata["merged_chunk_ids"]
+            if text in block.page_content:
+                # Tamamı zaten blokta
+                merged_ids.append(doc.metadata.get("chunk_id"))
+                last_index = index if index is not None else last_index
+                continue
+            overlap = _overlap(block.page_content, text)
+            if overlap < MIN_OVERLAP_CHARS:
+                # Kısa ortak kısım tesadüfidir ("ve Ankara" + "ayrıca"); kesilirse kelimeler yapışır
+                overlap = 0
+            adjacent = index is not None and last_index is not None and index == last_index + 1
+            if overlap or adjacent:
+                separator = "" if overlap else " "
+                block.page_content = block.page_content + separator + text[overlap:]
+                merged_ids.append(doc.metadata.get("chunk_id"))
+                last_index = index
+                continue
+        metadata = dict(doc.metadata)
+        metadata["merged_chunk_ids"] = [doc.metadata.get("chunk_id")]
+        blocks.append(Document(page_content=text, metadata=metadata))
+        last_key, last_index = key, index
+    return blocks
+
+
+def pack_context(documents: Sequence[Document], token_budget: Optional[int] = None,
+                 count_tokens: Callable[[str], int] = estimate_tokens) -> PackedContext:
+    """
+    Chunk'ları alaka sırasıyla birleştirilmiş bağlama ekler.
+
+    Args:
+        documents: Alaka sırasıyla (en alakalı önce) chunk'lar.
+        token_budget: Bağlamın en fazla token'ı (None: sınırsız). En alakalı
+            chunk bütçeyi tek başına aşsa bile bağlama girer.
+        count_tokens: Token sayacı.
+
+    Returns:
+        Sayfa sırasıyla bloklardan kurulan bağlam ve özet: birleştirmeden
+        önceki/sonraki token sayısı, tasarruf, birleşen ve bütçeye sığmayan
+        chunk sayısı.
+    """
+    def render(blocks: List[Document]) -> str:
+        return "\n\n".join(format_block(block) for block in blocks)
+
+    selected: List[Document] = []
+    blocks: List[Document] = []
+    dropped = 0
+    for doc in documents:
+        candidate = merge_chunks(selected + [doc])
+        if selected and token_budget is not None and count_tokens(render(candidate)) > token_budget:
+            dropped += 1
+            continue
+        selected.append(doc)
+        blocks = candidate
+
+    text = render(blocks)
+    tokens_before = count_tokens(render(list(documents)))
+    tokens_after = count_tokens(text)
+    return PackedContext(text, blocks, {
+        "chunks": len(documents),
+        "blocks": len(blocks),
+        "merged_chunks": len(selected) - len(blocks),
+        "dropped_chunks": dropped,
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": tokens_before - tokens_after,
+    })
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Bir klasördeki ilgili tarihi PDF'leri (nutuklar, belgeler, ekler) aynı hibrit
+indekse ekleyen corpus ingestion yardımcıları.
+
+PDF'ler süreç havuzunda paralel olarak okunup parçalanır; embedding ve
+indeks güncellemesi ana süreçte yapılır. Her belgenin durumu manifest'te
+tutulduğu için yeni bir dosya eklendiğinde diğerlerine dokunulmaz.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from index_manifest import assign_chunk_ids
+from page_text_store import PageTextStore, file_sha256
+from parallel_pdf_loader import extract_pages
+
+
+def discover_pdfs(directory: str) -> List[str]:
+    """Klasördeki (alt klasörler dahil) tüm PDF dosyalarını sıralı olarak bulur"""
+    pdf_paths = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(".pdf"):
+                pdf_paths.append(os.path.join(root, name))
+    return sorted(pdf_paths)
+
+
+def source_id_for(pdf_path: str, directory: str) -> str:
+    """Belgenin corpus içindeki kimliği: uzantısız göreli yol (ör. 'ekler/vesika_12')"""
+    relative = os.path.relpath(pdf_path, directory)
+    return os.path.splitext(relative)[0].replace(os.sep, "/")
+
+
+def process_document(pdf_path: str, source_id: str, splitter_kwargs: Dict,
+                     page_store_dir: Optional[str] = None) -> Tuple[str, List[Document]]:
+    """
+    Süreç havuzunda çalışan iş: bir PDF'i okur, parçalar ve chunk'ları etiketler.
+
+    Args:
+        page_store_dir: Verilirse sayfa metinleri bu depodan okunur/yazılır.
+
+    Returns:
+        (source_id, chunk listesi)
+    """
+    if page_store_dir:
+        pages = PageTextStore(page_store_dir).get_pages(
+            pdf_path, lambda: extract_pages(pdf_path, 0, None)
+        )
+    else:
+        pages = extract_pages(pdf_path, 0, None)
+    text_splitter = RecursiveCharacterTextSplitter(**splitter_kwargs)
+    chunks = text_splitter.split_documents(pages)
+    for chunk in chunks:
+        chunk.metadata["source_id"] = source_id
+    return source_id, assign_chunk_ids(chunks)
+
+
+def plan_corpus(directory: str, documents: Dict[str, dict], settings: Dict,
+                exclude: Iterable[str] = ()) -> Tuple[List[dict], List[str]]:
+    """
+    Hangi belgelerin işlenmesi, hangilerinin indeksten çıkarılması gerektiğini belirler.
+
+    Args:
+        directory: Corpus klasörü.
+        documents: Manifest'teki belge durumları (source_id -> durum).
+        settings: Belgeyi indeksleyen ayarlar (model, chunk boyutu...).
+        exclude: Corpus'a alınmayacak PDF'ler (ör. `_rebuild_database`in
+            yönettiği ana PDF); klasörün içinde olsalar da atlanır.
+
+    Returns:
+        (işlenecek belgeler, silinecek source_id'ler); belge yolları mutlaktır.
+    """
+    excluded = {os.path.abspath(path) for path in exclude}
+    to_process = []
+    found = set()
+    for pdf_path in discover_pdfs(directory):
+        pdf_path = os.path.abspath(pdf_path)
+        if pdf_path in excluded:
+            continue
+        source_id = source_id_for(pdf_path, directory)
+        found.add(source_id)
+        sha256 = file_sha256(pdf_path)
+        status = documents.get(source_id)
+        if (status and status.get("status") == "indexed"
+                and status.get("sha256") == sha256
+                and status.get("settings") == settings):
+            continue
+        to_process.append({"source_id": source_id, "path": pdf_path, "sha256": sha256})
+
+    # Sadece bu klasörün altındaki belgeler silinmeye adaydır ("corpus2/" "corpus"un altında değildir)
+    directory_prefix = os.path.abspath(directory)
+    removed = [
+        source_id for source_id, status in documents.items()
+        if source_id not in found
+        and _is_within(os.path.abspath(status.get("path", "")), directory_prefix)
+    ]
+    return to_process, removed
+
+
+def _is_within(path: str, directory: str) -> bool:
+    return os.path.commonpath([directory, path]) == directory
+
+
+def run_corpus_workers(jobs: List[dict], splitter_kwargs: Dict, workers: Optional[int] = None,
+                       page_store_dir: Optional[str] = None):
+    """
+    Belgeleri süreç havuzunda paralel işler.
+
+    Yields:
+        Her belge bittikçe (job, chunk listesi, hata mesajı veya None).
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(process_document, job["path"], job["source_id"],
+                            splitter_kwargs, page_store_dir): job
+            for job in jobs
+        }
+        for future in as_completed(futures):
+            job = futures[future]
+            try:
+                _, chunks = future.result()
+                yield job, chunks, None
+            except Exception as e:
+                yield job, [], str(e)
+
+
+if __name__ == "__main__":
+    import sys
+    from improved_rag_system import ImprovedNutukRAGSystem
+
+    if len(sys.argv) < 2:
+        print("Kullanım: python corpus_ingest.py <pdf_klasörü> [işçi_sayısı]")
+        sys.exit(1)
+
+    rag = ImprovedNutukRAGSystem()
+    rag.ingest_corpus(sys.argv[1], workers=int(sys.argv[2]) if len(sys.argv) > 2 else None)
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Chunk metni hash'ine göre adreslenen kalıcı embedding önbelleği.
+
+Vektörler model başına bir klasörde, bellek eşlemeli (memory-mapped) bir
+float32 matriste tutulur; hangi satırın hangi metne ait olduğu ayrı bir
+indeks dosyasında saklanır. Böylece chunk boyutu denemeleri veya farklı
+ChromaDB dizinleri aynı metinler için sentence-transformer'ı tekrar
+çalıştırmaz.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+DEFAULT_CACHE_DIR = "embedding_cache"
+DEFAULT_MAX_ENTRIES = 200_000
+DEFAULT_QUERY_CACHE_SIZE = 1024
+DEFAULT_FLUSH_INTERVAL = 4096  # Kaç yeni vektörde bir indeks dosyası yazılır
+
+
+def normalize_text(text: str) -> str:
+    """Önbellek anahtarı için metni normalize eder (Unicode NFC + kenar boşlukları)"""
+    return unicodedata.normalize("NFC", text).strip()
+
+
+def normalize_query(text: str) -> str:
+    """Sorgu önbelleği anahtarı: normalize edilmiş metin, boşluklar tek boşluğa indirgenir"""
+    return " ".join(normalize_text(text).split())
+
+
+def text_key(text: str) -> str:
+    """Normalize edilmiş metnin hash'i"""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Tek bir embedding modeli için disk tabanlı vektör önbelleği.
+
+    Args:
+        model_name: Embedding modelinin adı (anahtarın bir parçası).
+        cache_dir: Tüm modellerin önbelleklerinin bulunduğu kök dizin.
+        max_entries: Saklanacak en fazla vektör; aşılırsa en uzun süredir
+            kullanılmayanlar silinir.
+        flush_interval: `maybe_flush`un indeks dosyasını yazması için gereken
+            yeni vektör sayısı. Kullanım sırası (LRU) sadece bellekte güncellenir;
+            kalan değişiklikler süreç biterken yazılır.
+    """
+
+    def __init__(self, model_name: str, cache_dir: str = DEFAULT_CACHE_DIR,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, flush_interval: int = DEFAULT_FLUSH_INTERVAL):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        self.directory = os.path.join(cache_dir, re.sub(r"[^A-Za-z0-9_.-]", "_", model_name))
+        self.index_path = os.path.join(self.directory, "index.json")
+        self.matrix_path = os.path.join(self.directory, "vectors.f32")
+
+        self.hits = 0
+        self.misses = 0
+
+        self.dim = None
+        self.capacity = 0
+        self.clock = 0
+        self.entries = {}  # key -> [satır, son_kullanım]
+        self.free_rows = []
+        self.next_row = 0
+        self.matrix = None
+        self._dirty = False  # Eklenen/tahliye edilen girdi var, indeks dosyası eski
+        self._unsaved = 0  # Son yazımdan beri eklenen vektör
+        self._load()
+        atexit.register(self.flush)
+
+    def _load(self):
+        """İndeks dosyasını okur ve vektör matrisini bellek eşlemeli açar"""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("model_name") != self.model_name:
+            return
+        self.dim = data["dim"]
+        self.capacity = data["capacity"]
+        self.clock = data["clock"]
+        self.entries = data["entries"]
+        self.free_rows = data["free_rows"]
+        self.next_row = data["next_row"]
+        if self.capacity:
+            self.matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r+",
+                                    shape=(self.capacity, self.dim))
+
+    def _grow(self, needed_rows: int):
+        """Matris dosyasını en az needed_rows satır alacak şekilde büyütür"""
+        new_capacity = max(1024, self.capacity)
+        while new_capacity < needed_rows:
+            new_capacity *= 2
+        new_capacity = min(new_capacity, self.max_entries)
+        if new_capacity <= self.capacity:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        if self.matrix is not None:
+            self.matrix.flush()
+            self.matrix = None
+        with open(self.matrix_path, "ab") as f:
+            f.truncate(new_capacity * self.dim * 4)
+        self.capacity = new_capacity
+        self.matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r+",
+                                shape=(self.capacity, self.dim))
+
+    def _evict(self, count: int):
+        """En uzun süredir kullanılmayan count adet girdiyi siler"""
+        victims = sorted(self.entries.items(), key=lambda item: item[1][1])[:count]
+        for key, (row, _) in victims:
+            del self.entries[key]
+            self.free_rows.append(row)
+
+    def _allocate_row(self) -> int:
+        """Yeni bir vektör için satır ayırır (gerekirse büyütür veya tahliye eder)"""
+        if self.free_rows:
+            return self.free_rows.pop()
+        if self.next_row >= self.capacity:
+            self._grow(self.next_row + 1)
+        if self.next_row < self.capacity:
+            row = self.next_row
+            self.next_row += 1
+            return row
+        # Kapasite doldu: girdilerin ~%5'ini tahliye et. Boşalan satırlara yazmadan önce
+        # indeks kaydedilir; yoksa çökmede eski indeks bu satırları eski metinlere bağlar
+        self._evict(max(1, self.max_entries // 20))
+        self._dirty = True
+        self.flush()
+        return self.free_rows.pop()
+
+    def get(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Metinlerin önbellekteki vektörlerini döndürür.
+
+        Returns:
+            Her metin için vektör veya önbellekte yoksa None.
+        """
+        results = []
+        for text in texts:
+            entry = self.entries.get(text_key(text))
+            if entry is None:
+                self.misses += 1
+                results.append(None)
+                continue
+            self.hits += 1
+            self.clock += 1
+            entry[1] = self.clock  # Sadece bellekte; isabet indeks dosyasını kirletmez
+            results.append(self.matrix[entry[0]].tolist())
+        return results
+
+    def put(self, texts: List[str], vectors: List[List[float]]):
+        """Metinlerin vektörlerini önbelleğe yazar"""
+        for text, vector in zip(texts, vectors):
+            if self.dim is None:
+                self.dim = len(vector)
+            key = text_key(text)
+            entry = self.entries.get(key)
+            row = entry[0] if entry else self._allocate_row()
+            self.matrix[row] = vector
+            self.clock += 1
+            self.entries[key] = [row, self.clock]
+            self._dirty = True
+            self._unsaved += 1
+
+    def maybe_flush(self):
+        """`flush_interval` kadar yeni vektör biriktiyse diske yazar"""
+        if self._unsaved >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Matrisi ve indeks dosyasını diske yazar"""
+        if not self._dirty:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        if self.matrix is not None:
+            self.matrix.flush()
+        data = {
+            "model_name": self.model_name,
+            "dim": self.dim,
+            "capacity": self.capacity,
+            "clock": self.clock,
+            "next_row": self.next_row,
+            "free_rows": self.free_rows,
+            "entries": self.entries,
+        }
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
+        self._unsaved = 0
+
+    def stats(self) -> dict:
+        """Önbellek isabet/ıska sayaçlarını döndürür"""
+        lookups = self.hits + self.misses
+        return {
+            "model_name": self.model_name,
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class QueryEmbeddingCache:
+    """
+    Sorgu embedding'leri için bellek içi LRU önbellek.
+
+    Anahtar, embedding modeli adı ve normalize edilmiş sorgu metnidir. Her
+    girdi, vektörün hesaplanma süresini de tutar; isabetlerde bu süre
+    "kazanılan süre" olarak sayılır. `path` verilirse önbellek süreçler arası
+    korunur: `save` vektörleri .npy, anahtarları JSON olarak yazar (pickle yok).
+
+    Args:
+        model_name: Embedding modelinin adı.
+        max_entries: Bellekte tutulacak en fazla sorgu.
+        path: Kalıcı dosyaların ön eki (None: sadece bellekte).
+        save_interval: Kaç yeni girdide bir diske yazılacağı.
+    """
+
+    def __init__(self, model_name: str, max_entries: int = DEFAULT_QUERY_CACHE_SIZE,
+                 path: Optional[str] = None, save_interval: int = 16):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.path = path
+        self.save_interval = save_interval
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (vektör, hesaplama ms)
+        self.hits = 0
+        self.misses = 0
+        self.saved_ms = 0.0
+        self._unsaved = 0
+        self._lock = threading.Lock()  # Hibrit aramanın thread havuzundan eşzamanlı erişim
+        if path:
+            self._load()
+            atexit.register(self.save)
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{normalize_query(text)}".encode("utf-8")).hexdigest()
+
+    def _load(self):
+        """Kayıtlı önbelleği okur (model adı farklıysa yok sayar)"""
+        index_path, vectors_path = f"{self.path}.json", f"{self.path}.npy"
+        if not (os.path.exists(index_path) and os.path.exists(vectors_path)):
+            return
+        with open(index_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("model_name") != self.model_name:
+            return
+        vectors = np.load(vectors_path, allow_pickle=False)
+        for (key, elapsed_ms), vector in zip(data["entries"][-self.max_entries:],
+                                             vectors[-self.max_entries:]):
+            self.entries[key] = (vector.tolist(), elapsed_ms)
+
+    def save(self):
+        """Önbelleği diske yazar (en eski girdiden en yeniye)"""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._unsaved:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            entries = list(self.entries.items())
+            vectors = np.array([vector for _, (vector, _) in entries], dtype=np.float32)
+            with open(f"{self.path}.npy.tmp", "wb") as f:
+                np.save(f, vectors)
+            os.replace(f"{self.path}.npy.tmp", f"{self.path}.npy")
+            data = {"model_name": self.model_name,
+                    "entries": [[key, elapsed_ms] for key, (_, elapsed_ms) in entries]}
+            with open(f"{self.path}.json.tmp", "w", encoding="utf-8") as f:
+                json.dump(data, f)
+            os.replace(f"{self.path}.json.tmp", f"{self.path}.json")
+            self._unsaved = 0
+
+    def get(self, text: str) -> Optional[List[float]]:
+        """Sorgunun vektörü; yoksa None"""
+        key = self._key(text)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            self.saved_ms += entry[1]
+            return entry[0]
+
+    def put(self, text: str, vector: List[float], elapsed_ms: float):
+        """Yeni hesaplanan bir sorgu vektörünü ekler; gerekirse en eskisini çıkarır"""
+        if self.max_entries <= 0:
+            return
+        key = self._key(text)
+        with self._lock:
+            self.entries[key] = (list(vector), elapsed_ms)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self._unsaved += 1
+            due = self._unsaved >= self.save_interval
+        if due:
+            self.save()
+
+    def stats(self) -> dict:
+        """İsabet oranı ve önbellek sayesinde kazanılan süre"""
+        lookups = self.hits + self.misses
+        return {
+            "model_name": self.model_name,
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "saved_ms": round(self.saved_ms, 1),
+        }
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Herhangi bir LangChain Embeddings nesnesinin önüne önbellek koyan sarmalayıcı.
+
+    Doküman embedding'leri disk önbelleğine alınır. Sorgular, verilmişse
+    `query_cache` LRU önbelleğinden döner; yoksa doğrudan alttaki modele
+    iletilir.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache,
+                 query_cache: Optional[QueryEmbeddingCache] = None):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.query_cache = query_cache
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        vectors = self.cache.get(texts)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            computed = self.embeddings.embed_documents([texts[i] for i in missing])
+            self.cache.put([texts[i] for i in missing], computed)
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+        # Her batch'te tüm indeksi yeniden yazma; ingestion sonunda `cache.flush()` çağrılır
+        self.cache.maybe_flush()
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.query_cache is None:
+            return self.embeddings.embed_query(text)
+        vector = self.query_cache.get(text)
+        if vector is None:
+            start = time.perf_counter()
+            vector = self.embeddings.embed_query(text)
+            self.query_cache.put(text, vector, 1000 * (time.perf_counter() - start))
+        return vector
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        Birden fazla sorguyu tek bir batch'te embed eder (doküman önbelleğine
+        yazılmaz; sorgu önbelleğindekiler tekrar hesaplanmaz).
+
+        HuggingFaceEmbeddings sorgu ve dokümanları aynı ayarlarla kodladığı
+        için sonuç her sorgu için `embed_query` ile aynıdır.
+        """
+        if self.query_cache is None:
+            return self.embeddings.embed_documents(list(texts)) if texts else []
+        vectors = [self.query_cache.get(text) for text in texts]
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            start = time.perf_counter()
+            computed = self.embeddings.embed_documents([texts[i] for i in missing])
+            elapsed_ms = 1000 * (time.perf_counter() - start) / len(missing)
+            for i, vector in zip(missing, computed):
+                vectors[i] = vector
+                self.query_cache.put(texts[i], vector, elapsed_ms)
+        return vectors
+
+
+def with_embedding_cache(embeddings: Embeddings, model_name: Optional[str] = None,
+                         cache_dir: str = DEFAULT_CACHE_DIR,
+                         max_entries: int = DEFAULT_MAX_ENTRIES,
+                         query_cache_size: int = 0,
+                         query_cache_path: Optional[str] = None) -> CachedEmbeddings:
+    """
+    Embedding modelini paylaşılan disk önbelleğiyle sarar.
+
+    Args:
+        embeddings: Sarılacak embedding modeli.
+        model_name: Önbellek anahtarı için model adı (varsayılan: embeddings.model_name).
+        cache_dir: Önbellek kök dizini.
+        max_entries: Model başına en fazla vektör sayısı.
+        query_cache_size: Sorgu LRU önbelleğinin boyutu (0: kapalı).
+        query_cache_path: Sorgu önbelleğinin kalıcı dosya öneki (None: sadece bellekte).
+    """
+    model_name = model_name or getattr(embeddings, "model_name", type(embeddings).__name__)
+    query_cache = None
+    if query_cache_size > 0:
+        query_cache = QueryEmbeddingCache(model_name, query_cache_size, query_cache_path)
+    return CachedEmbeddings(embeddings, EmbeddingCache(model_name, cache_dir, max_entries), query_cache)
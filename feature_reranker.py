@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Aday × özellik matrisi üzerinde vektörel yeniden sıralama.
+
+Her aday için özellikler Python döngüsüyle tek tek değil, indeksten toplu
+olarak okunur: terim örtüşmesi ileri indeksin (chunk başına sıralı terim
+id'leri) seyrek vektörlerinden, uzunluk hazır `char_len` dizisinden, ifade
+eşleşmesi pozisyonel indeksten gelir. Skor `özellikler @ ağırlıklar`,
+sıralama kararlı `argsort`tur; varsayılan ağırlıklar, tam ifadeyi pozisyonel
+indeksle arayan doküman başına döngüyle aynı sırayı verir.
+"""
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from langchain.schema import Document
+
+from turkish_tokenizer import tokenize, tokenize_query, tokenize_raw
+
+FEATURES = ("exact_match", "term_overlap", "short_text")
+# Tam ifade +10, örtüşen her sorgu terimi +2, kısa metin -2
+DEFAULT_WEIGHTS = (10.0, 2.0, -2.0)
+SHORT_TEXT_CHARS = 50
+
+
+def contains_phrase(tokens: Sequence[str], phrase: Sequence[str]) -> bool:
+    """`phrase` token'ları `tokens` içinde ardışık geçiyor mu (pozisyonel indeksin `phrase`ı ile aynı kural)"""
+    length = len(phrase)
+    if not length:
+        return False
+    first = phrase[0]
+    return any(tokens[i] == first and list(tokens[i:i + length]) == list(phrase)
+               for i in range(len(tokens) - length + 1))
+
+
+def feature_matrix(query: str, documents: Sequence[Document], keyword_index,
+                   positional_index) -> np.ndarray:
+    """
+    Adayların (aday sayısı, len(FEATURES)) özellik matrisi.
+
+    İndeksteki chunk'lar için metne bakılmaz. İndekste olmayan (chunk id'si
+    bilinmeyen) dokümanların özellikleri metinden, indekstekilerle aynı
+    kurallarla hesaplanır: tam ifade `tokenize_raw` token'larında ardışık
+    geçiş olarak aranır (alt dize taraması "çıktı"yı "çıktım"da bulurdu).
+    """
+    features = np.zeros((len(documents), len(FEATURES)), dtype=np.float64)
+    if not len(documents):
+        return features
+    # chunk id'si olmayan dokümanlar için "" (indekste bulunmaz)
+    positions = keyword_index.positions([doc.metadata.get("chunk_id") or "" for doc in documents])
+
+    indexed = np.flatnonzero(positions >= 0)
+    if len(indexed):
+        query_ids = keyword_index.query_term_ids(tokenize_query(query))
+        # Pozisyonel indeks InvertedIndex ile aynı chunk sırasını kullanır
+        phrase_docs, _ = positional_index.phrase(tokenize_raw(query))
+        features[indexed, 0] = np.isin(positions[indexed], phrase_docs)
+        features[indexed, 1] = keyword_index.term_overlaps(positions[indexed], query_ids)
+        features[indexed, 2] = keyword_index.char_len[positions[indexed]] < SHORT_TEXT_CHARS
+
+    missing = np.flatnonzero(positions < 0)
+    if len(missing):
+        query_raw = tokenize_raw(query)
+        query_tokens = set(tokenize_query(query))
+        for i in missing:
+            text = documents[i].page_content
+            features[i] = (
+                contains_phrase(tokenize_raw(text), query_raw),
+                len(query_tokens.intersection(tokenize(text))),
+                len(text) < SHORT_TEXT_CHARS,
+            )
+    return features
+
+
+def rank(features: np.ndarray, weights: Sequence[float] = DEFAULT_WEIGHTS) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Özellik matrisini tek geçişte puanlayıp sıralar.
+
+    Returns:
+        (azalan skora göre aday sırası, skorlar); eşit skorlarda giriş sırası korunur.
+    """
+    scores = features @ np.asarray(weights, dtype=np.float64)
+    return np.argsort(-scores, kind="stable"), scores
+
+
+def rerank(query: str, documents: List[Document], keyword_index, positional_index,
+           weights: Sequence[float] = DEFAULT_WEIGHTS) -> List[Document]:
+    """Dokümanları özellik skoruna göre yeniden sıralar"""
+    order, _ = rank(feature_matrix(query, documents, keyword_index, positional_index), weights)
+    return [documents[i] for i in order]
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Süreç içi, düz (flat) NumPy vektör indeksi.
+
+Tek kitaplık bir corpus için birkaç bin 768 boyutlu vektörde tam (exact) arama,
+ChromaDB'nin HNSW, istemci ve serileştirme katmanlarından geçmeden yapılabilir.
+Bu indeks normalize edilmiş embedding matrisini bellekte float16 veya satır
+başına ölçekli int8 olarak tutar. Top-k, satır blokları üzerinde matris-vektör
+çarpımı ve `argpartition` ile bulunur; skor kosinüs benzerliğidir.
+"""
+
+from typing import List, Tuple
+
+import numpy as np
+
+PRECISIONS = ("float32", "float16", "int8")
+
+# Skorlama sırasında float32'ye çevrilen satır bloğu; işlemci önbelleğine sığacak kadar küçük
+BLOCK_ROWS = 256
+
+
+def _normalized(matrix: np.ndarray) -> np.ndarray:
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class FlatVectorIndex:
+    """
+    Normalize edilmiş vektörler üzerinde tam kosinüs araması.
+
+    Doğrudan oluşturulmaz; `build` kullanılır. Satır sırası, verilen matrisin
+    sırasıdır (ImprovedNutukRAGSystem'de keyword indeksi pozisyonları).
+    """
+
+    def __init__(self, vectors: np.ndarray, scales: np.ndarray, precision: str):
+        self.vectors = vectors
+        self.scales = scales  # int8 için satır başına ölçek, diğerlerinde None
+        self.precision = precision
+
+    @classmethod
+    def build(cls, matrix: np.ndarray, precision: str = "float16") -> "FlatVectorIndex":
+        """
+        Embedding matrisini normalize edip istenen hassasiyette saklar.
+
+        Args:
+            matrix: (chunk sayısı, boyut) embedding matrisi.
+            precision: "float32", "float16" veya "int8" (satır başına ölçekli).
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Bilinmeyen vektör hassasiyeti: {precision}")
+        vectors = _normalized(matrix)
+        if precision == "int8":
+            scales = np.abs(vectors).max(axis=1) / 127.0 if len(vectors) else np.zeros(0, dtype=np.float32)
+            scales = np.maximum(scales, 1e-12).astype(np.float32)
+            quantized = np.round(vectors / scales[:, None]).astype(np.int8)
+            return cls(quantized, scales, precision)
+        return cls(vectors.astype(precision), None, precision)
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def scores(self, queries: np.ndarray) -> np.ndarray:
+        """
+        Sorgu vektör(ler)inin tüm satırlarla kosinüs benzerliği.
+
+        Args:
+            queries: Tek sorgu (boyut,) veya sorgu matrisi (sorgu sayısı, boyut).
+
+        Returns:
+            (satır sayısı,) veya (satır sayısı, sorgu sayısı) skor dizisi;
+            birden fazla sorgu tek bir matris çarpımıyla puanlanır.
+        """
+        queries = _normalized(queries)
+        single = queries.ndim == 1
+        queries = np.atleast_2d(queries).T
+        scores = np.empty((len(self), queries.shape[1]), dtype=np.float32)
+        if self.precision == "float32":
+            np.matmul(self.vectors, queries, out=scores)
+        else:
+            buffer = np.empty((min(BLOCK_ROWS, len(self)), self.vectors.shape[1]), dtype=np.float32)
+            for start in range(0, len(self), BLOCK_ROWS):
+                block = buffer[:min(BLOCK_ROWS, len(self) - start)]
+                block[...] = self.vectors[start:start + len(block)]
+                np.matmul(block, queries, out=scores[start:start + len(block)])
+        if self.scales is not None:
+            scores *= self.scales[:, None]
+        return scores[:, 0] if single else scores
+
+    def search(self, query: np.ndarray, k: int) -> List[Tuple[int, float]]:
+        """En benzer k satır, (pozisyon, benzerlik) olarak azalan sırada"""
+        if k <= 0 or not len(self):
+            return []
+        return _top_k(self.scores(query), k)
+
+    def search_batch(self, queries: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+        """Her sorgu için `search` sonucu; tüm sorgular tek matris çarpımıyla puanlanır"""
+        if k <= 0 or not len(self) or not len(queries):
+            return [[] for _ in range(len(queries))]
+        scores = self.scores(np.asarray(queries, dtype=np.float32).reshape(len(queries), -1))
+        return [_top_k(scores[:, i], k) for i in range(scores.shape[1])]
+
+    def stats(self) -> dict:
+        return {
+            "vectors": len(self),
+            "dimension": int(self.vectors.shape[1]) if self.vectors.ndim == 2 else 0,
+            "precision": self.precision,
+            "bytes": int(self.vectors.nbytes + (self.scales.nbytes if self.scales is not None else 0)),
+        }
+
+
+def _top_k(scores: np.ndarray, k: int) -> List[Tuple[int, float]]:
+    """Skoru en yüksek k pozisyon; eşit skorlarda düşük pozisyon önce"""
+    if len(scores) > k:
+        # Eşit skorlarda kararlı olmak için k'ıncı skora eşit olanların hepsini al
+        kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+        candidates = np.flatnonzero(scores >= kth)
+    else:
+        candidates = np.arange(len(scores))
+    order = candidates[np.lexsort((candidates, -scores[candidates]))][:k]
+    return [(int(i), float(scores[i])) for i in order]
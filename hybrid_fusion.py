@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Hibrit aramanın bacaklarını (semantic, keyword, ifade) skorlarıyla birleştiren
+füzyon aşaması.
+
+Her bacak (doküman, skor) listesi verir. Sonuçlar chunk id'sine göre tek
+geçişte, bir sözlükle tekilleştirilir ve iki yöntemden biriyle birleştirilir:
+
+- "rrf": reciprocal rank fusion, sum(ağırlık / (rrf_k + sıra)); skor ölçeğinden
+  bağımsızdır.
+- "weighted": her bacağın skorları min-max ile [0, 1]'e çekilip ağırlıkla
+  toplanır.
+
+Füzyon skoru ile bacak skorları ve sıraları sonuçla birlikte döner.
+"""
+
+import hashlib
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from langchain.schema import Document
+
+FUSION_METHODS = ("rrf", "weighted")
+RRF_K = 60  # Cormack vd. (2009) ile aynı varsayılan
+
+
+def chunk_key(document: Document) -> str:
+    """Tekilleştirme anahtarı: chunk id'si, yoksa metnin hash'i"""
+    chunk_id = document.metadata.get("chunk_id")
+    if chunk_id:
+        return chunk_id
+    return "sha1:" + hashlib.sha1(document.page_content.encode("utf-8")).hexdigest()
+
+
+class FusedResult:
+    """Bir chunk'ın füzyon skoru ve bacak başına skoru/sırası"""
+
+    def __init__(self, document: Document, chunk_id: str):
+        self.document = document
+        self.chunk_id = chunk_id
+        self.score = 0.0
+        self.leg_scores: Dict[str, float] = {}
+        self.leg_ranks: Dict[str, int] = {}
+
+    def as_dict(self) -> dict:
+        """API yanıtları için skor özeti"""
+        return {
+            "chunk_id": self.chunk_id,
+            "score": round(self.score, 6),
+            "leg_scores": {leg: round(float(score), 6) for leg, score in self.leg_scores.items()},
+            "leg_ranks": dict(self.leg_ranks),
+        }
+
+    def __repr__(self):
+        return f"FusedResult(chunk_id={self.chunk_id!r}, score={self.score:.4f}, legs={self.leg_ranks})"
+
+
+def _min_max(scores: Sequence[float]) -> List[float]:
+    """Skorları [0, 1] aralığına çeker; hepsi eşitse hepsi 1 olur"""
+    if not scores:
+        return []
+    low, high = min(scores), max(scores)
+    if high == low:
+        return [1.0] * len(scores)
+    return [(score - low) / (high - low) for score in scores]
+
+
+def fuse(legs: Dict[str, Sequence[Tuple[Document, float]]], method: str = "rrf",
+         weights: Optional[Dict[str, float]] = None, rrf_k: int = RRF_K) -> List[FusedResult]:
+    """
+    Bacak sonuçlarını chunk id'sine göre tekilleştirip birleştirir.
+
+    Args:
+        legs: Bacak adı -> skora göre azalan (doküman, skor) listesi. Bacak
+            sırası, eşit füzyon skorlarında hangi sonucun önce geleceğini belirler.
+        method: "rrf" veya "weighted".
+        weights: Bacak başına ağırlık (verilmeyen bacaklar 1.0).
+        rrf_k: RRF sabiti.
+
+    Returns:
+        Füzyon skoruna göre azalan sonuçlar.
+    """
+    if method not in FUSION_METHODS:
+        raise ValueError(f"Bilinmeyen füzyon yöntemi: {method}")
+    weights = weights or {}
+    results: Dict[str, FusedResult] = {}
+    for leg, hits in legs.items():
+        weight = weights.get(leg, 1.0)
+        normalized = _min_max([score for _, score in hits]) if method == "weighted" else None
+        for rank, (document, score) in enumerate(hits, 1):
+            key = chunk_key(document)
+            result = results.get(key)
+            if result is None:
+                result = results[key] = FusedResult(document, key)
+            if leg in result.leg_ranks:
+                continue  # Aynı bacakta tekrar eden chunk: ilk (en iyi) sırası sayılır
+            result.leg_scores[leg] = score
+            result.leg_ranks[leg] = rank
+            if method == "rrf":
+                result.score += weight / (rrf_k + rank)
+            else:
+                result.score += weight * normalized[rank - 1]
+    # Kararlı sıralama: eşit skorlarda ilk görülen (önceki bacaktaki) sonuç önde kalır
+    return sorted(results.values(), key=lambda result: -result.score)
+
+
+def adaptive_k(scores: Sequence[float], min_k: int, max_k: int, max_drop: float) -> int:
+    """
+    Bağlama kaç sonucun gireceği: skorlar azalan sırada dizilir ve ardışık
+    iki skor arasındaki düşüş en yüksek skorun `max_drop` oranını aştığı ilk
+    yerde kesilir.
+
+    Args:
+        scores: Füzyon skorları.
+        min_k: En az sonuç (skorlar ne olursa olsun).
+        max_k: En fazla sonuç.
+        max_drop: En yüksek skora oranla izin verilen en büyük ardışık düşüş.
+    """
+    ranked = sorted(scores, reverse=True)[:max_k]
+    if not ranked:
+        return 0
+    top = ranked[0]
+    for i in range(max(min_k, 1), len(ranked)):
+        if top > 0 and (ranked[i - 1] - ranked[i]) / top > max_drop:
+            return i
+    return len(ranked)
@@ -8,53 +8,140 @@ from langchain.prompts import ChatPromptTemplate
 from langchain.schema import Document
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.document_loaders import PyPDFLoader
-from rank_bm25 import BM25Okapi
 import numpy as np
-import re
+import asyncio
+import json
 import sys
 import os
-from typing import List, Tuple
-import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Tuple
+from answer_cache import DEFAULT_ANSWER_CACHE_SIZE, SemanticAnswerCache, evidence_key
+from answer_store import AnswerStore, template_hash
+from context_packing import pack_context
+from corpus_ingest import discover_pdfs, plan_corpus, run_corpus_workers
+from embedding_cache import with_embedding_cache
+import feature_reranker
+from flat_vector_index import FlatVectorIndex
+from hybrid_fusion import FusedResult, adaptive_k, chunk_key, fuse
+from index_manifest import IndexManifest, assign_chunk_ids
+from index_snapshot import open_snapshot, write_snapshot
+from inverted_index import InvertedIndex
+from positional_index import PositionalIndex
+from trigram_index import TrigramIndex
+from turkish_stemmer import TurkishStemmer
+from page_text_store import PageTextStore
+from parallel_pdf_loader import load_and_split_parallel, print_progress
+from streaming_ingest import StreamingIngestor
+from turkish_tokenizer import tokenize, tokenize_batch, tokenize_query, tokenize_raw
+
+def _timed(function, *args):
+    """Fonksiyonu çalıştırır; (sonuç, süre ms) döndürür"""
+    start = time.perf_counter()
+    result = function(*args)
+    return result, 1000 * (time.perf_counter() - start)
+
+
+def _leg_timings(semantic_ms: float, keyword_ms: float, merge_ms: float, start: float) -> dict:
+    """Hibrit arama bacak süreleri; kritik yol daha uzun süren bacaktır"""
+    return {
+        "semantic_ms": round(semantic_ms, 2),
+        "keyword_ms": round(keyword_ms, 2),
+        "merge_ms": round(merge_ms, 2),
+        "total_ms": round(1000 * (time.perf_counter() - start), 2),
+        "critical_path": "semantic" if semantic_ms >= keyword_ms else "keyword",
+    }
+
 
 class ImprovedNutukRAGSystem:
     """İyileştirilmiş Nutuk belgeleri için RAG sistemi"""
     
-    def __init__(self, model_name="qwen2:latest", rebuild_db=False):
+    def __init__(self, model_name="qwen2:latest", rebuild_db=False,
+                 parallel_rebuild=False, rebuild_workers=None, progress_callback=None,
+                 streaming_rebuild=False, ingest_batch_size=64):
         """RAG sistemini başlatır"""
         print("🚀 İyileştirilmiş Nutuk RAG Sistemi başlatılıyor...")
         
         # Ayarlar
         self.chunk_size = 300  # Daha küçük chunk boyutu
         self.chunk_overlap = 50
+        self.separators = ["\n\n", "\n", ".", "!", "?", " ", ""]
+        self.parallel_rebuild = parallel_rebuild  # PDF'i süreç havuzunda işle
+        self.rebuild_workers = rebuild_workers  # None: CPU sayısı kadar
+        self.progress_callback = progress_callback or print_progress
+        self.streaming_rebuild = streaming_rebuild  # Sınırlı bellekli, devam ettirilebilir ingestion
+        self.ingest_batch_size = ingest_batch_size
+        self.pdf_path = "nutuk.pdf"  # Ana PDF; corpus ingestion bunu atlar
+        self.ingest_checkpoint_path = "ingest_checkpoint.json"
+        self.ingest_log_path = "ingest_tokens.jsonl"
         self.persist_directory = "improved_rag_chroma_db"
-        self.bm25_path = "bm25_index.pkl"
+        self.snapshot_path = "index_snapshot.bin"  # BM25, pozisyonel indeks ve embedding matrisi
+        self.keyword_search_mode = "block_max"  # "exhaustive": tüm posting'leri puanla
+        self.last_keyword_stats = {}  # Son keyword aramasında puanlanan/atlanan posting sayıları
+        self.phrase_candidates = 2  # Hibrit aramaya eklenecek ifade eşleşmesi sayısı
+        self.proximity_window = 10  # İfade bulunamazsa terimlerin yer alması gereken token aralığı
+        self.phrase_min_content_tokens = 2  # İfadede olması gereken stop-word olmayan, 2 harften uzun token
+        self.fuzzy_expansions = 3  # Sorgu token'ı başına trigram genişletmesi (0: kapalı)
+        self.fuzzy_min_similarity = 0.5  # Genişletme için en düşük trigram Dice benzerliği
+        self.fuzzy_weight = 0.5  # Genişletilen terimlerin skor çarpanı (benzerlikle çarpılır)
+        self.stemmed_field = False  # Keyword aramayı köklenmiş terimlerle yap
+        self.stemmer = TurkishStemmer()
+        self.stemmed_index = None
+        self.chunk_embeddings = None  # Keyword indeksi sırasıyla chunk embedding'leri (snapshot'tan)
+        self._embedding_ids = []
+        self.vector_backend = "chroma"  # "flat": snapshot'taki embedding matrisi üzerinde tam arama
+        self.flat_vector_precision = "float16"  # "float32", "float16" veya "int8"
+        self.flat_vector_index = None
+        self.manifest_path = "index_manifest.json"
+        self.page_store = PageTextStore("page_text_store")  # Çıkarılmış sayfa metinleri
+        
+        # Embedding modeli ve ChromaDB ilk ihtiyaç duyulduğunda yüklenir
+        self.embedding_model_name = "sentence-transformers/all-mpnet-base-v2"  # Daha güçlü model
+        self._embeddings = None
+        self._vectorstore = None
+        self._lazy_lock = threading.RLock()  # Eşzamanlı ilk aramalar modeli iki kez yüklemesin
+        self.query_cache_size = 1024  # Sorgu embedding LRU önbelleği (0: kapalı)
+        self.query_cache_path = os.path.join("query_embedding_cache", "queries")  # None: kalıcı değil
+        self.search_workers = 4  # Semantic/keyword bacaklarını paralel çalıştıran ortak havuz
+        self._search_executor = None
+        self.last_search_timings = {}  # Son hibrit aramada bacak başına süreler (ms)
+        self.fusion_method = "rrf"  # "weighted": min-max normalize edilmiş skorların ağırlıklı toplamı
+        self.fusion_weights = {"semantic": 1.0, "keyword": 1.0, "phrase": 1.0}
+        self.rerank_weights = list(feature_reranker.DEFAULT_WEIGHTS)  # feature_reranker.FEATURES sırasıyla
+        self.answer_cache_size = DEFAULT_ANSWER_CACHE_SIZE  # Anlamsal yanıt önbelleği (0: kapalı)
+        self.answer_cache_threshold = 0.92  # Önbellekteki soruyla en düşük kosinüs benzerliği
+        self.answer_cache_ttl = 24 * 3600  # Saniye (None: süresiz)
+        self._answer_cache = None
+        self.answer_store_path = os.path.join("answer_store", "answers.sqlite3")  # None: kalıcı depo kapalı
+        self.answer_store_max_age = 30 * 24 * 3600  # Saniye; daha eski yanıtlar arka planda silinir
+        self.answer_store_compact_interval = 3600  # Arka plan sıkıştırma aralığı (saniye)
+        self._answer_store = None
+        self.context_token_budget = 1536  # Bağlamın en fazla (tahmini) token'ı; None: sınırsız
+        self.last_context_stats = {}  # Son prompt'ta birleştirilen chunk'lar ve kazanılan token'lar
+        self.adaptive_k = False  # LLM'e giden belge sayısını füzyon skorlarındaki düşüşe göre seç
+        self.adaptive_min_k = 2
+        self.adaptive_max_k = 6
+        self.adaptive_max_drop = 0.3  # En yüksek skora oranla ardışık skor düşüşü eşiği
+        self.adaptive_k_log_path = "adaptive_k.jsonl"  # İstek başına seçilen k (None: sadece ekrana)
         
-        # Daha iyi embedding modelini yükle
-        print("📚 Gelişmiş embedding modeli yükleniyor...")
-        embedding_model_name = "sentence-transformers/all-mpnet-base-v2"  # Daha güçlü model
-        self.embeddings = HuggingFaceEmbeddings(model_name=embedding_model_name)
-        print("✅ Embedding modeli yüklendi")
+        # Manifest'teki ayarlar mevcut ayarlardan farklıysa indeks eskimiştir
+        manifest = IndexManifest.load(self.manifest_path)
+        stale_settings = manifest.settings_changes(
+            self.embedding_model_name, self.chunk_size, self.chunk_overlap
+        ) if manifest else []
+        if stale_settings:
+            print(f"⚠️ İndeks ayarları değişmiş: {', '.join(stale_settings)}")
         
         # PDF'i yeniden işle veya mevcut DB'yi yükle
-        if rebuild_db or not os.path.exists(self.persist_directory):
+        if rebuild_db or stale_settings or not os.path.exists(self.persist_directory):
             print("🔄 PDF yeniden işleniyor...")
             self._rebuild_database()
         else:
-            print("🗃️ Mevcut ChromaDB yükleniyor...")
-            self.vectorstore = Chroma(
-                persist_directory=self.persist_directory,
-                embedding_function=self.embeddings
-            )
-            # BM25 indeksini yükle
-            if os.path.exists(self.bm25_path):
-                with open(self.bm25_path, 'rb') as f:
-                    self.bm25, self.bm25_docs = pickle.load(f)
-                print("✅ BM25 indeksi yüklendi")
-            else:
-                print("⚠️ BM25 indeksi bulunamadı, yeniden oluşturuluyor...")
-                self._create_bm25_index()
+            print("🗃️ Mevcut indeks yükleniyor...")
+            self._load_snapshot()
         
-        print("✅ ChromaDB yüklendi")
+        print("✅ İndeks yüklendi")
         
         # Ollama modelini yükle
         print(f"🤖 Ollama modeli ({model_name}) yükleniyor...")
@@ -81,42 +168,392 @@ Yanıt: Verilen belgelere dayanarak,""")
         
         print("🎉 İyileştirilmiş RAG sistemi hazır!")
     
+    @property
+    def embeddings(self):
+        """Embedding modeli (ilk kullanımda yüklenir)"""
+        with self._lazy_lock:
+            if self._embeddings is None:
+                print("📚 Gelişmiş embedding modeli yükleniyor...")
+                # Chunk embedding'leri tüm ingestion yollarının paylaştığı disk önbelleğinden gelir
+                self._embeddings = with_embedding_cache(
+                    HuggingFaceEmbeddings(model_name=self.embedding_model_name),
+                    self.embedding_model_name,
+                    query_cache_size=self.query_cache_size,
+                    query_cache_path=self.query_cache_path
+                )
+                print("✅ Embedding modeli yüklendi")
+        return self._embeddings
+    
+    @property
+    def vectorstore(self):
+        """ChromaDB (ilk kullanımda açılır)"""
+        with self._lazy_lock:
+            if self._vectorstore is None:
+                self._vectorstore = Chroma(
+                    persist_directory=self.persist_directory,
+                    embedding_function=self.embeddings
+                )
+        return self._vectorstore
+    
+    @vectorstore.setter
+    def vectorstore(self, vectorstore):
+        self._vectorstore = vectorstore
+    
+    @property
+    def search_executor(self) -> ThreadPoolExecutor:
+        """Arama bacaklarının paylaştığı thread havuzu (ilk kullanımda açılır)"""
+        with self._lazy_lock:
+            if self._search_executor is None:
+                self._search_executor = ThreadPoolExecutor(
+                    max_workers=self.search_workers, thread_name_prefix="hybrid-search"
+                )
+        return self._search_executor
+    
+    @property
+    def answer_cache(self):
+        """Anlamsal yanıt önbelleği (ilk kullanımda kurulur; kapalıysa None)"""
+        with self._lazy_lock:
+            if self._answer_cache is None and self.answer_cache_size > 0:
+                self._answer_cache = SemanticAnswerCache(
+                    self.answer_cache_size, self.answer_cache_threshold, self.answer_cache_ttl
+                )
+        return self._answer_cache
+    
     def _rebuild_database(self):
         """PDF'i yeniden işleyerek veritabanını oluşturur"""
-        pdf_path = "nutuk.pdf"
+        pdf_path = self.pdf_path
         if not os.path.exists(pdf_path):
             print(f"❌ {pdf_path} bulunamadı!")
             sys.exit(1)
         
-        # PDF'i yükle
-        print("📄 PDF yükleniyor...")
-        loader = PyPDFLoader(pdf_path)
-        documents = loader.load()
-        
-        # Daha küçük chunk'lara böl
-        print("✂️ Belgeler küçük parçalara bölünüyor...")
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.chunk_size,
-            chunk_overlap=self.chunk_overlap,
-            length_function=len,
-            separators=["\n\n", "\n", ".", "!", "?", " ", ""]
-        )
+        if self.streaming_rebuild:
+            self._streaming_rebuild(pdf_path)
+            return
         
-        chunks = text_splitter.split_documents(documents)
+        stored_pages = self.page_store.load(pdf_path)
+        if stored_pages is not None:
+            # Sayfa metinleri daha önce çıkarıldı: PDF'i tekrar okumaya gerek yok
+            print(f"⚡ Sayfa metinleri depodan okundu ({len(stored_pages)} sayfa)")
+            documents = stored_pages.documents()
+            stored_pages.close()
+            print("✂️ Belgeler küçük parçalara bölünüyor...")
+            text_splitter = RecursiveCharacterTextSplitter(**self._splitter_kwargs())
+            chunks = text_splitter.split_documents(documents)
+        elif self.parallel_rebuild:
+            # Sayfa aralıklarını paralel oku ve böl
+            print("⚡ PDF paralel olarak işleniyor...")
+            documents, chunks = load_and_split_parallel(
+                pdf_path,
+                self._splitter_kwargs(),
+                workers=self.rebuild_workers,
+                progress_callback=self.progress_callback,
+                with_pages=True
+            )
+            self.page_store.save(pdf_path, documents)
+        else:
+            # PDF'i yükle
+            print("📄 PDF yükleniyor...")
+            loader = PyPDFLoader(pdf_path)
+            documents = loader.load()
+            self.page_store.save(pdf_path, documents)
+            
+            # Daha küçük chunk'lara böl
+            print("✂️ Belgeler küçük parçalara bölünüyor...")
+            text_splitter = RecursiveCharacterTextSplitter(**self._splitter_kwargs())
+            chunks = text_splitter.split_documents(documents)
         print(f"✅ {len(chunks)} küçük parça oluşturuldu")
         
+        assign_chunk_ids(chunks)
+        manifest = IndexManifest.load(self.manifest_path)
+        
+        if (manifest is None
+                or manifest.embedding_model != self.embedding_model_name
+                or not os.path.exists(self.persist_directory)):
+            # Embedding modeli değiştiyse tüm vektörler geçersizdir
+            self._full_rebuild(chunks)
+            previous = manifest
+            manifest = IndexManifest.from_chunks(
+                chunks, self.embedding_model_name, self.chunk_size, self.chunk_overlap
+            )
+            self._carry_over_corpus(previous, manifest, dropped=True)
+        else:
+            self._carry_over_corpus(manifest, manifest, dropped=False)
+            # Sadece bu PDF'in değişen chunk'larını işle (corpus belgelerine dokunma)
+            diff = manifest.diff(chunks, source=pdf_path)
+            print(f"🧮 Artımlı güncelleme: {len(diff.added)} yeni, "
+                  f"{len(diff.removed_ids)} silinen, {diff.unchanged} değişmeyen parça")
+            self._load_snapshot()
+            if not diff.is_empty:
+                self._apply_chunk_changes(diff.added, diff.removed_ids)
+            manifest.update_chunks(chunks, source=pdf_path)
+            manifest.chunk_size = self.chunk_size
+            manifest.chunk_overlap = self.chunk_overlap
+        
+        manifest.save(self.manifest_path)
+        self.embeddings.cache.flush()
+        cache_stats = self.embeddings.cache.stats()
+        print(f"📦 Embedding önbelleği: {cache_stats['hits']} isabet, {cache_stats['misses']} ıska")
+        print("✅ Veritabanı oluşturuldu")
+    
+    def _streaming_rebuild(self, pdf_path: str):
+        """
+        PDF'i sayfa sayfa işleyip batch'ler halinde indekse yazar.
+
+        Sayfa okuma, bölme ve embedding sırasında bellekte bir sayfa ve bir
+        batch tutulur. Sonundaki BM25/pozisyonel indeks ve snapshot (embedding
+        matrisi dahil) ise tüm corpus'u kapsar: tam yeniden kurulumda kayıt
+        dosyasındaki bütün chunk'ların metni ve token'ları bir kez belleğe alınır.
+        """
+        manifest = IndexManifest.load(self.manifest_path)
+        full = (manifest is None
+                or manifest.embedding_model != self.embedding_model_name
+                or not os.path.exists(self.persist_directory))
+        
+        ingestor = StreamingIngestor(
+            collection=None,
+            embeddings=self.embeddings,
+            splitter_kwargs=self._splitter_kwargs(),
+            checkpoint_path=self.ingest_checkpoint_path,
+            token_log_path=self.ingest_log_path,
+            tokenize=tokenize,
+            batch_size=self.ingest_batch_size,
+            page_store=self.page_store
+        )
+        extra = {"embedding_model": self.embedding_model_name, "full": full}
+        
+        if full and not ingestor.can_resume(pdf_path, extra) and os.path.exists(self.persist_directory):
+            Chroma(
+                persist_directory=self.persist_directory,
+                embedding_function=self.embeddings
+            ).delete_collection()
+        self.vectorstore = Chroma(
+            persist_directory=self.persist_directory,
+            embedding_function=self.embeddings
+        )
+        ingestor.collection = self.vectorstore._collection
+        
+        print(f"🌊 PDF akış halinde işleniyor (batch: {self.ingest_batch_size})...")
+        known_ids = set() if full else set(manifest.chunk_ids(pdf_path))
+        stats = ingestor.run(pdf_path, known_ids=known_ids, extra=extra,
+                             progress_callback=self.progress_callback)
+        print(f"✅ {stats['chunks']} parça işlendi, {stats['embedded']} parça embed edildi")
+        
+        if full:
+            # BM25 indeksini ve manifest'i kayıt dosyasından, tek okumada oluştur
+            chunk_ids, texts, metadatas, tokenized_texts = [], [], [], []
+            for record in ingestor.iter_log():
+                chunk_ids.append(record["metadata"]["chunk_id"])
+                texts.append(record["text"])
+                metadatas.append(record["metadata"])
+                tokenized_texts.append(record["tokens"])
+            print("🔍 BM25 keyword arama indeksi oluşturuluyor...")
+            self._build_bm25_index(chunk_ids, texts, metadatas, tokenized_texts)
+            previous = manifest
+            manifest = IndexManifest(self.embedding_model_name, self.chunk_size, self.chunk_overlap)
+            manifest.update_entries(metadatas)
+            self._carry_over_corpus(previous, manifest, dropped=True)
+        else:
+            self._carry_over_corpus(manifest, manifest, dropped=False)
+            # Vektörler zaten yazıldı; silinenleri çıkar ve BM25'i yamala. Kayıt dosyası
+            # bir kez okunur; sadece yeni chunk'ların metni, diğerlerinin metadata'sı tutulur
+            metadatas = []
+            
+            def logged_chunks():
+                for record in ingestor.iter_log():
+                    metadatas.append(record["metadata"])
+                    yield Document(page_content=record["text"], metadata=record["metadata"])
+            
+            diff = manifest.diff(logged_chunks(), source=pdf_path)
+            if diff.removed_ids:
+                print(f"🗑️ {len(diff.removed_ids)} parça siliniyor...")
+                self.vectorstore.delete(ids=diff.removed_ids)
+            self._load_snapshot()
+            self._patch_bm25_index(diff.added, diff.removed_ids)
+            manifest.update_entries(metadatas, source=pdf_path)
+            manifest.chunk_size = self.chunk_size
+            manifest.chunk_overlap = self.chunk_overlap
+        
+        manifest.save(self.manifest_path)
+        ingestor.clear()
+        print("✅ Veritabanı oluşturuldu")
+    
+    def _carry_over_corpus(self, previous: IndexManifest, manifest: IndexManifest, dropped: bool):
+        """
+        Ana PDF yeniden kurulurken corpus belgelerinin durumunu yeni manifest'e
+        taşır. Ayarlar değiştiyse belgeler eskimiş olarak işaretlenir ve bir
+        sonraki `ingest_corpus` çalıştırmasında yeniden işlenir.
+
+        Args:
+            previous: Yeniden kurulumdan önceki manifest (None olabilir).
+            manifest: Kaydedilecek manifest.
+            dropped: Vektör koleksiyonu silindi mi (corpus chunk'ları da gitti).
+        """
+        if previous is None or not previous.documents:
+            return
+        manifest.documents = previous.documents
+        changes = previous.settings_changes(self.embedding_model_name, self.chunk_size, self.chunk_overlap)
+        if not changes and not dropped:
+            return
+        stale = manifest.mark_documents_stale(", ".join(changes) or "vektör veritabanı yeniden kuruldu")
+        if not stale:
+            return
+        if dropped:
+            print(f"⚠️ {len(stale)} corpus belgesi indeksten çıkarıldı; "
+                  f"ingest_corpus ile yeniden eklenmeleri gerekiyor: {', '.join(stale)}")
+        else:
+            print(f"⚠️ {len(stale)} corpus belgesi eski ayarlarla ({', '.join(changes)}) bölünmüş durumda; "
+                  f"bir sonraki ingest_corpus çalıştırmasında yeniden işlenecek")
+    
+    def _full_rebuild(self, chunks: List[Document]):
+        """Mevcut indeksi silip tüm chunk'ları baştan embed eder"""
+        if os.path.exists(self.persist_directory):
+            # Dizini silmek yerine koleksiyonu sil: açık Chroma istemcileri geçerli kalır
+            Chroma(
+                persist_directory=self.persist_directory,
+                embedding_function=self.embeddings
+            ).delete_collection()
+        
         # ChromaDB'ye kaydet
         print("💾 ChromaDB'ye kaydediliyor...")
         self.vectorstore = Chroma.from_documents(
             documents=chunks,
             embedding=self.embeddings,
+            ids=[chunk.metadata["chunk_id"] for chunk in chunks],
             persist_directory=self.persist_directory
         )
         
         # BM25 indeksini oluştur
         self._create_bm25_index()
+    
+    def _apply_chunk_changes(self, added: List[Document], removed_ids: List[str]):
+        """Yeni chunk'ları embed edip ekler, silinenleri ChromaDB ve BM25'ten çıkarır"""
+        self._write_chunks(added, removed_ids)
+        self._patch_bm25_index(added, removed_ids)
+    
+    def _write_chunks(self, added: List[Document], removed_ids: List[str]):
+        """Yeni chunk'ları embed edip ChromaDB'ye ekler, silinenleri çıkarır (BM25'e dokunmaz)"""
+        if removed_ids:
+            print(f"🗑️ {len(removed_ids)} parça siliniyor...")
+            self.vectorstore.delete(ids=removed_ids)
         
-        print("✅ Veritabanı oluşturuldu")
+        if added:
+            print(f"💾 {len(added)} yeni parça embed ediliyor...")
+            batch_size = 1000  # ChromaDB'nin tek seferde kabul ettiği sınırın altında
+            for start in range(0, len(added), batch_size):
+                batch = added[start:start + batch_size]
+                self.vectorstore.add_documents(
+                    batch, ids=[chunk.metadata["chunk_id"] for chunk in batch]
+                )
+    
+    def _sync_keyword_index(self, manifest: IndexManifest, added: Dict[str, Document]):
+        """
+        Ters indeksi manifest'teki chunk kümesine tek bir yamayla getirir.
+
+        Args:
+            manifest: Güncel manifest.
+            added: Bu çalıştırmada eklenen chunk'lar (chunk_id -> Document).
+                Manifest'te olup indekste olmayan diğer chunk'lar (yarıda kalan
+                bir önceki çalıştırmadan) ChromaDB'den okunur.
+        """
+        indexed = set(self.keyword_index.chunk_ids)
+        removed_ids = [chunk_id for chunk_id in self.keyword_index.chunk_ids if chunk_id not in manifest.chunks]
+        missing = [chunk_id for chunk_id in manifest.chunks if chunk_id not in indexed]
+        unknown = [chunk_id for chunk_id in missing if chunk_id not in added]
+        fetched = {}
+        batch_size = 1000
+        for start in range(0, len(unknown), batch_size):
+            batch = self.vectorstore.get(ids=unknown[start:start + batch_size], include=["documents", "metadatas"])
+            fetched.update(
+                (chunk_id, Document(page_content=text, metadata=metadata))
+                for chunk_id, text, metadata in zip(batch["ids"], batch["documents"], batch["metadatas"])
+            )
+        chunks = [added.get(chunk_id) or fetched[chunk_id] for chunk_id in missing
+                  if chunk_id in added or chunk_id in fetched]
+        if chunks or removed_ids:
+            self._patch_bm25_index(chunks, removed_ids)
+    
+    def ingest_corpus(self, directory: str, workers=None) -> dict:
+        """
+        Bir klasördeki PDF'leri aynı hibrit indekse ekler.
+
+        Belgeler süreç havuzunda paralel işlenir, chunk'lar `source_id` ile
+        etiketlenir. Değişmeyen belgeler atlanır, klasörden silinen belgelerin
+        chunk'ları indeksten çıkarılır. Her belge bitince embed edilip
+        ChromaDB'ye yazılır ve manifest kaydedilir; BM25, pozisyonel indeks
+        ve snapshot ise sonda bir kez yamalanır. Yarıda kalan bir çalıştırmanın
+        eksik kalan yaması bir sonraki çalıştırmada tamamlanır.
+
+        Args:
+            directory: PDF'lerin bulunduğu klasör.
+            workers: Süreç sayısı (varsayılan: CPU sayısı).
+
+        Returns:
+            İşlenen, atlanan, başarısız ve silinen belge sayıları.
+        """
+        manifest = IndexManifest.load(self.manifest_path) or IndexManifest(
+            self.embedding_model_name, self.chunk_size, self.chunk_overlap
+        )
+        settings = {
+            "embedding_model": self.embedding_model_name,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+        }
+        # Ana PDF'i _rebuild_database yönetir; corpus klasörü "." olsa bile ikinci kez eklenmez
+        to_process, removed = plan_corpus(directory, manifest.documents, settings, exclude=[self.pdf_path])
+        total = len(discover_pdfs(directory))
+        print(f"📚 Corpus: {total} belge, {len(to_process)} işlenecek, {len(removed)} silinecek")
+        
+        summary = {"indexed": 0, "skipped": total - len(to_process), "failed": 0, "removed": 0}
+        
+        added: Dict[str, Document] = {}
+        for source_id in removed:
+            manifest.documents.pop(source_id)
+            # Chunk'lar yol ile değil source_id ile bulunur: yol başka yazılmış olabilir ("./corpus")
+            self._write_chunks([], manifest.chunk_ids(source_id=source_id))
+            manifest.update_chunks([], source_id=source_id)
+            manifest.save(self.manifest_path)
+            summary["removed"] += 1
+        
+        for job, chunks, error in run_corpus_workers(to_process, self._splitter_kwargs(), workers,
+                                                     page_store_dir=self.page_store.directory):
+            source_id = job["source_id"]
+            if error:
+                print(f"  ❌ {source_id}: {error}")
+                manifest.documents[source_id] = {
+                    "path": job["path"], "sha256": job["sha256"],
+                    "status": "failed", "error": error, "settings": settings,
+                }
+                manifest.save(self.manifest_path)
+                summary["failed"] += 1
+                continue
+            
+            diff = manifest.diff(chunks, source_id=source_id)
+            if not diff.is_empty:
+                self._write_chunks(diff.added, diff.removed_ids)
+                added.update((chunk.metadata["chunk_id"], chunk) for chunk in diff.added)
+            manifest.update_chunks(chunks, source_id=source_id)
+            manifest.documents[source_id] = {
+                "path": job["path"], "sha256": job["sha256"],
+                "status": "indexed", "chunks": len(chunks), "settings": settings,
+            }
+            # Her belgeden sonra kaydet: yarıda kalırsa biten belgeler tekrar işlenmez
+            manifest.save(self.manifest_path)
+            summary["indexed"] += 1
+            print(f"  ✅ {source_id}: {len(chunks)} parça")
+        
+        self._sync_keyword_index(manifest, added)
+        self.embeddings.cache.flush()
+        print(f"✅ Corpus indekslendi: {summary}")
+        return summary
+    
+    def _splitter_kwargs(self) -> dict:
+        """Seri ve paralel yolların ortak kullandığı text splitter ayarları"""
+        return {
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "length_function": len,
+            "separators": self.separators,
+        }
     
     def _create_bm25_index(self):
         """BM25 keyword arama indeksini oluşturur"""
@@ -128,160 +565,664 @@ Yanıt: Verilen belgelere dayanarak,""")
         metadatas = all_docs['metadatas']
         
         # Metinleri tokenize et
-        tokenized_texts = [self._tokenize_turkish(text) for text in texts]
+        tokenized_texts = tokenize_batch(texts)
         
-        # BM25 indeksini oluştur
-        self.bm25 = BM25Okapi(tokenized_texts)
-        self.bm25_docs = [(text, meta) for text, meta in zip(texts, metadatas)]
-        
-        # Kaydet
-        with open(self.bm25_path, 'wb') as f:
-            pickle.dump((self.bm25, self.bm25_docs), f)
+        self._build_bm25_index(all_docs['ids'], texts, metadatas, tokenized_texts)
         
         print("✅ BM25 indeksi oluşturuldu")
     
+    def _build_bm25_index(self, chunk_ids: List[str], texts: List[str], metadatas: List[dict],
+                          tokenized_texts: List[List[str]]):
+        """Tokenize edilmiş metinlerden ters indeksi oluşturup kaydeder"""
+        self.keyword_index = InvertedIndex.build(chunk_ids, texts, metadatas, tokenized_texts)
+        self.positional_index = PositionalIndex.build(chunk_ids, [tokenize_raw(text) for text in texts])
+        self.trigram_index = None  # Sözlük değişti; ilk bulanık sorguda yeniden kurulur
+        self.stemmed_index = None
+        if self.stemmed_field:
+            self._build_stemmed_index(tokenized_texts)
+        self.chunk_embeddings = None  # Embedding'ler de baştan okunur (model değişmiş olabilir)
+        self._save_snapshot()
+    
+    def _build_stemmed_index(self, tokenized_texts: List[List[str]] = None):
+        """Keyword indeksindeki chunk'lardan köklenmiş terimlerle ikinci bir indeks kurar"""
+        index = self.keyword_index
+        texts = [index.text(i) for i in range(len(index))]
+        if tokenized_texts is None:
+            tokenized_texts = tokenize_batch(texts)
+        # Her build yeni bir lemma tablosuyla başlar: her yüzey biçimi bir kez köklenir.
+        # Kökler keyword indeksinin sözlüğüyle doğrulanır ("ankara" -> "ankar" olmaz)
+        self.stemmer = TurkishStemmer(vocabulary=index.terms)
+        self.stemmed_index = InvertedIndex.build(
+            list(index.chunk_ids), texts, list(index.metadatas), self.stemmer.stem_batch(tokenized_texts)
+        )
+        stats = self.stemmer.stats()
+        print(f"🌱 Köklenmiş indeks: {len(index.terms)} -> {len(self.stemmed_index.terms)} terim "
+              f"({stats['lemmas']} yüzey biçimi köklendi)")
+    
+    def _load_snapshot(self):
+        """Kayıtlı index snapshot'ını bellek eşlemeli açar, yoksa yeniden oluşturur"""
+        sections = open_snapshot(self.snapshot_path)
+        if sections is not None:
+            self.keyword_index = InvertedIndex.from_sections(sections, "bm25")
+            self.positional_index = PositionalIndex.from_sections(sections, "positions")
+        if sections is None or self.keyword_index is None or self.positional_index is None:
+            print("⚠️ İndeks snapshot'ı bulunamadı, yeniden oluşturuluyor...")
+            self._create_bm25_index()
+            return
+        self.trigram_index = None
+        self.chunk_embeddings = sections.get("embeddings")
+        self._embedding_ids = self.keyword_index.chunk_ids
+        self.flat_vector_index = None
+        print(f"✅ İndeks snapshot'ı yüklendi ({len(self.keyword_index)} parça)")
+        if self.stemmed_field:
+            # Snapshot'taki bölümler birlikte yazılır; varsa köklenmiş indeks günceldir
+            self.stemmed_index = InvertedIndex.from_sections(sections, "stemmed")
+            self.stemmer = TurkishStemmer(vocabulary=self.keyword_index.terms)
+            if self.stemmed_index is None:
+                self._build_stemmed_index()
+                self._save_snapshot()
+    
+    def _save_snapshot(self):
+        """İndeksleri ve chunk embedding matrisini tek snapshot dosyasına yazar"""
+        sections = self.keyword_index.to_sections("bm25")
+        sections.update(self.positional_index.to_sections("positions"))
+        if self.stemmed_index is not None:
+            sections.update(self.stemmed_index.to_sections("stemmed"))
+        self.chunk_embeddings = self._chunk_embedding_matrix(list(self.keyword_index.chunk_ids))
+        sections["embeddings"] = self.chunk_embeddings
+        self.flat_vector_index = None  # Embedding matrisi değişti; ilk aramada yeniden kurulur
+        write_snapshot(self.snapshot_path, sections)
+    
+    def _chunk_embedding_matrix(self, chunk_ids: List[str]) -> np.ndarray:
+        """
+        Chunk embedding'lerini verilen sırayla bir matriste toplar. Önceki
+        snapshot'ta olan satırlar yeniden kullanılır, sadece yeni chunk'ların
+        vektörleri ChromaDB'den okunur.
+        """
+        previous = {}
+        if self.chunk_embeddings is not None and len(self.chunk_embeddings):
+            previous = {chunk_id: i for i, chunk_id in enumerate(self._embedding_ids)}
+        missing = [chunk_id for chunk_id in chunk_ids if chunk_id not in previous]
+        fetched = {}
+        batch_size = 1000
+        for start in range(0, len(missing), batch_size):
+            batch = self.vectorstore.get(ids=missing[start:start + batch_size], include=["embeddings"])
+            fetched.update(zip(batch["ids"], batch["embeddings"]))
+        
+        if previous:
+            dimension = self.chunk_embeddings.shape[1]
+        else:
+            dimension = len(next(iter(fetched.values()))) if fetched else 0
+        matrix = np.zeros((len(chunk_ids), dimension), dtype=np.float32)
+        reused = [(i, previous[chunk_id]) for i, chunk_id in enumerate(chunk_ids) if chunk_id in previous]
+        if reused:
+            rows, old_rows = zip(*reused)
+            matrix[list(rows)] = self.chunk_embeddings[list(old_rows)]
+        for i, chunk_id in enumerate(chunk_ids):
+            if chunk_id in fetched:
+                matrix[i] = fetched[chunk_id]
+        self._embedding_ids = chunk_ids
+        return matrix
+    
+    def _patch_bm25_index(self, added: List[Document], removed_ids: List[str]):
+        """
+        Ters indeksi günceller: değişmeyen dokümanların terim frekansları
+        ileri indeksten alınır, sadece yeni chunk'lar tokenize edilir.
+        """
+        added_tokens = tokenize_batch(chunk.page_content for chunk in added)
+        self.keyword_index = self.keyword_index.patched(
+            removed_ids,
+            [chunk.metadata["chunk_id"] for chunk in added],
+            [chunk.page_content for chunk in added],
+            [chunk.metadata for chunk in added],
+            added_tokens
+        )
+        if self.stemmed_index is not None:
+            # Kökler sözlüğe bağlı: yeni bir yüzey biçimi eski chunk'ların köklerini de
+            # değiştirebilir ("samsun" eklenince "samsuna" -> "samsun"), indeks baştan kurulur
+            self._build_stemmed_index()
+        self.positional_index = self.positional_index.patched(
+            removed_ids,
+            [chunk.metadata["chunk_id"] for chunk in added],
+            [tokenize_raw(chunk.page_content) for chunk in added]
+        )
+        self.trigram_index = None  # Sözlük değişti; ilk bulanık sorguda yeniden kurulur
+        self._save_snapshot()
+        print("✅ BM25 indeksi güncellendi")
+    
+    
     def _tokenize_turkish(self, text: str) -> List[str]:
         """Türkçe metin için tokenization"""
-        # Küçük harfe çevir
-        text = text.lower()
-        
-        # Türkçe karakterleri normalize et
-        text = text.replace('ç', 'c').replace('ğ', 'g').replace('ı', 'i')
-        text = text.replace('ö', 'o').replace('ş', 's').replace('ü', 'u')
-        
-        # Sadece harf ve rakam bırak
-        text = re.sub(r'[^a-zA-Z0-9\s]', ' ', text)
-        
-        # Tokenize et
-        tokens = text.split()
-        
-        # Stop words'leri kaldır (temel Türkçe stop words)
-        stop_words = {
-            've', 'bir', 'bu', 'o', 'şu', 'de', 'da', 'den', 'dan', 'ile', 'için',
-            'ne', 'ki', 'ya', 'yada', 'veya', 'ama', 'fakat', 'ancak', 'lakin',
-            'gibi', 'kadar', 'sonra', 'önce', 'üzere', 'doğru', 'karşı', 'rağmen'
-        }
-        
-        tokens = [token for token in tokens if token not in stop_words and len(token) > 2]
-        
-        return tokens
+        return tokenize(text)
     
     def semantic_search(self, query: str, k: int = 5) -> List[Document]:
         """Semantic similarity search"""
-        results = self.vectorstore.similarity_search(query, k=k)
+        return [doc for doc, _ in self.semantic_search_scored(query, k)]
+    
+    def semantic_search_scored(self, query: str, k: int = 5) -> List[Tuple[Document, float]]:
+        """
+        Semantic search; skor kosinüs benzerliğidir (büyük olan daha benzer).
+        Chroma'nın varsayılan uzaklığı karesel L2'dir; normalize embedding'lerde
+        kosinüs = 1 - uzaklık / 2.
+        """
+        if self.vector_backend == "flat":
+            return self._flat_search(self.embeddings.embed_query(query), k)
+        if self.vector_backend != "chroma":
+            raise ValueError(f"Bilinmeyen vektör arka ucu: {self.vector_backend}")
+        results = self.vectorstore.similarity_search_with_score(query, k=k)
+        return [(doc, 1.0 - distance / 2) for doc, distance in results]
+    
+    def semantic_search_batch(self, queries: List[str], k: int = 5) -> List[List[Document]]:
+        """
+        Birden fazla sorgu için semantic search: sorgular tek bir batch'te embed
+        edilir ve tek bir arama çağrısıyla (düz indekste tek matris çarpımı)
+        puanlanır.
+
+        Returns:
+            Her sorgu için `semantic_search` ile aynı sonuç listesi.
+        """
+        return [[doc for doc, _ in hits] for hits in self._semantic_search_batch_scored(queries, k)]
+    
+    def _semantic_search_batch_scored(self, queries: List[str], k: int) -> List[List[Tuple[Document, float]]]:
+        if not queries:
+            return []
+        query_embeddings = self.embeddings.embed_queries(queries)
+        if self.vector_backend == "flat":
+            hits = self._flat_index().search_batch(np.asarray(query_embeddings, dtype=np.float32), k)
+            return [self._scored_documents_at(query_hits) for query_hits in hits]
+        if self.vector_backend != "chroma":
+            raise ValueError(f"Bilinmeyen vektör arka ucu: {self.vector_backend}")
+        found = self.vectorstore._collection.query(
+            query_embeddings=query_embeddings, n_results=k, include=["documents", "metadatas", "distances"]
+        )
+        return [
+            [(Document(page_content=text, metadata=metadata or {}), 1.0 - distance / 2)
+             for text, metadata, distance in zip(texts, metadatas, distances)]
+            for texts, metadatas, distances in zip(found["documents"], found["metadatas"], found["distances"])
+        ]
+    
+    def query_cache_stats(self) -> dict:
+        """Sorgu embedding önbelleğinin isabet oranı ve kazandırdığı süre (ms)"""
+        if self._embeddings is None or self._embeddings.query_cache is None:
+            return {}
+        return self._embeddings.query_cache.stats()
+    
+    @property
+    def answer_store(self):
+        """Kalıcı yanıt deposu (ilk kullanımda açılır; kapalıysa None)"""
+        with self._lazy_lock:
+            if self._answer_store is None and self.answer_store_path:
+                self._answer_store = AnswerStore(
+                    self.answer_store_path,
+                    max_age_seconds=self.answer_store_max_age,
+                    compact_interval=self.answer_store_compact_interval
+                )
+        return self._answer_store
+    
+    def invalidate_answers(self, stale_only: bool = True) -> int:
+        """
+        Kalıcı depodaki yanıtları geçersiz kılar (yeniden indekslemeden sonra).
+
+        Args:
+            stale_only: True ise sadece artık indekste olmayan bir chunk'a
+                dayanan yanıtlar, False ise tüm yanıtlar ve anlamsal önbellek.
+
+        Returns:
+            Depodan silinen yanıt sayısı.
+        """
+        if not stale_only and self._answer_cache is not None:
+            self._answer_cache.clear()
+        if self.answer_store is None:
+            return 0
+        removed = self.answer_store.invalidate(self.keyword_index.chunk_ids if stale_only else None)
+        print(f"🗑️ Yanıt deposundan {removed} yanıt silindi")
+        return removed
+    
+    def answer_store_stats(self) -> dict:
+        """Kalıcı yanıt deposunun girdi sayısı ve isabet oranı"""
+        if self._answer_store is None:
+            return {}
+        return self._answer_store.stats()
+    
+    def answer_cache_stats(self) -> dict:
+        """Anlamsal yanıt önbelleğinin isabet oranı ve kanıt uyuşmazlıkları"""
+        if self._answer_cache is None:
+            return {}
+        return self._answer_cache.stats()
+    
+    def _flat_index(self) -> FlatVectorIndex:
+        """Snapshot'taki embedding matrisinden düz indeks (ilk kullanımda kurulur)"""
+        index = self.flat_vector_index
+        if index is None or index.precision != self.flat_vector_precision:
+            index = self.flat_vector_index = FlatVectorIndex.build(
+                self.chunk_embeddings, self.flat_vector_precision
+            )
+        return index
+    
+    def _scored_documents_at(self, hits: List[Tuple[int, float]]) -> List[Tuple[Document, float]]:
+        """(keyword indeksi pozisyonu, skor) çiftlerindeki chunk'lar"""
+        results = []
+        for position, score in hits:
+            text, metadata = self.keyword_index.document(position)
+            results.append((Document(page_content=text, metadata=metadata), score))
         return results
     
+    def _flat_search(self, query_embedding, k: int) -> List[Tuple[Document, float]]:
+        """Düz NumPy indeksinde tam arama; satırlar keyword indeksi pozisyonlarıdır"""
+        hits = self._flat_index().search(np.asarray(query_embedding, dtype=np.float32), k)
+        return self._scored_documents_at(hits)
+    
+    def compare_vector_backends(self, queries: List[str], k: int = 5) -> dict:
+        """
+        ChromaDB (HNSW) ve düz NumPy indeksinin arama süresini karşılaştırır.
+
+        Sorgu embedding'leri bir kez hesaplanır; sadece arama süresi ölçülür.
+
+        Returns:
+            Arka uç başına ortalama arama süresi (ms); düz indeks için ayrıca
+            Chroma sonuçlarıyla örtüşme oranı ve bellek kullanımı.
+        """
+        if not queries:
+            return {}
+        query_embeddings = self.embeddings.embed_queries(queries)
+        report = {}
+        
+        start = time.perf_counter()
+        chroma_results = [self.vectorstore.similarity_search_by_vector(embedding, k=k)
+                          for embedding in query_embeddings]
+        elapsed = time.perf_counter() - start
+        report["chroma"] = {"latency_ms": 1000 * elapsed / max(len(queries), 1)}
+        
+        expected = sum(len(chroma) for chroma in chroma_results)
+        configured = self.flat_vector_precision
+        for precision in ("float32", "float16", "int8"):
+            self.flat_vector_precision = precision
+            self.flat_vector_index = None
+            self._flat_search(query_embeddings[0], 1)  # İndeksi ölçümden önce kur
+            start = time.perf_counter()
+            flat_results = [self._flat_search(embedding, k) for embedding in query_embeddings]
+            elapsed = time.perf_counter() - start
+            found = sum(
+                len({d.metadata.get("chunk_id") for d, _ in flat} & {d.metadata.get("chunk_id") for d in chroma})
+                for flat, chroma in zip(flat_results, chroma_results)
+            )
+            report[f"flat_{precision}"] = dict(
+                self.flat_vector_index.stats(),
+                latency_ms=1000 * elapsed / max(len(queries), 1),
+                overlap=found / expected if expected else 1.0
+            )
+        self.flat_vector_precision = configured
+        self.flat_vector_index = None
+        return report
+    
     def keyword_search(self, query: str, k: int = 5) -> List[Tuple[str, dict, float]]:
-        """BM25 keyword search"""
-        query_tokens = self._tokenize_turkish(query)
-        scores = self.bm25.get_scores(query_tokens)
+        """BM25 keyword search (sadece sorgu terimlerini içeren dokümanlar puanlanır)"""
+        if self.stemmed_field and self.stemmed_index is not None:
+            # Köklenmiş alan çekimli biçimleri zaten birleştirir; bulanık genişletme yapılmaz
+            index = self.stemmed_index
+            query_tokens = self.stemmer.stem_tokens(tokenize_query(query))
+            weights = None
+        else:
+            index = self.keyword_index
+            query_tokens, weights = self._expand_query_tokens(tokenize_query(query))
         
-        # En yüksek skorlu k adet sonucu al
-        top_indices = np.argsort(scores)[::-1][:k]
+        top, self.last_keyword_stats = index.search(
+            query_tokens, k, mode=self.keyword_search_mode, weights=weights
+        )
+        self.last_keyword_stats["expansions"] = query_tokens[len(tokenize_query(query)):]
         
         results = []
-        for idx in top_indices:
-            if scores[idx] > 0:  # Sadece 0'dan büyük skorları al
-                doc_text, metadata = self.bm25_docs[idx]
-                results.append((doc_text, metadata, scores[idx]))
+        for position, score in top:
+            doc_text, metadata = index.document(position)
+            results.append((doc_text, metadata, score))
         
         return results
     
+    def compare_keyword_fields(self, queries: List[str], k: int = 6) -> dict:
+        """
+        Köklenmemiş ve köklenmiş keyword alanlarını karşılaştırır.
+
+        Köklenmiş indeks yoksa bellekte kurulur (diske yazılmaz). Bulanık
+        genişletme kullanılmaz; sadece alanların kendisi ölçülür.
+
+        Returns:
+            Alan başına sözlük boyutu, posting sayısı, indeks baytı ve
+            ortalama sorgu süresi (ms).
+        """
+        if self.stemmed_index is None:
+            self._build_stemmed_index()
+        
+        fields = {
+            "unstemmed": (self.keyword_index, lambda tokens: list(tokens)),
+            "stemmed": (self.stemmed_index, self.stemmer.stem_tokens),
+        }
+        report = {}
+        for name, (index, transform) in fields.items():
+            start = time.perf_counter()
+            for query in queries:
+                index.search(transform(tokenize_query(query)), k, mode=self.keyword_search_mode)
+            elapsed = time.perf_counter() - start
+            report[name] = dict(index.stats(), latency_ms=1000 * elapsed / max(len(queries), 1))
+        return report
+    
+    def _expand_query_tokens(self, query_tokens) -> Tuple[List[str], List[float]]:
+        """
+        Sorgu token'larına trigram benzerliğiyle bulunan çekimli biçimleri ekler
+        (ör. "izmir" -> "izmirden"). Asıl token'ların ağırlığı 1, eklenenlerin
+        ağırlığı fuzzy_weight * benzerlik olur.
+        """
+        tokens = list(query_tokens)
+        weights = [1.0] * len(tokens)
+        if self.fuzzy_expansions <= 0:
+            return tokens, weights
+        if self.trigram_index is None:
+            self.trigram_index = TrigramIndex(self.keyword_index.terms)
+        seen = set(tokens)
+        for token in query_tokens:
+            for term, similarity in self.trigram_index.expand(
+                    token, self.fuzzy_expansions, self.fuzzy_min_similarity):
+                if term not in seen:
+                    seen.add(term)
+                    tokens.append(term)
+                    weights.append(self.fuzzy_weight * similarity)
+        return tokens, weights
+    
+    def phrase_search(self, query: str, k: int = 2) -> List[Tuple[str, dict]]:
+        """
+        Sorgunun indekste ifade olarak geçen en uzun parçasını (ör. "15 Mayıs 1919")
+        içeren chunk'lar. İfade bulunamazsa sorgu terimlerinin birbirine yakın
+        geçtiği chunk'lar döner. Chunk metni taranmaz; pozisyonel indeks kullanılır.
+        """
+        return [(text, metadata) for text, metadata, _ in self.phrase_search_scored(query, k)]
+    
+    def phrase_search_scored(self, query: str, k: int = 2) -> List[Tuple[str, dict, float]]:
+        """`phrase_search`; skor ifadenin chunk'taki geçiş sayısı, yakınlık eşleşmesinde 1 / aralık"""
+        # "ne zaman" gibi içeriksiz ifadeler her chunk'ta geçer; sayılmaz
+        _, docs, counts = self.positional_index.longest_phrase(
+            tokenize_raw(query),
+            accept=lambda phrase: len(tokenize(" ".join(phrase))) >= self.phrase_min_content_tokens
+        )
+        if len(docs):
+            # Önce ifadeyi en çok içerenler
+            order = np.lexsort((docs, -counts))[:k]
+            scores = counts.astype(np.float64)
+        else:
+            query_tokens = tokenize_query(query)
+            if len(query_tokens) < 2:
+                return []
+            docs, spans = self.positional_index.near(query_tokens, self.proximity_window)
+            order = np.lexsort((docs, spans))[:k]
+            scores = 1.0 / spans
+        
+        results = []
+        for position, score in zip(docs[order], scores[order]):
+            chunk_id = self.positional_index.chunk_ids[int(position)]
+            text, metadata = self.keyword_index.document(self.keyword_index.position(chunk_id))
+            results.append((text, metadata, float(score)))
+        return results
+    
     def hybrid_search(self, query: str, k: int = 6) -> List[Document]:
-        """Hibrit arama: semantic + keyword"""
+        """Hibrit arama: semantic + keyword (skorlar için `hybrid_search_scored`)"""
+        return [result.document for result in self.hybrid_search_scored(query, k)]
+    
+    def hybrid_search_scored(self, query: str, k: int = 6) -> List[FusedResult]:
+        """
+        Hibrit arama: semantic + keyword + ifade bacakları, chunk id'sine göre
+        tekilleştirilip `fusion_method` ile birleştirilir. Semantic bacak ortak
+        thread havuzunda, keyword bacağı çağıran thread'de aynı anda çalışır
+        (embedding hesabı çoğunlukla GIL'i bırakır). Bacak süreleri
+        `last_search_timings` içindedir.
+        """
         print(f"🔍 Hibrit arama yapılıyor: {query}")
+        start = time.perf_counter()
         
         # Semantic arama
-        semantic_results = self.semantic_search(query, k=k//2)
-        
+        semantic = self.search_executor.submit(_timed, self.semantic_search_scored, query, k//2)
         # Keyword arama
-        keyword_results = self.keyword_search(query, k=k//2)
-        
-        # Sonuçları birleştir
-        all_results = []
-        
-        # Semantic sonuçları ekle
-        for doc in semantic_results:
-            all_results.append(doc)
-        
-        # Keyword sonuçlarını Document objesine çevir ve ekle
-        for text, metadata, score in keyword_results:
-            doc = Document(page_content=text, metadata=metadata)
-            # Duplicate kontrolü
-            is_duplicate = False
-            for existing_doc in all_results:
-                if existing_doc.page_content == doc.page_content:
-                    is_duplicate = True
-                    break
-            if not is_duplicate:
-                all_results.append(doc)
+        keyword_results, keyword_ms = _timed(self.keyword_search, query, k//2)
+        semantic_results, semantic_ms = semantic.result()
         
+        all_results, merge_ms = _timed(self._merge_hybrid, query, semantic_results, keyword_results, k)
+        self.last_search_timings = _leg_timings(semantic_ms, keyword_ms, merge_ms, start)
         print(f"✅ {len(all_results)} benzersiz sonuç bulundu")
-        return all_results[:k]
+        return all_results
+    
+    async def hybrid_search_async(self, query: str, k: int = 6) -> Tuple[List[FusedResult], dict]:
+        """
+        `hybrid_search_scored`ın event loop'u bloklamayan sürümü: iki bacak
+        ortak havuzda eşzamanlı çalışır.
+
+        Returns:
+            (sonuçlar, bacak süreleri) — eşzamanlı isteklerde karışmaması için
+            süreler `last_search_timings` yerine sonuçla birlikte döner.
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        (semantic_results, semantic_ms), (keyword_results, keyword_ms) = await asyncio.gather(
+            loop.run_in_executor(self.search_executor, _timed, self.semantic_search_scored, query, k//2),
+            loop.run_in_executor(self.search_executor, _timed, self.keyword_search, query, k//2),
+        )
+        all_results, merge_ms = await loop.run_in_executor(
+            self.search_executor, _timed, self._merge_hybrid, query, semantic_results, keyword_results, k
+        )
+        return all_results, _leg_timings(semantic_ms, keyword_ms, merge_ms, start)
+    
+    def _merge_hybrid(self, query: str, semantic_results: List[Tuple[Document, float]],
+                      keyword_results: List[Tuple[str, dict, float]], k: int) -> List[FusedResult]:
+        """Semantic, keyword ve tam ifade sonuçlarını skorlarıyla birleştirir"""
+        legs = {
+            "semantic": semantic_results,
+            "keyword": [(Document(page_content=text, metadata=metadata), score)
+                        for text, metadata, score in keyword_results],
+            "phrase": [(Document(page_content=text, metadata=metadata), score)
+                       for text, metadata, score in self.phrase_search_scored(query, k=self.phrase_candidates)],
+        }
+        fused = fuse(legs, self.fusion_method, self.fusion_weights)
+        # Tam ifade eşleşmeleri: füzyonda ilk k'ya giremeseler de aday olurlar
+        return fused[:k] + [result for result in fused[k:] if "phrase" in result.leg_ranks]
     
     def rerank_results(self, query: str, documents: List[Document]) -> List[Document]:
-        """Sonuçları yeniden sıralar"""
-        query_lower = query.lower()
-        query_tokens = set(self._tokenize_turkish(query))
-        
-        scored_docs = []
-        for doc in documents:
-            score = 0
-            content_lower = doc.page_content.lower()
-            content_tokens = set(self._tokenize_turkish(doc.page_content))
-            
-            # Exact match bonus
-            if query_lower in content_lower:
-                score += 10
-            
-            # Token overlap bonus
-            overlap = len(query_tokens.intersection(content_tokens))
-            score += overlap * 2
-            
-            # Length penalty (çok kısa metinleri cezalandır)
-            if len(doc.page_content) < 50:
-                score -= 2
-            
-            scored_docs.append((doc, score))
-        
-        # Skora göre sırala
-        scored_docs.sort(key=lambda x: x[1], reverse=True)
-        
-        return [doc for doc, score in scored_docs]
+        """
+        Sonuçları yeniden sıralar: tam ifade, sorgu terimi örtüşmesi ve kısa metin
+        özellikleri tek bir aday × özellik matrisinde `rerank_weights` ile puanlanır.
+        """
+        return feature_reranker.rerank(
+            query, documents, self.keyword_index, self.positional_index, self.rerank_weights
+        )
     
     def search_documents(self, query: str, k: int = 6):
         """Gelişmiş arama: hibrit + reranking"""
+        return [result.document for result in self.search_documents_scored(query, k)]
+    
+    def search_documents_scored(self, query: str, k: int = 6) -> List[FusedResult]:
+        """`search_documents`; sonuçlar rerank sırasında, füzyon ve bacak skorlarıyla"""
         # Hibrit arama
-        results = self.hybrid_search(query, k=k*2)  # Daha fazla sonuç al
+        results = self.hybrid_search_scored(query, k=k*2)  # Daha fazla sonuç al
         
         # Reranking
         if results:
-            results = self.rerank_results(query, results)
+            results = self._rerank_fused(query, results)
         
         # En iyi k sonucu döndür
         return results[:k]
     
+    def _rerank_fused(self, query: str, results: List[FusedResult]) -> List[FusedResult]:
+        """Füzyon sonuçlarını `rerank_results` sırasına dizer"""
+        by_document = {id(result.document): result for result in results}
+        reranked = self.rerank_results(query, [result.document for result in results])
+        return [by_document[id(doc)] for doc in reranked]
+    
+    async def search_documents_async(self, query: str, k: int = 6) -> Tuple[List[Document], dict]:
+        """
+        `search_documents`in async sürümü (web katmanı için).
+
+        Returns:
+            (en iyi k doküman, bacak süreleri + rerank_ms)
+        """
+        results, timings = await self.search_documents_scored_async(query, k)
+        return [result.document for result in results], timings
+    
+    async def search_documents_scored_async(self, query: str, k: int = 6) -> Tuple[List[FusedResult], dict]:
+        """`search_documents_scored`ın async sürümü; (sonuçlar, süreler) döndürür"""
+        results, timings = await self.hybrid_search_async(query, k=k*2)
+        if results:
+            loop = asyncio.get_running_loop()
+            results, rerank_ms = await loop.run_in_executor(
+                self.search_executor, _timed, self._rerank_fused, query, results
+            )
+            timings["rerank_ms"] = round(rerank_ms, 2)
+        return results[:k], timings
+    
+    def search_documents_batch(self, queries: List[str], k: int = 6) -> List[List[Document]]:
+        """
+        Birden fazla soru için `search_documents`: semantic aşama tüm sorgular
+        için tek batch'te çalışır, keyword/ifade araması ve reranking sorgu
+        başınadır.
+
+        Returns:
+            Her sorgu için en iyi k doküman.
+        """
+        print(f"🔍 {len(queries)} sorgu için toplu hibrit arama yapılıyor...")
+        # search_documents ile aynı aday sayıları: hybrid_search(k*2) -> semantic k
+        semantic = self._semantic_search_batch_scored(queries, k)
+        batch_results = []
+        for query, semantic_results in zip(queries, semantic):
+            results = self._merge_hybrid(query, semantic_results, self.keyword_search(query, k=k), k * 2)
+            if results:
+                results = self._rerank_fused(query, results)
+            batch_results.append([result.document for result in results[:k]])
+        return batch_results
+    
     def generate_answer(self, question: str, context_docs: List[Document]) -> str:
-        """LLM ile yanıt üretir"""
-        # Belgeleri sayfa numarasına göre sırala
-        context_docs = sorted(context_docs, key=lambda x: x.metadata.get('page', 0))
-        
-        # Belgeleri tek bir metin haline getir
-        context = "\n\n".join([
-            f"Sayfa {doc.metadata.get('page', '?')}: {doc.page_content}" 
-            for doc in context_docs
-        ])
+        """LLM ile yanıt üretir (benzer soru aynı belgelerle yanıtlandıysa önbellekten)"""
+        cached, keys = self._lookup_answer(question, context_docs)
+        if cached is not None:
+            print("⚡ Yanıt önbellekten alındı")
+            self._store_answer(question, keys, cached)
+            self.last_context_stats = {}  # Prompt kurulmadı
+            return cached
         
-        # Prompt'u oluştur
-        formatted_prompt = self.prompt_template.format(
-            context=context, 
-            question=question
-        )
+        formatted_prompt = self._format_prompt(question, context_docs)
         
         print("🤖 Ollama ile yanıt üretiliyor...")
         response = self.llm.invoke(formatted_prompt)
+        self._store_answer(question, keys, response)
         return response
     
+    def generate_answer_stream(self, question: str, context_docs: List[Document]) -> Iterator[str]:
+        """`generate_answer`ın akış sürümü: yanıt parçalarını Ollama ürettikçe verir"""
+        cached, keys = self._lookup_answer(question, context_docs)
+        if cached is not None:
+            print("⚡ Yanıt önbellekten alındı")
+            self._store_answer(question, keys, cached)
+            self.last_context_stats = {}  # Prompt kurulmadı
+            yield cached
+            return
+        
+        formatted_prompt = self._format_prompt(question, context_docs)
+        
+        print("🤖 Ollama ile yanıt akışı başlatılıyor...")
+        chunks = []
+        for chunk in self.llm.stream(formatted_prompt):
+            if chunk:
+                chunks.append(chunk)
+                yield chunk
+        # Sadece tamamlanan yanıtlar önbelleğe girer (istemci koparsa buraya gelinmez)
+        self._store_answer(question, keys, "".join(chunks))
+    
+    def _lookup_answer(self, question: str, context_docs: List[Document]):
+        """
+        Yanıtı önce kalıcı depoda (birebir: soru, sıralı chunk id'leri, model,
+        şablon), sonra anlamsal önbellekte arar.
+
+        Returns:
+            (yanıt veya None, (depo anahtarı, önbellek anahtarı)); anahtarlar
+            yanıtın henüz yazılmadığı yerler içindir.
+        """
+        store_key = cache_key = None
+        if self.answer_store is not None:
+            store_key = (
+                question,
+                [chunk_key(doc) for doc in context_docs],
+                self.llm.model,
+                self._prompt_hash()
+            )
+            answer = self.answer_store.get(*store_key)
+            if answer is not None:
+                return answer, (None, None)
+        if self.answer_cache is not None:
+            # Soru vektörü aramada zaten hesaplandığı için sorgu önbelleğinden gelir
+            cache_key = (self.embeddings.embed_query(question), evidence_key(context_docs))
+            answer = self.answer_cache.lookup(*cache_key)
+            if answer is not None:
+                return answer, (store_key, None)
+        return None, (store_key, cache_key)
+    
+    def _store_answer(self, question: str, keys, answer: str):
+        store_key, cache_key = keys
+        if not answer:
+            return
+        if store_key is not None:
+            self.answer_store.put(*store_key, answer)
+        if cache_key is not None:
+            self.answer_cache.put(question, *cache_key, answer)
+    
+    def _format_prompt(self, question: str, context_docs: List[Document]) -> str:
+        """
+        Bağlamı kurup prompt'u oluşturur: aynı sayfanın örtüşen chunk'ları
+        birleştirilir, chunk'lar alaka sırasıyla `context_token_budget`e kadar
+        eklenir, bloklar sayfa sırasıyla yazılır.
+        """
+        packed = pack_context(context_docs, self.context_token_budget)
+        stats = self.last_context_stats = packed.stats
+        print(f"🧩 Bağlam: {stats['tokens_after']} token, {stats['tokens_saved']} token tasarruf "
+              f"({stats['merged_chunks']} chunk birleşti, {stats['dropped_chunks']} chunk bütçeye sığmadı)")
+        
+        # Prompt'u oluştur
+        return self.prompt_template.format(
+            context=packed.text, 
+            question=question
+        )
+    
+    def _prompt_hash(self) -> str:
+        """Prompt şablonu ve bağlam ayarlarının hash'i (kalıcı yanıt anahtarı için)"""
+        template = self.prompt_template.format(context="{context}", question="{question}")
+        return template_hash(f"{template}\0{self.context_token_budget}")
+    
+    def context_k(self, k: int) -> int:
+        """Bağlam için aranacak sonuç sayısı (adaptive_k açıksa adaptive_max_k)"""
+        return self.adaptive_max_k if self.adaptive_k else k
+    
+    def choose_context(self, question: str, results: List[FusedResult]) -> List[FusedResult]:
+        """
+        LLM'e gidecek sonuçlar. `adaptive_k` açıksa füzyon skoru en yüksek k
+        sonuç seçilir (k skor boşluklarından, aynı sıralamada hesaplanır), rerank
+        sırası korunur ve karar `adaptive_k_log_path`e yazılır.
+        """
+        if not self.adaptive_k:
+            return results
+        scores = [result.score for result in results]
+        k = adaptive_k(scores, self.adaptive_min_k, self.adaptive_max_k, self.adaptive_max_drop)
+        print(f"📏 Uyarlanır bağlam: {k}/{len(results)} belge")
+        if self.adaptive_k_log_path:
+            record = {
+                "time": round(time.time(), 3),
+                "question": question,
+                "k": k,
+                "candidates": len(results),
+                "scores": [round(score, 6) for score in sorted(scores, reverse=True)],
+                "min_k": self.adaptive_min_k,
+                "max_k": self.adaptive_max_k,
+                "max_drop": self.adaptive_max_drop,
+                "fusion_method": self.fusion_method,
+            }
+            with self._lazy_lock, open(self.adaptive_k_log_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        # Kesim füzyon sırasında yapılır; seçilenler rerank sırasıyla döner
+        by_score = sorted(range(len(results)), key=lambda i: -results[i].score)
+        kept = set(by_score[:k])
+        return [result for i, result in enumerate(results) if i in kept]
+    
     def ask(self, question: str, k: int = 6):
         """Tam RAG işlemi: gelişmiş arama + yanıt üretme"""
         print(f"\n{'='*70}")
@@ -289,7 +1230,8 @@ Yanıt: Verilen belgelere dayanarak,""")
         print(f"{'='*70}")
         
         # 1. Gelişmiş arama
-        context_docs = self.search_documents(question, k=k)
+        results = self.search_documents_scored(question, k=self.context_k(k))
+        context_docs = [result.document for result in self.choose_context(question, results)]
         
         if not context_docs:
             return "❌ İlgili belge bulunamadı."
@@ -2,11 +2,13 @@
 # -*- coding: utf-8 -*-
 
 from fastapi import FastAPI, Request, Form
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 import uvicorn
 from improved_rag_system import ImprovedNutukRAGSystem
+import json
 import os
 import time
 
@@ -59,21 +61,18 @@ async def ask_question(request: Request, question: str = Form(...)):
     try:
         start_time = time.time()
         
-        # Soruyu yanıtla
-        context_docs = rag_system.search_documents(question, k=6)
-        answer = rag_system.generate_answer(question, context_docs)
+        # Soruyu yanıtla (arama bacakları event loop'u bloklamadan paralel çalışır)
+        scored, timings = await rag_system.search_documents_scored_async(question, k=rag_system.context_k(6))
+        # Bağlam seçimi ve Ollama çağrısı bloklayıcı; event loop'u tutmasınlar
+        scored = await run_in_threadpool(rag_system.choose_context, question, scored)
+        answer = await run_in_threadpool(rag_system.generate_answer, question,
+                                         [result.document for result in scored])
         
         end_time = time.time()
         duration = end_time - start_time
         
         # Kaynak belgeleri hazırla
-        sources = []
-        for i, doc in enumerate(context_docs, 1):
-            sources.append({
-                "index": i,
-                "page": doc.metadata.get('page', '?'),
-                "content": doc.page_content[:200] + "..." if len(doc.page_content) > 200 else doc.page_content
-            })
+        sources = source_entries(scored)
         
         return JSONResponse({
             "success": True,
@@ -81,6 +80,8 @@ async def ask_question(request: Request, question: str = Form(...)):
             "answer": answer,
             "sources": sources,
             "duration": round(duration, 2),
+            "timings": timings,
+            "context": rag_system.last_context_stats,
             "source_count": len(sources)
         })
         
@@ -90,6 +91,87 @@ async def ask_question(request: Request, question: str = Form(...)):
             "error": f"Bir hata oluştu: {str(e)}"
         })
 
+@app.post("/ask/stream")
+async def ask_question_stream(request: Request, question: str = Form(...)):
+    """
+    Soru sor, yanıtı Server-Sent Events ile parça parça al.
+
+    Olaylar: önce "sources" (kaynaklar ve arama süreleri), sonra her yanıt
+    parçası için "token", en son "done"; hata olursa "error".
+    """
+    global rag_system
+    
+    if not rag_system:
+        return JSONResponse({
+            "success": False,
+            "error": "RAG sistemi henüz yüklenmedi. Lütfen bekleyin."
+        })
+    
+    if not question or not question.strip():
+        return JSONResponse({
+            "success": False,
+            "error": "Lütfen bir soru yazın."
+        })
+    
+    async def events():
+        start_time = time.time()
+        tokens = None
+        try:
+            scored, timings = await rag_system.search_documents_scored_async(question, k=rag_system.context_k(6))
+            scored = await run_in_threadpool(rag_system.choose_context, question, scored)
+            sources = source_entries(scored)
+            # Kaynaklar yanıttan önce gider; kullanıcı kanıtı hemen görür
+            yield sse_event("sources", {
+                "question": question,
+                "sources": sources,
+                "timings": timings,
+                "source_count": len(sources)
+            })
+            
+            if await request.is_disconnected():
+                return
+            
+            # Ollama akışı bloklayıcı; parçalar thread havuzundan okunur
+            tokens = rag_system.generate_answer_stream(question, [result.document for result in scored])
+            async for token in iterate_in_threadpool(tokens):
+                if await request.is_disconnected():
+                    break
+                yield sse_event("token", {"text": token})
+            
+            yield sse_event("done", {"duration": round(time.time() - start_time, 2)})
+        except Exception as e:
+            yield sse_event("error", {"error": f"Bir hata oluştu: {str(e)}"})
+        finally:
+            # İstemci koptuğunda Ollama akışı da kapanır, boşa üretim sürmez
+            if tokens is not None:
+                try:
+                    tokens.close()
+                except ValueError:
+                    # Parça hâlâ thread'de okunuyor; üretici o dönünce çöpe gider
+                    pass
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"  # Ters vekil (nginx) arabelleğe almasın
+    })
+
+def source_entries(scored):
+    """Arama sonuçlarını yanıttaki kaynak listesine çevirir"""
+    sources = []
+    for i, result in enumerate(scored, 1):
+        doc = result.document
+        sources.append({
+            "index": i,
+            "page": doc.metadata.get('page', '?'),
+            "content": doc.page_content[:200] + "..." if len(doc.page_content) > 200 else doc.page_content,
+            **result.as_dict()
+        })
+    return sources
+
+def sse_event(event: str, data: dict) -> str:
+    """Tek bir Server-Sent Events mesajı (veri JSON)"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
 @app.get("/health")
 async def health_check():
     """Sistem durumu kontrolü"""
@@ -97,7 +179,47 @@ async def health_check():
     
     return JSONResponse({
         "status": "healthy" if rag_system else "loading",
-        "system_ready": rag_system is not None
+        "system_ready": rag_system is not None,
+        "query_cache": rag_system.query_cache_stats() if rag_system else {},
+        "answer_cache": rag_system.answer_cache_stats() if rag_system else {},
+        "answer_store": rag_system.answer_store_stats() if rag_system else {}
+    })
+
+@app.post("/admin/answers/invalidate")
+async def invalidate_answers(request: Request, scope: str = Form("stale")):
+    """
+    Kayıtlı yanıtları geçersiz kılar (yeniden indekslemeden sonra).
+
+    scope="stale": sadece artık indekste olmayan chunk'lara dayanan yanıtlar,
+    scope="all": tüm yanıtlar. NUTUK_ADMIN_TOKEN ortam değişkeni tanımlıysa
+    aynı değer X-Admin-Token başlığında gönderilmelidir.
+    """
+    global rag_system
+    
+    admin_token = os.environ.get("NUTUK_ADMIN_TOKEN")
+    if admin_token and request.headers.get("X-Admin-Token") != admin_token:
+        return JSONResponse({
+            "success": False,
+            "error": "Yetkisiz istek."
+        }, status_code=403)
+    
+    if not rag_system:
+        return JSONResponse({
+            "success": False,
+            "error": "RAG sistemi henüz yüklenmedi."
+        })
+    
+    if scope not in ("stale", "all"):
+        return JSONResponse({
+            "success": False,
+            "error": "scope 'stale' veya 'all' olmalı."
+        })
+    
+    removed = rag_system.invalidate_answers(stale_only=(scope == "stale"))
+    return JSONResponse({
+        "success": True,
+        "scope": scope,
+        "removed": removed
     })
 
 @app.get("/api/search/{query}")
@@ -115,19 +237,21 @@ async def api_search(query: str, k: int = 6):
         start_time = time.time()
         
         # Sadece arama yap
-        context_docs = rag_system.search_documents(query, k=k)
+        scored, timings = await rag_system.search_documents_scored_async(query, k=k)
         
         end_time = time.time()
         duration = end_time - start_time
         
         # Sonuçları hazırla
         results = []
-        for i, doc in enumerate(context_docs, 1):
+        for i, result in enumerate(scored, 1):
+            doc = result.document
             results.append({
                 "index": i,
                 "page": doc.metadata.get('page', '?'),
                 "content": doc.page_content,
-                "preview": doc.page_content[:200] + "..." if len(doc.page_content) > 200 else doc.page_content
+                "preview": doc.page_content[:200] + "..." if len(doc.page_content) > 200 else doc.page_content,
+                **result.as_dict()
             })
         
         return JSONResponse({
@@ -135,6 +259,8 @@ async def api_search(query: str, k: int = 6):
             "query": query,
             "results": results,
             "duration": round(duration, 2),
+            "timings": timings,
+            "fusion_method": rag_system.fusion_method,
             "result_count": len(results)
         })
         
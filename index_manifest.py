@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Artımlı yeniden indeksleme için chunk manifest'i.
+
+Manifest her chunk için içerik hash'ini, sayfasını ve kararlı chunk id'sini;
+ayrıca indeksi oluşturan embedding modelini, splitter ayarlarını ve corpus
+ingestion'da her belgenin durumunu saklar.
+Yeniden oluşturma sırasında eski ve yeni chunk kümeleri karşılaştırılır ve
+yalnızca gereken iş yapılır.
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Iterable, List, Optional
+
+from langchain.schema import Document
+
+MANIFEST_VERSION = 1
+
+
+def content_hash(text: str) -> str:
+    """Chunk metninin SHA-256 hash'ini döndürür"""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def assign_chunk_ids(chunks: List[Document]) -> List[Document]:
+    """
+    Chunk'lara kararlı id, içerik hash'i ve sayfa içi sıra numarası ekler.
+
+    Id; kaynak, sayfa ve içerik hash'inden türetilir. Böylece metni değişmeyen
+    bir chunk her yeniden oluşturmada aynı id'yi alır. Aynı sayfada birebir
+    aynı metin birden fazla kez geçerse id'ye sıra eki eklenir.
+
+    Args:
+        chunks: Parçalara ayrılmış Document listesi (yerinde güncellenir).
+
+    Returns:
+        Aynı liste (kolay zincirleme için).
+    """
+    seen: Dict[str, int] = {}
+    page_positions: Dict[tuple, int] = {}
+    for chunk in chunks:
+        source = str(chunk.metadata.get("source", ""))
+        page = chunk.metadata.get("page", 0)
+        text_hash = content_hash(chunk.page_content)
+
+        base_id = hashlib.sha1(f"{source}\x00{page}\x00{text_hash}".encode("utf-8")).hexdigest()[:16]
+        occurrence = seen.get(base_id, 0)
+        seen[base_id] = occurrence + 1
+        chunk_id = base_id if occurrence == 0 else f"{base_id}-{occurrence}"
+
+        position = page_positions.get((source, page), 0)
+        page_positions[(source, page)] = position + 1
+
+        chunk.metadata["chunk_id"] = chunk_id
+        chunk.metadata["content_hash"] = text_hash
+        chunk.metadata["chunk_index"] = position
+    return chunks
+
+
+class ManifestDiff:
+    """Eski manifest ile yeni chunk kümesi arasındaki fark"""
+
+    def __init__(self, added: List[Document], removed_ids: List[str], unchanged: int):
+        self.added = added
+        self.removed_ids = removed_ids
+        self.unchanged = unchanged
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.added and not self.removed_ids
+
+    def __repr__(self):
+        return (f"ManifestDiff(added={len(self.added)}, removed={len(self.removed_ids)}, "
+                f"unchanged={self.unchanged})")
+
+
+class IndexManifest:
+    """İndekslenmiş chunk'ları ve indeks ayarlarını kaydeden manifest"""
+
+    def __init__(self, embedding_model: str, chunk_size: int, chunk_overlap: int,
+                 chunks: Optional[Dict[str, dict]] = None,
+                 documents: Optional[Dict[str, dict]] = None):
+        self.embedding_model = embedding_model
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        # chunk_id -> {"hash": ..., "page": ..., "source": ...}
+        self.chunks = chunks or {}
+        # source_id -> belge durumu (corpus ingestion)
+        self.documents = documents or {}
+
+    @classmethod
+    def from_chunks(cls, chunks: List[Document], embedding_model: str,
+                    chunk_size: int, chunk_overlap: int) -> "IndexManifest":
+        """assign_chunk_ids ile işaretlenmiş chunk'lardan manifest oluşturur"""
+        manifest = cls(embedding_model, chunk_size, chunk_overlap)
+        manifest.update_chunks(chunks)
+        return manifest
+
+    @staticmethod
+    def _entry(metadata: dict) -> dict:
+        entry = {
+            "hash": metadata["content_hash"],
+            "page": metadata.get("page", 0),
+            "source": str(metadata.get("source", "")),
+        }
+        if "source_id" in metadata:
+            entry["source_id"] = metadata["source_id"]
+        return entry
+
+    @classmethod
+    def load(cls, path: str) -> Optional["IndexManifest"]:
+        """Manifest'i diskten okur; yoksa veya sürümü uyumsuzsa None döner"""
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != MANIFEST_VERSION:
+            return None
+        return cls(
+            data["embedding_model"],
+            data["chunk_size"],
+            data["chunk_overlap"],
+            data.get("chunks", {}),
+            data.get("documents", {}),
+        )
+
+    def save(self, path: str):
+        """Manifest'i atomik olarak diske yazar"""
+        data = {
+            "version": MANIFEST_VERSION,
+            "embedding_model": self.embedding_model,
+            "chunk_size": self.chunk_size,
+            "chunk_overlap": self.chunk_overlap,
+            "chunks": self.chunks,
+            "documents": self.documents,
+        }
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def settings_changes(self, embedding_model: str, chunk_size: int, chunk_overlap: int) -> List[str]:
+        """Manifest'teki ayarlardan farklı olanların adlarını döndürür"""
+        changes = []
+        if self.embedding_model != embedding_model:
+            changes.append("embedding_model")
+        if self.chunk_size != chunk_size:
+            changes.append("chunk_size")
+        if self.chunk_overlap != chunk_overlap:
+            changes.append("chunk_overlap")
+        return changes
+
+    def mark_documents_stale(self, reason: str) -> List[str]:
+        """
+        İndekslenmiş corpus belgelerini eski ayarlarla indekslenmiş olarak işaretler;
+        `plan_corpus` bir sonraki `ingest_corpus` çalıştırmasında onları yeniden işler.
+
+        Returns:
+            İşaretlenen source_id'ler.
+        """
+        stale = []
+        for source_id, status in self.documents.items():
+            if status.get("status") == "indexed":
+                status["status"] = "stale"
+                status["stale_reason"] = reason
+                stale.append(source_id)
+        return stale
+
+    def chunk_ids(self, source: Optional[str] = None, source_id: Optional[str] = None) -> List[str]:
+        """
+        Manifest'teki chunk id'leri; source (PDF yolu) veya source_id (corpus
+        belgesi) verilirse sadece o kaynağa ait olanlar.
+        """
+        if source is None and source_id is None:
+            return list(self.chunks)
+        return [chunk_id for chunk_id, entry in self.chunks.items()
+                if (source is None or entry["source"] == source)
+                and (source_id is None or entry.get("source_id") == source_id)]
+
+    def update_chunks(self, chunks: List[Document], source: Optional[str] = None,
+                      source_id: Optional[str] = None):
+        """
+        Bir kaynağın chunk kayıtlarını yenileriyle değiştirir.
+
+        Args:
+            chunks: assign_chunk_ids ile işaretlenmiş yeni chunk'lar.
+            source: Verilirse önce bu kaynağın eski kayıtları silinir.
+            source_id: Verilirse önce bu corpus belgesinin eski kayıtları silinir
+                (yol nasıl yazılmış olursa olsun).
+        """
+        self.update_entries((chunk.metadata for chunk in chunks), source, source_id)
+
+    def update_entries(self, metadatas: Iterable[dict], source: Optional[str] = None,
+                       source_id: Optional[str] = None):
+        """`update_chunks`; chunk metni gerekmez, sadece metadata'lar verilir"""
+        if source is not None or source_id is not None:
+            for chunk_id in self.chunk_ids(source, source_id):
+                del self.chunks[chunk_id]
+        for metadata in metadatas:
+            self.chunks[metadata["chunk_id"]] = self._entry(metadata)
+
+    def diff(self, new_chunks: Iterable[Document], source: Optional[str] = None,
+             source_id: Optional[str] = None) -> ManifestDiff:
+        """
+        Yeni chunk kümesini manifest ile karşılaştırır.
+
+        Args:
+            new_chunks: assign_chunk_ids ile işaretlenmiş chunk'lar; bir kez
+                dolaşılır, sadece eklenecek olanlar saklanır.
+            source: Verilirse sadece bu kaynağın eski chunk'ları silinmeye aday olur;
+                aynı indeksteki diğer belgelere dokunulmaz.
+            source_id: `source` gibi, ama corpus belgesinin kimliğiyle.
+
+        Returns:
+            Eklenecek chunk'lar ve silinecek chunk id'leri.
+        """
+        new_ids = set()
+        added = []
+        for chunk in new_chunks:
+            chunk_id = chunk.metadata["chunk_id"]
+            new_ids.add(chunk_id)
+            if chunk_id not in self.chunks:
+                added.append(chunk)
+        removed_ids = [chunk_id for chunk_id in self.chunk_ids(source, source_id) if chunk_id not in new_ids]
+        unchanged = len(new_ids) - len(added)
+        return ManifestDiff(added, removed_ids, unchanged)
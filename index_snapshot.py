@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Arama indekslerinin tek dosyalık, bellek eşlemeli anlık görüntüsü (snapshot).
+
+Keyword, pozisyonel ve köklenmiş indeksler ile chunk embedding matrisi tek bir
+dosyada, 64 bayta hizalanmış bölümler (section) olarak durur. Dosya düzeni:
+
+    magic (8 bayt) | sürüm, bölüm sayısı | içindekiler tablosu | bölümler...
+
+İçindekiler tablosu her bölüm için ad, dtype, boyut ve ofset tutar. Yükleme
+dosyayı bir kez `mmap` ile açar ve her bölüm için `np.frombuffer` ile kopyasız
+bir görünüm döndürür; pickle veya JSON çözümlemesi yapılmaz, bu yüzden bir
+snapshot'ı açmak kod çalıştıramaz.
+
+Chunk id'leri, terimler ve metadata gibi metin tabloları da bölüm olarak
+saklanır (`StringTable`): UTF-8 blob + ofsetler + ikili arama için sıralama
+permütasyonu. Elemanlar erişildikçe çözülür.
+"""
+
+import json
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+
+SNAPSHOT_VERSION = 1
+
+_MAGIC = b"NUTUKIDX"
+_HEADER = struct.Struct("<8sII")  # magic, sürüm, bölüm sayısı
+_ENTRY = struct.Struct("<48s8sIQQQQ")  # ad, dtype, boyut sayısı, boyutlar (2), ofset, bayt
+_ALIGNMENT = 64
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGNMENT - 1) // _ALIGNMENT * _ALIGNMENT
+
+
+def write_snapshot(path: str, sections: Dict[str, np.ndarray]):
+    """
+    Bölümleri tek bir snapshot dosyasına yazar.
+
+    Dosya yeni adla yazılıp değiştirilir: eski snapshot'ın açık mmap'leri
+    geçerli kalır ve yarıda kalan bir yazma mevcut snapshot'ı bozmaz.
+
+    Args:
+        path: Snapshot dosyası.
+        sections: Bölüm adı -> 1 veya 2 boyutlu dizi.
+    """
+    arrays = {name: np.ascontiguousarray(array) for name, array in sections.items()}
+    offset = _aligned(_HEADER.size + _ENTRY.size * len(arrays))
+    entries = []
+    for name, array in arrays.items():
+        if array.ndim > 2:
+            raise ValueError(f"Bölüm en fazla 2 boyutlu olabilir: {name}")
+        shape = tuple(array.shape) + (0,) * (2 - array.ndim)
+        entries.append(_ENTRY.pack(name.encode("utf-8"), array.dtype.str.encode("ascii"),
+                                   array.ndim, shape[0], shape[1], offset, array.nbytes))
+        offset = _aligned(offset + array.nbytes)
+
+    with open(f"{path}.tmp", "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, SNAPSHOT_VERSION, len(arrays)))
+        for entry in entries:
+            f.write(entry)
+        for entry, array in zip(entries, arrays.values()):
+            start = _ENTRY.unpack(entry)[5]
+            f.write(b"\0" * (start - f.tell()))
+            f.write(array.tobytes())
+    os.replace(f"{path}.tmp", path)
+
+
+def open_snapshot(path: str) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Snapshot'ı bellek eşlemeli açar.
+
+    Returns:
+        Bölüm adı -> salt okunur dizi görünümü; dosya yoksa veya biçimi/sürümü
+        farklıysa None.
+    """
+    if not os.path.exists(path) or os.path.getsize(path) < _HEADER.size:
+        return None
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    magic, version, count = _HEADER.unpack_from(buffer, 0)
+    if magic != _MAGIC or version != SNAPSHOT_VERSION:
+        buffer.close()
+        return None
+
+    sections = {}
+    for i in range(count):
+        name, dtype, ndim, rows, cols, offset, nbytes = _ENTRY.unpack_from(
+            buffer, _HEADER.size + i * _ENTRY.size
+        )
+        dtype = np.dtype(dtype.rstrip(b"\0").decode("ascii"))
+        shape = (rows, cols)[:ndim]
+        if nbytes:
+            array = np.frombuffer(buffer, dtype=dtype, count=nbytes // dtype.itemsize, offset=offset)
+        else:
+            array = np.zeros(0, dtype=dtype)
+        sections[name.rstrip(b"\0").decode("utf-8")] = array.reshape(shape)
+    return sections
+
+
+class StringTable:
+    """
+    Snapshot bölümlerinde saklanan, kopyasız okunan metin listesi.
+
+    `index_of` metinden pozisyona, sıralama permütasyonu üzerinde ikili arama
+    ile gider; yüklerken sözlük kurulmaz.
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray, order: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+        self.order = order
+        self._sorted_keys = None  # indices_of için, ilk kullanımda kurulur
+
+    @classmethod
+    def from_strings(cls, strings: Iterable[str]) -> "StringTable":
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        order = np.array(sorted(range(len(encoded)), key=encoded.__getitem__), dtype=np.int64)
+        return cls(np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets, order)
+
+    @classmethod
+    def from_sections(cls, sections: Dict[str, np.ndarray], prefix: str) -> Optional["StringTable"]:
+        try:
+            return cls(sections[f"{prefix}.blob"], sections[f"{prefix}.offsets"], sections[f"{prefix}.order"])
+        except KeyError:
+            return None
+
+    def to_sections(self, prefix: str) -> Dict[str, np.ndarray]:
+        return {f"{prefix}.blob": self.blob, f"{prefix}.offsets": self.offsets, f"{prefix}.order": self.order}
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def _bytes(self, i: int) -> bytes:
+        return self.blob[int(self.offsets[i]):int(self.offsets[i + 1])].tobytes()
+
+    def _decode(self, data: bytes):
+        return data.decode("utf-8")
+
+    def __getitem__(self, i: int):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self._decode(self._bytes(i))
+
+    def __iter__(self) -> Iterator:
+        data = self.blob.tobytes()
+        offsets = self.offsets.tolist()
+        for start, end in zip(offsets, offsets[1:]):
+            yield self._decode(data[start:end])
+
+    def index_of(self, value: str) -> Optional[int]:
+        """Metnin pozisyonu; tabloda yoksa None"""
+        target = value.encode("utf-8")
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._bytes(int(self.order[mid])) < target:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self) and self._bytes(int(self.order[lo])) == target:
+            return int(self.order[lo])
+        return None
+
+    def indices_of(self, values: Sequence[str]) -> np.ndarray:
+        """
+        `index_of`un toplu sürümü: tüm metinler tek `searchsorted` ile aranır;
+        tabloda olmayanlar için -1.
+        """
+        positions = np.full(len(values), -1, dtype=np.int64)
+        if not len(values) or not len(self):
+            return positions
+        keys = self._keys()
+        targets = np.array([value.encode("utf-8") for value in values])
+        found = np.minimum(np.searchsorted(keys, targets), len(keys) - 1)
+        hits = keys[found] == targets
+        positions[hits] = self.order[found[hits]]
+        return positions
+
+    def _keys(self) -> np.ndarray:
+        """Sıralama permütasyonu sırasında, sabit genişlikli bytes dizisi (NumPy "S")"""
+        if self._sorted_keys is None:
+            starts = self.offsets[self.order]
+            lengths = self.offsets[self.order + 1] - starts
+            width = max(int(lengths.max()), 1)
+            columns = np.arange(width)
+            gather = np.minimum(starts[:, None] + columns, max(len(self.blob) - 1, 0))
+            blob = self.blob if len(self.blob) else np.zeros(1, dtype=np.uint8)
+            keys = np.where(columns < lengths[:, None], blob[gather], 0).astype(np.uint8)
+            self._sorted_keys = np.ascontiguousarray(keys).view(f"S{width}").ravel()
+        return self._sorted_keys
+
+    def __contains__(self, value: str) -> bool:
+        return self.index_of(value) is not None
+
+
+class JsonTable(StringTable):
+    """Her elemanı bir JSON nesnesi olan tablo (chunk metadata'ları); erişildikçe çözülür"""
+
+    @classmethod
+    def from_objects(cls, objects: Iterable[dict]) -> "JsonTable":
+        return cls.from_strings(json.dumps(obj, ensure_ascii=False) for obj in objects)
+
+    def _decode(self, data: bytes):
+        return json.loads(data)
@@ -0,0 +1,579 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+BM25 keyword araması için bellek eşlemeli ters indeks (inverted index).
+
+`rank_bm25.BM25Okapi` her sorgu terimi için tüm dokümanları dolaşıyor ve
+indeks, her chunk metninin bir kopyasıyla birlikte pickle ediliyordu. Bu
+indeks:
+
+- terim başına sıkıştırılmış posting listeleri (doküman aralıkları + tf),
+- önceden hesaplanmış IDF ve doküman uzunluğu normları,
+- chunk başına terim id'lerinden oluşan ileri (forward) indeks
+
+tutar. Sorgu sadece sorgu terimlerini içeren dokümanları puanlar ve
+BM25Okapi ile aynı skorları üretir. Diziler, terimler, chunk id'leri, metinler
+ve metadata index_snapshot bölümleri olarak yazılır ve bellek eşlemeli açılır;
+pickle kullanılmaz.
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from index_snapshot import JsonTable, StringTable
+
+INDEX_VERSION = 5
+
+# Block-max pruning için posting bloğu uzunluğu
+BLOCK_SIZE = 128
+
+_ARRAY_NAMES = (
+    "postings_offsets", "postings_gaps", "postings_tfs", "idf",
+    "doc_len", "doc_norm", "doc_term_offsets", "doc_terms", "doc_tfs",
+    "text_offsets", "term_max_score", "block_offsets", "block_last_doc", "block_max_score",
+    "char_len",
+)
+
+
+def _with_weights(query_tokens: Sequence[str], weights: Optional[Sequence[float]]):
+    """(token, ağırlık) çiftleri; ağırlık verilmezse her token 1.0"""
+    if weights is None:
+        return ((token, 1.0) for token in query_tokens)
+    return zip(query_tokens, weights)
+
+
+def _smallest_uint(max_value: int):
+    """Değeri tutabilen en küçük işaretsiz tamsayı tipi"""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+class InvertedIndex:
+    """
+    BM25Okapi ile aynı skorları üreten ters indeks.
+
+    Doğrudan oluşturulmaz; `build`, `from_sections` veya `patched` kullanılır.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], terms: StringTable, chunk_ids: StringTable,
+                 metadatas: JsonTable, params: np.ndarray):
+        self.arrays = arrays
+        self.terms = terms
+        self.chunk_ids = chunk_ids
+        self.metadatas = metadatas
+        self._texts = arrays["texts"]  # UTF-8 blob (uint8)
+        self.params = params
+        self.k1, self.b, self.epsilon, self.avgdl, self.average_idf = (float(p) for p in params)
+
+        for name in _ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+
+    # ------------------------------------------------------------------ #
+    # Oluşturma
+    # ------------------------------------------------------------------ #
+    @classmethod
+    def build(cls, chunk_ids: Sequence[str], texts: Sequence[str], metadatas: Sequence[dict],
+              tokenized_texts: Sequence[Sequence[str]],
+              k1: float = 1.5, b: float = 0.75, epsilon: float = 0.25) -> "InvertedIndex":
+        """
+        Tokenize edilmiş chunk'lardan indeks oluşturur.
+
+        Args:
+            chunk_ids: Chunk id'leri (ChromaDB id'leriyle aynı).
+            texts: Chunk metinleri.
+            metadatas: Chunk metadata'ları.
+            tokenized_texts: Her chunk'ın token listesi.
+            k1, b, epsilon: BM25Okapi parametreleri.
+        """
+        term_to_id: Dict[str, int] = {}
+        token_ids = []
+        token_docs = []
+        for doc, tokens in enumerate(tokenized_texts):
+            for token in tokens:
+                term_id = term_to_id.get(token)
+                if term_id is None:
+                    term_id = term_to_id[token] = len(term_to_id)
+                token_ids.append(term_id)
+            token_docs.append(len(tokens))
+
+        terms = list(term_to_id)
+        doc_len = np.array(token_docs, dtype=np.int64)
+        token_ids = np.array(token_ids, dtype=np.int64)
+        token_doc_ids = np.repeat(np.arange(len(doc_len), dtype=np.int64), doc_len)
+
+        # İleri indeks: her doküman için sıralı (terim id, tf) çiftleri
+        vocab_size = max(len(terms), 1)
+        keys, counts = np.unique(token_doc_ids * vocab_size + token_ids, return_counts=True)
+        entry_docs = keys // vocab_size
+        entry_terms = keys % vocab_size
+
+        return cls._from_forward(
+            list(chunk_ids), list(texts), list(metadatas), terms,
+            entry_docs, entry_terms, counts, doc_len, k1, b, epsilon
+        )
+
+    @classmethod
+    def _from_forward(cls, chunk_ids: List[str], texts: List[str], metadatas: List[dict],
+                      terms: List[str], entry_docs: np.ndarray, entry_terms: np.ndarray,
+                      entry_tfs: np.ndarray, doc_len: np.ndarray,
+                      k1: float, b: float, epsilon: float) -> "InvertedIndex":
+        """İleri indeks girdilerinden (doküman sırasına göre) tüm dizileri üretir"""
+        doc_count = len(chunk_ids)
+
+        # Hiçbir dokümanda geçmeyen terimleri at, terim sırasını koru
+        df = np.bincount(entry_terms, minlength=len(terms))
+        live = df > 0
+        if not live.all():
+            remap = np.cumsum(live) - 1
+            entry_terms = remap[entry_terms]
+            terms = [term for term, keep in zip(terms, live) if keep]
+            df = df[live]
+        vocab_size = len(terms)
+
+        doc_term_offsets = np.zeros(doc_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(entry_docs, minlength=doc_count), out=doc_term_offsets[1:])
+
+        # Ters indeks: terim, sonra doküman sırasına göre
+        order = np.lexsort((entry_docs, entry_terms))
+        postings_docs = entry_docs[order]
+        postings_tfs = entry_tfs[order]
+        postings_offsets = np.zeros(vocab_size + 1, dtype=np.int64)
+        np.cumsum(df, out=postings_offsets[1:])
+
+        # Doküman id'lerini terim içinde fark (gap) olarak sakla
+        gaps = postings_docs.copy()
+        if len(gaps):
+            gaps[1:] -= postings_docs[:-1]
+            starts = postings_offsets[:-1][df > 0]
+            gaps[starts] = postings_docs[starts]
+        gap_dtype = _smallest_uint(int(gaps.max()) if len(gaps) else 0)
+        tf_dtype = _smallest_uint(int(entry_tfs.max()) if len(entry_tfs) else 0)
+
+        # IDF: BM25Okapi._calc_idf ile aynı formül ve aynı toplama sırası
+        idf = np.zeros(vocab_size, dtype=np.float64)
+        idf_sum = 0.0
+        negative = []
+        for term_id, freq in enumerate(df.tolist()):
+            value = math.log(doc_count - freq + 0.5) - math.log(freq + 0.5)
+            idf[term_id] = value
+            idf_sum += value
+            if value < 0:
+                negative.append(term_id)
+        average_idf = idf_sum / vocab_size if vocab_size else 0.0
+        if negative:
+            idf[negative] = epsilon * average_idf
+
+        avgdl = float(doc_len.sum()) / doc_count if doc_count else 0.0
+        if avgdl:
+            doc_norm = k1 * (1 - b + b * doc_len / avgdl)
+        else:
+            doc_norm = np.full(doc_count, k1 * (1 - b), dtype=np.float64)
+
+        # Terim ve blok başına skor üst sınırları (dinamik budama için)
+        posting_terms = np.repeat(np.arange(vocab_size, dtype=np.int64), df)
+        tf_float = postings_tfs.astype(np.float64)
+        contributions = idf[posting_terms] * (tf_float * (k1 + 1) / (tf_float + doc_norm[postings_docs]))
+        block_counts = (df + BLOCK_SIZE - 1) // BLOCK_SIZE
+        block_offsets = np.zeros(vocab_size + 1, dtype=np.int64)
+        np.cumsum(block_counts, out=block_offsets[1:])
+        block_starts = np.repeat(postings_offsets[:-1], block_counts) + BLOCK_SIZE * (
+            np.arange(int(block_offsets[-1]), dtype=np.int64) - np.repeat(block_offsets[:-1], block_counts)
+        )
+        block_ends = np.minimum(block_starts + BLOCK_SIZE, np.repeat(postings_offsets[1:], block_counts))
+        if len(block_starts):
+            block_max_score = np.maximum.reduceat(contributions, block_starts)
+            block_last_doc = postings_docs[block_ends - 1]
+            term_max_score = np.maximum.reduceat(block_max_score, block_offsets[:-1])
+        else:
+            block_max_score = np.zeros(0, dtype=np.float64)
+            block_last_doc = np.zeros(0, dtype=np.int64)
+            term_max_score = np.zeros(vocab_size, dtype=np.float64)
+
+        encoded = [text.encode("utf-8") for text in texts]
+        text_offsets = np.zeros(doc_count + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=text_offsets[1:])
+
+        arrays = {
+            "postings_offsets": postings_offsets,
+            "postings_gaps": gaps.astype(gap_dtype),
+            "postings_tfs": postings_tfs.astype(tf_dtype),
+            "idf": idf,
+            "doc_len": doc_len.astype(np.int32),
+            "doc_norm": doc_norm.astype(np.float64),
+            "doc_term_offsets": doc_term_offsets,
+            "doc_terms": entry_terms.astype(np.int32),
+            "doc_tfs": entry_tfs.astype(tf_dtype),
+            "text_offsets": text_offsets,
+            "term_max_score": term_max_score,
+            "block_offsets": block_offsets,
+            "block_last_doc": block_last_doc.astype(np.int64),
+            "block_max_score": block_max_score,
+            "char_len": np.array([len(text) for text in texts], dtype=np.int64),
+        }
+        arrays["texts"] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        params = np.array([k1, b, epsilon, avgdl, average_idf], dtype=np.float64)
+        return cls(arrays, StringTable.from_strings(terms), StringTable.from_strings(chunk_ids),
+                   JsonTable.from_objects(metadatas), params)
+
+    def patched(self, removed_ids: Iterable[str], added_ids: Sequence[str], added_texts: Sequence[str],
+                added_metadatas: Sequence[dict],
+                added_tokens: Sequence[Sequence[str]]) -> "InvertedIndex":
+        """
+        Silinen chunk'ları çıkarıp yenilerini ekleyerek yeni bir indeks döndürür.
+
+        Değişmeyen chunk'lar yeniden tokenize edilmez; ileri indeksteki terim
+        id'leri ve frekansları olduğu gibi kullanılır.
+        """
+        removed = set(removed_ids)
+        old_ids = list(self.chunk_ids)
+        keep = np.array([chunk_id not in removed for chunk_id in old_ids], dtype=bool)
+        kept_positions = np.flatnonzero(keep)
+
+        # Korunan dokümanların ileri indeks girdileri
+        entry_counts = np.diff(self.doc_term_offsets)
+        entry_mask = np.repeat(keep, entry_counts)
+        new_doc_numbers = np.cumsum(keep) - 1
+        entry_docs = np.repeat(new_doc_numbers, entry_counts)[entry_mask].astype(np.int64)
+        entry_terms = np.asarray(self.doc_terms)[entry_mask].astype(np.int64)
+        entry_tfs = np.asarray(self.doc_tfs)[entry_mask].astype(np.int64)
+        doc_len = np.asarray(self.doc_len)[keep].astype(np.int64)
+
+        # Yeni dokümanlar: mevcut sözlüğü genişlet
+        terms = list(self.terms)
+        term_to_id = {term: i for i, term in enumerate(terms)}
+        new_docs, new_terms, new_tfs, new_lens = [], [], [], []
+        for offset, tokens in enumerate(added_tokens):
+            doc = len(kept_positions) + offset
+            frequencies: Dict[int, int] = {}
+            for token in tokens:
+                term_id = term_to_id.get(token)
+                if term_id is None:
+                    term_id = term_to_id[token] = len(terms)
+                    terms.append(token)
+                frequencies[term_id] = frequencies.get(term_id, 0) + 1
+            for term_id in sorted(frequencies):
+                new_docs.append(doc)
+                new_terms.append(term_id)
+                new_tfs.append(frequencies[term_id])
+            new_lens.append(len(tokens))
+
+        entry_docs = np.concatenate([entry_docs, np.array(new_docs, dtype=np.int64)])
+        entry_terms = np.concatenate([entry_terms, np.array(new_terms, dtype=np.int64)])
+        entry_tfs = np.concatenate([entry_tfs, np.array(new_tfs, dtype=np.int64)])
+        doc_len = np.concatenate([doc_len, np.array(new_lens, dtype=np.int64)])
+
+        chunk_ids = [old_ids[i] for i in kept_positions] + list(added_ids)
+        texts = [self.text(i) for i in kept_positions] + list(added_texts)
+        metadatas = [self.metadatas[i] for i in kept_positions] + list(added_metadatas)
+        return self._from_forward(
+            chunk_ids, texts, metadatas, terms, entry_docs, entry_terms, entry_tfs,
+            doc_len, self.k1, self.b, self.epsilon
+        )
+
+    # ------------------------------------------------------------------ #
+    # Snapshot bölümleri
+    # ------------------------------------------------------------------ #
+    def to_sections(self, prefix: str) -> Dict[str, np.ndarray]:
+        """İndeksin `prefix` ile adlandırılmış snapshot bölümleri"""
+        sections = {f"{prefix}.{name}": self.arrays[name] for name in _ARRAY_NAMES + ("texts",)}
+        sections[f"{prefix}.version"] = np.array([INDEX_VERSION], dtype=np.int64)
+        sections[f"{prefix}.params"] = self.params
+        sections.update(self.terms.to_sections(f"{prefix}.terms"))
+        sections.update(self.chunk_ids.to_sections(f"{prefix}.chunk_ids"))
+        sections.update(self.metadatas.to_sections(f"{prefix}.metadatas"))
+        return sections
+
+    @classmethod
+    def from_sections(cls, sections: Dict[str, np.ndarray], prefix: str) -> Optional["InvertedIndex"]:
+        """Snapshot bölümlerinden kopyasız indeks; yoksa veya sürümü eskiyse None döner"""
+        version = sections.get(f"{prefix}.version")
+        if version is None or int(version[0]) != INDEX_VERSION:
+            return None
+        arrays = {name: sections[f"{prefix}.{name}"] for name in _ARRAY_NAMES + ("texts",)}
+        return cls(arrays, StringTable.from_sections(sections, f"{prefix}.terms"),
+                   StringTable.from_sections(sections, f"{prefix}.chunk_ids"),
+                   JsonTable.from_sections(sections, f"{prefix}.metadatas"), sections[f"{prefix}.params"])
+
+    # ------------------------------------------------------------------ #
+    # Erişim ve puanlama
+    # ------------------------------------------------------------------ #
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    def text(self, position: int) -> str:
+        """Bir chunk'ın metni"""
+        start, end = self.text_offsets[position], self.text_offsets[position + 1]
+        return self._texts[int(start):int(end)].tobytes().decode("utf-8")
+
+    def term_id(self, token: str) -> Optional[int]:
+        """Terimin sözlükteki id'si; yoksa None"""
+        return self.terms.index_of(token)
+
+    def position(self, chunk_id: str) -> Optional[int]:
+        """Chunk'ın indeksteki pozisyonu; yoksa None"""
+        return self.chunk_ids.index_of(chunk_id)
+
+    def positions(self, chunk_ids: Sequence[str]) -> np.ndarray:
+        """Chunk'ların pozisyonları tek aramada; indekste olmayanlar -1"""
+        return self.chunk_ids.indices_of(chunk_ids)
+
+    def query_term_ids(self, query_tokens: Iterable[str]) -> np.ndarray:
+        """Sözlükte bulunan sorgu terimlerinin sıralı, tekil id'leri"""
+        term_ids = (self.term_id(t) for t in query_tokens)
+        return np.unique(np.array([t for t in term_ids if t is not None], dtype=np.int64))
+
+    def term_overlaps(self, positions: np.ndarray, query_ids: np.ndarray) -> np.ndarray:
+        """Her chunk için sorgu terimlerinden kaçının geçtiği; ileri indeks dilimleri tek geçişte taranır, metne bakılmaz"""
+        positions = np.asarray(positions, dtype=np.int64)
+        if not len(positions) or not len(query_ids):
+            return np.zeros(len(positions), dtype=np.int64)
+        starts = self.doc_term_offsets[positions]
+        counts = self.doc_term_offsets[positions + 1] - starts
+        owners = np.repeat(np.arange(len(positions)), counts)
+        # Her chunk'ın ileri indeks diliminin girdileri, arka arkaya
+        entries = np.arange(int(counts.sum())) + np.repeat(starts - (np.cumsum(counts) - counts), counts)
+        hits = np.isin(self.doc_terms[entries], query_ids)
+        return np.bincount(owners[hits], minlength=len(positions))
+
+    def document(self, position: int) -> Tuple[str, dict]:
+        """(metin, metadata) ikilisi"""
+        return self.text(position), self.metadatas[position]
+
+    def postings(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Bir terimin (doküman pozisyonları, tf) posting listesi"""
+        start, end = self.postings_offsets[term_id], self.postings_offsets[term_id + 1]
+        docs = np.cumsum(self.postings_gaps[start:end], dtype=np.int64)
+        return docs, self.postings_tfs[start:end]
+
+    def score(self, query_tokens: Sequence[str],
+              weights: Optional[Sequence[float]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Sorgu terimlerini içeren dokümanları BM25 ile puanlar.
+
+        Args:
+            query_tokens: Sorgu token'ları (tekrarlar ayrı ayrı sayılır).
+            weights: Token başına skor çarpanı (ör. bulanık genişletmeler için < 1).
+
+        Returns:
+            (doküman pozisyonları, skorlar) — sadece en az bir sorgu terimini
+            içeren dokümanlar, pozisyon sırasına göre.
+        """
+        doc_parts, score_parts = [], []
+        for token, weight in _with_weights(query_tokens, weights):
+            term_id = self.term_id(token)
+            if term_id is None:
+                continue
+            docs, tfs = self.postings(term_id)
+            doc_parts.append(docs)
+            score_parts.append(weight * self._contributions(term_id, docs, tfs))
+
+        if not doc_parts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+        docs = np.concatenate(doc_parts)
+        contributions = np.concatenate(score_parts)
+        unique_docs, inverse = np.unique(docs, return_inverse=True)
+        # bincount katkıları sorgu terimi sırasıyla toplar (BM25Okapi ile aynı)
+        scores = np.bincount(inverse, weights=contributions, minlength=len(unique_docs))
+        return unique_docs, scores
+
+    def get_scores(self, query_tokens: Sequence[str],
+                   weights: Optional[Sequence[float]] = None) -> np.ndarray:
+        """BM25Okapi.get_scores uyumlu yoğun skor dizisi"""
+        scores = np.zeros(len(self), dtype=np.float64)
+        docs, doc_scores = self.score(query_tokens, weights)
+        scores[docs] = doc_scores
+        return scores
+
+    def top_k(self, query_tokens: Sequence[str], k: int,
+              weights: Optional[Sequence[float]] = None) -> List[Tuple[int, float]]:
+        """Skoru sıfırdan büyük en iyi k dokümanı (pozisyon, skor) olarak döndürür"""
+        docs, scores = self.score(query_tokens, weights)
+        positive = scores > 0
+        docs, scores = docs[positive], scores[positive]
+        if len(docs) > k:
+            # Eşit skorlarda da kararlı olmak için k'ıncı skora eşit olanların hepsini al
+            kth = -np.partition(-scores, k - 1)[k - 1]
+            candidates = np.flatnonzero(scores >= kth)
+        else:
+            candidates = np.arange(len(docs))
+        order = candidates[np.lexsort((docs[candidates], -scores[candidates]))][:k]
+        return [(int(docs[i]), float(scores[i])) for i in order]
+
+    def _contributions(self, term_id: int, docs: np.ndarray, tfs: np.ndarray) -> np.ndarray:
+        tfs = tfs.astype(np.float64)
+        return self.idf[term_id] * (tfs * (self.k1 + 1) / (tfs + self.doc_norm[docs]))
+
+    def _term_frequency(self, position: int, term_id: int) -> int:
+        """İleri indeksten bir dokümandaki terim frekansı"""
+        start, end = int(self.doc_term_offsets[position]), int(self.doc_term_offsets[position + 1])
+        terms = self.doc_terms[start:end]
+        i = int(np.searchsorted(terms, term_id))
+        if i < len(terms) and terms[i] == term_id:
+            return int(self.doc_tfs[start + i])
+        return 0
+
+    def exact_scores(self, positions: np.ndarray, query_tokens: Sequence[str],
+                     weights: Optional[Sequence[float]] = None) -> np.ndarray:
+        """Verilen dokümanların skorlarını `score` ile birebir aynı toplama sırasıyla hesaplar"""
+        scores = np.zeros(len(positions), dtype=np.float64)
+        for token, weight in _with_weights(query_tokens, weights):
+            term_id = self.term_id(token)
+            if term_id is None:
+                continue
+            tfs = np.array([self._term_frequency(int(p), term_id) for p in positions], dtype=np.float64)
+            contains = tfs > 0
+            scores[contains] += weight * self._contributions(term_id, positions[contains], tfs[contains])
+        return scores
+
+    def top_k_pruned(self, query_tokens: Sequence[str], k: int,
+                     weights: Optional[Sequence[float]] = None) -> Tuple[List[Tuple[int, float]], dict]:
+        """
+        Block-max budamalı (MaxScore) top-k arama.
+
+        Terimler skor üst sınırına göre büyükten küçüğe işlenir. Kalan
+        terimlerin üst sınırları toplamı mevcut k'ıncı skoru geçemediği anda
+        yeni doküman aday olamaz; bu noktadan sonra sadece adayları içeren ve
+        blok üst sınırı eşiği geçebilen bloklar çözülür, diğerleri atlanır.
+        Seçilen dokümanlar sonunda `score` ile aynı şekilde yeniden puanlanır,
+        bu yüzden sonuçlar `top_k` ile aynıdır. Sorgu terimlerinden birinin
+        IDF'i negatifse üst sınırlar geçersiz olduğundan doğrudan `top_k`
+        kullanılır.
+
+        Returns:
+            (sonuçlar, istatistikler) — istatistikler toplam, puanlanan ve
+            atlanan posting ve blok sayılarını içerir.
+        """
+        stats = {"postings_total": 0, "postings_scored": 0, "postings_skipped": 0, "blocks_skipped": 0}
+        # Terim başına toplam ağırlık (tekrarlanan token'lar toplanır)
+        counts: Dict[int, float] = {}
+        for token, weight in _with_weights(query_tokens, weights):
+            term_id = self.term_id(token)
+            if term_id is not None and weight > 0:
+                counts[term_id] = counts.get(term_id, 0.0) + weight
+        if not counts or k <= 0:
+            return [], stats
+
+        stats["postings_total"] = int(sum(int(self.postings_offsets[t + 1] - self.postings_offsets[t])
+                                          for t in counts))
+        if min(float(self.idf[t]) for t in counts) < 0:
+            # Negatif IDF'li (ortalama IDF negatifken epsilon ile değiştirilmiş) terim
+            # skoru düşürür; üst sınırlar geçersizdir, budamasız aramaya düşülür
+            stats["postings_scored"] = stats["postings_total"]
+            return self.top_k(query_tokens, k, weights), stats
+
+        bound = {t: counts[t] * max(float(self.term_max_score[t]), 0.0) for t in counts}
+        terms = sorted(counts, key=lambda t: -bound[t])
+        rest = np.cumsum([bound[t] for t in terms][::-1])[::-1].tolist() + [0.0]
+
+        tolerance = 1e-9  # Toplama sırasından kaynaklanan yuvarlama farkları için
+        scores = np.zeros(len(self), dtype=np.float64)
+        is_candidate = np.zeros(len(self), dtype=bool)
+        candidates = None  # Yeni aday kabul edilmeyen aşamada sıralı aday dizisi
+        threshold = 0.0  # Sadece pozitif skorlar döndürülür
+        for i, term_id in enumerate(terms):
+            if candidates is None:
+                current = np.flatnonzero(is_candidate)
+            else:
+                current = candidates
+            if len(current) >= k:
+                kth = -np.partition(-scores[current], k - 1)[k - 1]
+                threshold = max(threshold, kth - tolerance)
+
+            if candidates is None and rest[i] > threshold:
+                # Bu terim yeni aday getirebilir: tüm posting listesini puanla
+                docs, tfs = self.postings(term_id)
+                scores[docs] += counts[term_id] * self._contributions(term_id, docs, tfs)
+                is_candidate[docs] = True
+                stats["postings_scored"] += len(docs)
+                continue
+
+            # Eşiğe ulaşamayacak adayları bırak
+            candidates = current[scores[current] + rest[i] >= threshold]
+            first_block, end_block = int(self.block_offsets[term_id]), int(self.block_offsets[term_id + 1])
+            block_last = np.asarray(self.block_last_doc[first_block:end_block])
+            block_first = np.concatenate([[0], block_last[:-1] + 1])
+            lo = np.searchsorted(candidates, block_first, side="left")
+            hi = np.searchsorted(candidates, block_last, side="right")
+            has_candidates = hi > lo
+
+            useful = np.zeros(len(block_last), dtype=bool)
+            if has_candidates.any():
+                best = np.full(len(block_last), -np.inf)
+                best[has_candidates] = np.maximum.reduceat(scores[candidates], lo[has_candidates])
+                block_bound = counts[term_id] * np.maximum(self.block_max_score[first_block:end_block], 0.0)
+                useful = has_candidates & (best + block_bound + rest[i + 1] >= threshold)
+
+            term_start = int(self.postings_offsets[term_id])
+            term_postings = int(self.postings_offsets[term_id + 1]) - term_start
+            scored = 0
+            selected = np.flatnonzero(useful)
+            if len(selected):
+                # Seçilen blokları tek seferde çöz
+                starts = term_start + selected * BLOCK_SIZE
+                lengths = np.minimum(starts + BLOCK_SIZE, term_start + term_postings) - starts
+                segment = np.repeat(np.arange(len(selected)), lengths)
+                segment_starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+                index = np.arange(int(lengths.sum()), dtype=np.int64) - segment_starts[segment] + starts[segment]
+                running = np.cumsum(self.postings_gaps[index], dtype=np.int64)
+                before = np.concatenate([[0], running[segment_starts[1:] - 1]])
+                base = np.where(selected > 0, block_last[np.maximum(selected - 1, 0)], 0)
+                docs = running - before[segment] + base[segment]
+                mask = is_candidate[docs]
+                mask[mask] = np.isin(docs[mask], candidates, assume_unique=True)
+                docs = docs[mask]
+                scores[docs] += counts[term_id] * self._contributions(
+                    term_id, docs, self.postings_tfs[index[mask]]
+                )
+                scored = len(index)
+            stats["postings_scored"] += scored
+            stats["postings_skipped"] += term_postings - scored
+            stats["blocks_skipped"] += int(len(useful) - len(selected))
+
+        if candidates is None:
+            candidates = np.flatnonzero(is_candidate)
+        # Eşiğin yakınındaki adayları birebir skorla yeniden sırala
+        candidates = candidates[scores[candidates] > 0]
+        if len(candidates) > k:
+            kth = -np.partition(-scores[candidates], k - 1)[k - 1]
+            candidates = candidates[scores[candidates] >= kth - tolerance]
+        exact = self.exact_scores(candidates, query_tokens, weights)
+        positive = exact > 0
+        candidates, exact = candidates[positive], exact[positive]
+        order = np.lexsort((candidates, -exact))[:k]
+        return [(int(candidates[i]), float(exact[i])) for i in order], stats
+
+    def search(self, query_tokens: Sequence[str], k: int, mode: str = "block_max",
+               weights: Optional[Sequence[float]] = None) -> Tuple[List[Tuple[int, float]], dict]:
+        """
+        Top-k keyword araması.
+
+        Args:
+            mode: "block_max" (budamalı) veya "exhaustive" (tüm posting'ler).
+            weights: Token başına skor çarpanı.
+
+        Returns:
+            (sonuçlar, istatistikler)
+        """
+        if mode == "block_max":
+            return self.top_k_pruned(query_tokens, k, weights)
+        if mode != "exhaustive":
+            raise ValueError(f"Bilinmeyen arama modu: {mode}")
+        term_ids = [t for t in (self.term_id(token) for token in query_tokens) if t is not None]
+        total = int(sum(int(self.postings_offsets[t + 1] - self.postings_offsets[t]) for t in set(term_ids)))
+        stats = {"postings_total": total, "postings_scored": total, "postings_skipped": 0, "blocks_skipped": 0}
+        return self.top_k(query_tokens, k, weights), stats
+
+    def stats(self) -> dict:
+        """Sözlük boyutu ve dizilerin bayt cinsinden boyutu"""
+        return {
+            "documents": len(self),
+            "vocabulary": len(self.terms),
+            "postings": int(self.postings_offsets[-1]),
+            "index_bytes": int(sum(np.asarray(self.arrays[name]).nbytes for name in _ARRAY_NAMES
+                                   if name != "text_offsets")),
+        }
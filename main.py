@@ -11,6 +11,10 @@ from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 from langchain_community.embeddings import HuggingFaceEmbeddings # Gömme modeli için eklendi
 from langchain_community.vectorstores import Chroma # ChromaDB için eklendi
+from embedding_cache import CachedEmbeddings, with_embedding_cache # Kalıcı embedding önbelleği
+from page_text_store import PageTextStore
+from parallel_pdf_loader import print_progress
+from streaming_ingest import StreamingIngestor
 
 def process_pdf_for_rag(file_path: str):
     """
@@ -30,27 +34,13 @@ def process_pdf_for_rag(file_path: str):
     print(f"'{file_path}' PDF dosyası yükleniyor ve temizleniyor...")
     try:
         loader = PyPDFLoader(file_path)
-        documents = loader.load() # Her sayfa ayrı bir 'Document' objesi olarak gelir
+        # Temizlenmiş sayfa metinleri depoda varsa PDF tekrar okunmaz;
+        # yoksa PDF okunur, temizlenir (bkz. clean_page_text) ve depoya yazılır
+        cleaned_documents = PageTextStore().get_pages(file_path, loader.load, variant="clean")
     except Exception as e:
         print(f"PDF yükleme sırasında bir hata oluştu: {e}")
         return None
 
-    cleaned_documents = []
-    for doc in documents:
-        text_content = doc.page_content
-
-        # --- Temel Temizleme Adımları ---
-        # 1. Birden fazla boşluğu tek boşluğa indirgeme
-        text_content = ' '.join(text_content.split())
-        # 2. Yeni satır ve satır başı karakterlerini boşluğa çevirme
-        text_content = text_content.replace('\n', ' ').replace('\r', ' ')
-        # 3. Baştaki ve sondaki boşlukları kaldırma
-        text_content = text_content.strip()
-
-        # Temizlenmiş metinle yeni bir Document objesi oluştur ve metadata'yı kopyala
-        cleaned_doc = Document(page_content=text_content, metadata=doc.metadata)
-        cleaned_documents.append(cleaned_doc)
-
     print(f"PDF'den {len(cleaned_documents)} sayfa yüklendi ve temel temizleme yapıldı.")
 
     if not cleaned_documents:
@@ -124,6 +114,10 @@ def save_to_chromadb(chunks: list[Document], embeddings_model, persist_directory
     print(f"Kayıt dizini: {persist_directory}")
     print(f"Kaydedilecek parça sayısı: {len(chunks)}")
 
+    # Aynı metinler daha önce embed edildiyse vektörler önbellekten okunur
+    if not isinstance(embeddings_model, CachedEmbeddings):
+        embeddings_model = with_embedding_cache(embeddings_model)
+
     try:
         # ChromaDB vektör mağazası oluşturma ve parçaları kaydetme
         vectorstore = Chroma.from_documents(
@@ -132,6 +126,9 @@ def save_to_chromadb(chunks: list[Document], embeddings_model, persist_directory
             persist_directory=persist_directory
         )
         
+        embeddings_model.cache.flush()
+        cache_stats = embeddings_model.cache.stats()
+        print(f"📦 Embedding önbelleği: {cache_stats['hits']} isabet, {cache_stats['misses']} ıska")
         print(f"✅ {len(chunks)} parça başarıyla ChromaDB'ye kaydedildi.")
         print(f"📁 Vektör veritabanı şu konumda saklanıyor: {persist_directory}")
         
@@ -147,6 +144,52 @@ def save_to_chromadb(chunks: list[Document], embeddings_model, persist_directory
         print("Lütfen 'chromadb' kütüphanesinin yüklü olduğundan emin olun.")
         return None
 
+def stream_pdf_to_chromadb(file_path: str, embeddings_model, persist_directory: str = "rag_chroma_db",
+                           batch_size: int = 64):
+    """
+    PDF'i bellekte toplamadan sayfa sayfa temizler, parçalar ve batch'ler halinde
+    ChromaDB'ye yazar. Yarıda kesilirse son tamamlanan batch'ten devam eder.
+
+    Args:
+        file_path (str): İşlenecek PDF dosyasının yolu.
+        embeddings_model: Gömme modeli (HuggingFaceEmbeddings).
+        persist_directory (str): ChromaDB'nin kaydedileceği dizin yolu.
+        batch_size (int): Tek seferde embed edilip yazılacak parça sayısı.
+
+    Returns:
+        Chroma: ChromaDB vektör mağazası objesi. Hata durumunda None döner.
+    """
+    if not os.path.exists(file_path):
+        print(f"Hata: '{file_path}' yolu bulunamadı. Lütfen dosya yolunu kontrol edin.")
+        return None
+
+    if not isinstance(embeddings_model, CachedEmbeddings):
+        embeddings_model = with_embedding_cache(embeddings_model)
+
+    try:
+        vectorstore = Chroma(persist_directory=persist_directory, embedding_function=embeddings_model)
+        ingestor = StreamingIngestor(
+            collection=vectorstore._collection,
+            embeddings=embeddings_model,
+            # process_pdf_for_rag ile aynı parçalama ayarları
+            splitter_kwargs={"chunk_size": 1000, "chunk_overlap": 100,
+                             "length_function": len, "is_separator_regex": False},
+            checkpoint_path=f"{persist_directory}_ingest_checkpoint.json",
+            batch_size=batch_size,
+            clean=True,
+            page_store=PageTextStore()
+        )
+        stats = ingestor.run(file_path, progress_callback=print_progress)
+        ingestor.clear()
+
+        print(f"✅ {stats['chunks']} parça {stats['batches']} batch halinde ChromaDB'ye kaydedildi.")
+        print(f"📊 Vektör veritabanındaki toplam doküman sayısı: {vectorstore._collection.count()}")
+        return vectorstore
+
+    except Exception as e:
+        print(f"❌ Akış halinde kaydetme sırasında bir hata oluştu: {e}")
+        return None
+
 def search_in_vectorstore(vectorstore, query: str, k: int = 5):
     """
     ChromaDB vektör mağazasında arama yapar.
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PDF'ten çıkarılan sayfa metinlerinin kalıcı deposu.
+
+PyPDFLoader ile PDF okumak, embedding dışındaki en yavaş adımdır ve yalnızca
+chunk ayarları değiştiğinde bile tekrarlanıyordu. Bu depo her PDF için sayfa
+metinlerini bir kez, iki biçimde saklar:
+
+- "raw": PyPDFLoader çıktısı (ImprovedNutukRAGSystem bunu kullanır)
+- "clean": main.process_pdf_for_rag temizliğinden geçmiş metin
+
+Metinler tek bir UTF-8 dosyasında art arda durur; sayfa başlangıçları ayrı bir
+ofset dizisindedir. Yüklerken dosya bellek eşlemeli (mmap) açılır ve sadece
+istenen sayfa çözülür.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from langchain.schema import Document
+
+from parallel_pdf_loader import clean_page_text
+
+STORE_VERSION = 1
+
+_sha_cache: Dict[Tuple[str, int, float], str] = {}
+
+
+def file_sha256(path: str) -> str:
+    """Dosya içeriğinin SHA-256 hash'i"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def pdf_fingerprint(pdf_path: str) -> str:
+    """PDF içeriğinin hash'i (boyut/mtime değişmedikçe süreç içinde önbelleklenir)"""
+    stat = os.stat(pdf_path)
+    key = (os.path.abspath(pdf_path), stat.st_size, stat.st_mtime)
+    if key not in _sha_cache:
+        _sha_cache[key] = file_sha256(pdf_path)
+    return _sha_cache[key]
+
+
+class StoredPages:
+    """Bellek eşlemeli sayfa metinleri; sayfalar erişildikçe çözülür"""
+
+    def __init__(self, text_path: str, offsets: np.ndarray, metadatas: List[dict], source: str):
+        self.offsets = offsets
+        self.metadatas = metadatas
+        self.source = source
+        self._file = open(text_path, "rb")
+        if offsets[-1] > 0:
+            self._buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._buffer = b""
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def page_text(self, i: int) -> str:
+        return self._buffer[int(self.offsets[i]):int(self.offsets[i + 1])].decode("utf-8")
+
+    def __getitem__(self, i: int) -> Document:
+        # Aynı içerikli PDF farklı bir yoldan okunmuş olabilir
+        metadata = dict(self.metadatas[i], source=self.source)
+        return Document(page_content=self.page_text(i), metadata=metadata)
+
+    def iter_pages(self, start: int = 0) -> Iterator[Document]:
+        for i in range(start, len(self)):
+            yield self[i]
+
+    def documents(self) -> List[Document]:
+        return list(self.iter_pages())
+
+    def close(self):
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        self._file.close()
+
+
+class PageTextStore:
+    """
+    PDF hash'ine göre adreslenen sayfa metni deposu.
+
+    Args:
+        directory: Depo dosyalarının yazılacağı klasör.
+    """
+
+    def __init__(self, directory: str = "page_text_store"):
+        self.directory = directory
+
+    def _paths(self, pdf_sha: str, variant: str) -> Tuple[str, str, str]:
+        base = os.path.join(self.directory, f"{pdf_sha[:24]}_{variant}")
+        return f"{base}.txt", f"{base}.offsets.npy", f"{base}.meta.json"
+
+    def load(self, pdf_path: str, variant: str = "raw") -> Optional[StoredPages]:
+        """Depodaki sayfaları açar; bu PDF için kayıt yoksa None döner"""
+        text_path, offsets_path, meta_path = self._paths(pdf_fingerprint(pdf_path), variant)
+        # Meta dosyası en son yazılır; varsa kayıt tamamdır
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != STORE_VERSION:
+            return None
+        offsets = np.load(offsets_path, mmap_mode="r")
+        return StoredPages(text_path, offsets, meta["metadatas"], pdf_path)
+
+    def _write_variant(self, pdf_sha: str, variant: str, pages: List[Document]):
+        text_path, offsets_path, meta_path = self._paths(pdf_sha, variant)
+        offsets = np.zeros(len(pages) + 1, dtype=np.int64)
+        with open(text_path, "wb") as f:
+            for i, page in enumerate(pages):
+                encoded = page.page_content.encode("utf-8")
+                f.write(encoded)
+                offsets[i + 1] = offsets[i] + len(encoded)
+        np.save(offsets_path, offsets)
+
+        meta = {
+            "version": STORE_VERSION,
+            "pdf_sha256": pdf_sha,
+            "variant": variant,
+            "metadatas": [page.metadata for page in pages],
+        }
+        tmp_path = f"{meta_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+        os.replace(tmp_path, meta_path)
+
+    def save(self, pdf_path: str, raw_pages: List[Document]):
+        """PyPDFLoader çıktısını ham ve temizlenmiş olarak depoya yazar"""
+        os.makedirs(self.directory, exist_ok=True)
+        pdf_sha = pdf_fingerprint(pdf_path)
+        self._write_variant(pdf_sha, "raw", raw_pages)
+        self._write_variant(pdf_sha, "clean", [
+            Document(page_content=clean_page_text(page.page_content), metadata=page.metadata)
+            for page in raw_pages
+        ])
+
+    def get_pages(self, pdf_path: str, extract: Callable[[], List[Document]],
+                  variant: str = "raw") -> List[Document]:
+        """
+        Sayfaları depodan okur; yoksa extract() ile PDF'ten çıkarıp depoya yazar.
+
+        Args:
+            pdf_path: PDF dosyasının yolu.
+            extract: PDF'ten ham sayfaları döndüren fonksiyon (ör. PyPDFLoader(...).load).
+            variant: "raw" veya "clean".
+        """
+        stored = self.load(pdf_path, variant)
+        if stored is not None:
+            print(f"⚡ Sayfa metinleri depodan okundu ({len(stored)} sayfa)")
+            try:
+                return stored.documents()
+            finally:
+                stored.close()
+
+        raw_pages = extract()
+        self.save(pdf_path, raw_pages)
+        if variant == "raw":
+            return raw_pages
+        return [Document(page_content=clean_page_text(page.page_content), metadata=page.metadata)
+                for page in raw_pages]
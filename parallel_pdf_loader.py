@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+PDF'i sayfa aralıklarına bölerek süreç havuzunda (process pool) okuyan ve
+parçalayan yardımcılar.
+
+Her sayfa RecursiveCharacterTextSplitter tarafından bağımsız olarak
+bölündüğü için, aralıkların sonuçları sayfa sırasına göre birleştirildiğinde
+seri `PyPDFLoader(...).load()` + `split_documents` çıktısının aynısı elde edilir.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+# PyPDFLoader ile birebir aynı metadata'yı üretmek için onun yardımcısını kullanıyoruz
+from langchain_community.document_loaders.parsers.pdf import _purge_metadata
+
+ProgressCallback = Callable[[int, int], None]
+
+
+def _document_metadata(pdf_reader, source: str) -> dict:
+    """PyPDFLoader'ın tüm sayfalara eklediği ortak metadata'yı oluşturur"""
+    return _purge_metadata(
+        {"producer": "PyPDF", "creator": "PyPDF", "creationdate": ""}
+        | (pdf_reader.metadata or {})
+        | {
+            "source": source,
+            "total_pages": len(pdf_reader.pages),
+        }
+    )
+
+
+def get_page_count(pdf_path: str) -> int:
+    """PDF'teki sayfa sayısını döndürür"""
+    import pypdf
+
+    return len(pypdf.PdfReader(pdf_path).pages)
+
+
+def iter_pages(pdf_path: str, start: int = 0, end: Optional[int] = None) -> Iterator[Document]:
+    """
+    [start, end) aralığındaki sayfaları PyPDFLoader ile aynı biçimde tek tek üretir.
+
+    Args:
+        pdf_path: PDF dosyasının yolu.
+        start: İlk sayfa (0 tabanlı, dahil).
+        end: Son sayfa (hariç, varsayılan: son sayfa).
+
+    Yields:
+        Sayfa başına bir Document.
+    """
+    import pypdf
+
+    pdf_reader = pypdf.PdfReader(pdf_path)
+    doc_metadata = _document_metadata(pdf_reader, pdf_path)
+    page_count = len(pdf_reader.pages)
+    end = page_count if end is None else min(end, page_count)
+
+    for page_number in range(start, end):
+        page = pdf_reader.pages[page_number]
+        text = page.extract_text(extraction_mode="plain").strip()
+        yield Document(
+            page_content=text,
+            metadata=doc_metadata | {
+                "page": page_number,
+                "page_label": pdf_reader.page_labels[page_number],
+            }
+        )
+
+
+def extract_pages(pdf_path: str, start: int, end: Optional[int]) -> List[Document]:
+    """[start, end) aralığındaki sayfaları liste olarak döndürür"""
+    return list(iter_pages(pdf_path, start, end))
+
+
+def clean_page_text(text: str) -> str:
+    """main.process_pdf_for_rag'deki temel sayfa metni temizliği"""
+    # 1. Birden fazla boşluğu tek boşluğa indirgeme
+    text = ' '.join(text.split())
+    # 2. Yeni satır ve satır başı karakterlerini boşluğa çevirme
+    text = text.replace('\n', ' ').replace('\r', ' ')
+    # 3. Baştaki ve sondaki boşlukları kaldırma
+    return text.strip()
+
+
+def _process_page_range(pdf_path: str, start: int, end: int,
+                        splitter_kwargs: Dict) -> Tuple[int, List[Document], List[Document]]:
+    """Süreç havuzunda çalışan iş: bir sayfa aralığını okur ve parçalar"""
+    pages = extract_pages(pdf_path, start, end)
+    text_splitter = RecursiveCharacterTextSplitter(**splitter_kwargs)
+    return start, pages, text_splitter.split_documents(pages)
+
+
+def split_page_ranges(page_count: int, workers: int,
+                      pages_per_task: Optional[int] = None) -> List[Tuple[int, int]]:
+    """Sayfaları işçilere dağıtılacak [start, end) aralıklarına böler"""
+    if page_count <= 0:
+        return []
+    if not pages_per_task:
+        # İşçi başına birkaç görev: yük dengesi için yeterince küçük parçalar
+        pages_per_task = max(1, -(-page_count // (workers * 4)))
+    return [(start, min(start + pages_per_task, page_count))
+            for start in range(0, page_count, pages_per_task)]
+
+
+def load_and_split_parallel(pdf_path: str, splitter_kwargs: Dict,
+                            workers: Optional[int] = None,
+                            pages_per_task: Optional[int] = None,
+                            progress_callback: Optional[ProgressCallback] = None,
+                            with_pages: bool = False):
+    """
+    PDF'i paralel olarak okur ve parçalara böler.
+
+    Args:
+        pdf_path: PDF dosyasının yolu.
+        splitter_kwargs: RecursiveCharacterTextSplitter'a verilecek ayarlar.
+        workers: Süreç sayısı (varsayılan: CPU sayısı).
+        pages_per_task: Görev başına sayfa sayısı (varsayılan: otomatik).
+        progress_callback: (tamamlanan_sayfa, toplam_sayfa) ile çağrılır.
+        with_pages: True ise okunan sayfalar da döndürülür.
+
+    Returns:
+        Seri işlemle aynı sırada parçalar (chunk) listesi; with_pages ise
+        (sayfalar, chunk'lar) ikilisi.
+    """
+    workers = workers or os.cpu_count() or 1
+    page_count = get_page_count(pdf_path)
+    ranges = split_page_ranges(page_count, workers, pages_per_task)
+
+    results = {}
+    done_pages = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_process_page_range, pdf_path, start, end, splitter_kwargs): (start, end)
+            for start, end in ranges
+        }
+        for future in as_completed(futures):
+            start, end = futures[future]
+            _, pages, chunks = future.result()
+            results[start] = (pages, chunks)
+            done_pages += end - start
+            if progress_callback:
+                progress_callback(done_pages, page_count)
+
+    # Sayfa sırasına göre deterministik birleştirme
+    pages, chunks = [], []
+    for start, _ in ranges:
+        pages.extend(results[start][0])
+        chunks.extend(results[start][1])
+    if with_pages:
+        return pages, chunks
+    return chunks
+
+
+def print_progress(done: int, total: int):
+    """Varsayılan ilerleme göstergesi"""
+    print(f"   📄 {done}/{total} sayfa işlendi")
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Tam ifade (phrase) ve yakınlık (proximity) sorguları için pozisyonel indeks.
+
+BM25 token'ları stop-word ve kısa kelime filtresinden geçer; "15 Mayıs 1919"
+gibi ifadeleri aramak için ise filtrelenmemiş token akışı gerekir. Bu indeks
+her chunk'ın filtrelenmemiş token akışındaki (doküman, pozisyon) çiftlerini
+terim başına saklar. İfade sorgusu, ardışık terimlerin pozisyonları kaydırılarak
+kesiştirilmesiyle; yakınlık sorgusu ise pozisyon listelerinin birleştirilmesiyle
+chunk metnine bakmadan cevaplanır.
+
+Diziler InvertedIndex gibi index_snapshot bölümleri olarak yazılır ve bellek
+eşlemeli açılır.
+"""
+
+import heapq
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from index_snapshot import StringTable
+
+POSITIONAL_INDEX_VERSION = 2
+
+_ARRAY_NAMES = ("postings_offsets", "postings_docs", "postings_positions", "doc_offsets", "doc_tokens")
+
+
+class PositionalIndex:
+    """Terim başına (doküman, pozisyon) posting'leri tutan indeks"""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], terms: StringTable, chunk_ids: StringTable):
+        self.arrays = arrays
+        self.terms = terms
+        self.chunk_ids = chunk_ids
+        for name in _ARRAY_NAMES:
+            setattr(self, name, arrays[name])
+        lengths = np.diff(self.doc_offsets)
+        # Anahtar = doküman * stride + pozisyon; stride en uzun akıştan büyük olmalı
+        self.stride = int(lengths.max()) + 1 if len(lengths) else 1
+
+    @classmethod
+    def build(cls, chunk_ids: Sequence[str], token_streams: Sequence[Sequence[str]]) -> "PositionalIndex":
+        """
+        Filtrelenmemiş token akışlarından indeks oluşturur.
+
+        Args:
+            chunk_ids: Chunk id'leri (InvertedIndex ile aynı sıra).
+            token_streams: Her chunk'ın sıralı, filtrelenmemiş token'ları.
+        """
+        term_to_id: Dict[str, int] = {}
+        stream = []
+        lengths = []
+        for tokens in token_streams:
+            for token in tokens:
+                term_id = term_to_id.get(token)
+                if term_id is None:
+                    term_id = term_to_id[token] = len(term_to_id)
+                stream.append(term_id)
+            lengths.append(len(tokens))
+        doc_offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=doc_offsets[1:])
+        return cls._from_streams(list(chunk_ids), list(term_to_id), doc_offsets,
+                                 np.array(stream, dtype=np.int64))
+
+    @classmethod
+    def _from_streams(cls, chunk_ids: List[str], terms: List[str], doc_offsets: np.ndarray,
+                      stream: np.ndarray) -> "PositionalIndex":
+        lengths = np.diff(doc_offsets)
+        token_docs = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+        token_positions = np.arange(len(stream), dtype=np.int64) - doc_offsets[:-1][token_docs]
+
+        # Hiçbir akışta geçmeyen terimleri at
+        counts = np.bincount(stream, minlength=len(terms))
+        live = counts > 0
+        if not live.all():
+            stream = (np.cumsum(live) - 1)[stream]
+            terms = [term for term, keep in zip(terms, live) if keep]
+            counts = counts[live]
+
+        order = np.lexsort((token_positions, token_docs, stream))
+        postings_offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(counts, out=postings_offsets[1:])
+        arrays = {
+            "postings_offsets": postings_offsets,
+            "postings_docs": token_docs[order].astype(np.int32),
+            "postings_positions": token_positions[order].astype(np.int32),
+            "doc_offsets": doc_offsets.astype(np.int64),
+            "doc_tokens": stream.astype(np.int32),
+        }
+        return cls(arrays, StringTable.from_strings(terms), StringTable.from_strings(chunk_ids))
+
+    def patched(self, removed_ids: Iterable[str], added_ids: Sequence[str],
+                added_streams: Sequence[Sequence[str]]) -> "PositionalIndex":
+        """Silinen chunk'ları çıkarıp yenilerini ekleyerek yeni bir indeks döndürür"""
+        removed = set(removed_ids)
+        keep = np.array([chunk_id not in removed for chunk_id in self.chunk_ids], dtype=bool)
+        lengths = np.diff(self.doc_offsets)
+        stream = np.asarray(self.doc_tokens)[np.repeat(keep, lengths)].astype(np.int64)
+
+        terms = list(self.terms)
+        term_to_id = {term: i for i, term in enumerate(terms)}
+        new_stream = []
+        new_lengths = []
+        for tokens in added_streams:
+            for token in tokens:
+                term_id = term_to_id.get(token)
+                if term_id is None:
+                    term_id = term_to_id[token] = len(terms)
+                    terms.append(token)
+                new_stream.append(term_id)
+            new_lengths.append(len(tokens))
+
+        all_lengths = np.concatenate([lengths[keep], np.array(new_lengths, dtype=np.int64)])
+        doc_offsets = np.zeros(len(all_lengths) + 1, dtype=np.int64)
+        np.cumsum(all_lengths, out=doc_offsets[1:])
+        chunk_ids = [chunk_id for chunk_id, kept in zip(self.chunk_ids, keep) if kept] + list(added_ids)
+        return self._from_streams(chunk_ids, terms, doc_offsets,
+                                  np.concatenate([stream, np.array(new_stream, dtype=np.int64)]))
+
+    # ------------------------------------------------------------------ #
+    # Snapshot bölümleri
+    # ------------------------------------------------------------------ #
+    def to_sections(self, prefix: str) -> Dict[str, np.ndarray]:
+        """İndeksin `prefix` ile adlandırılmış snapshot bölümleri"""
+        sections = {f"{prefix}.{name}": self.arrays[name] for name in _ARRAY_NAMES}
+        sections[f"{prefix}.version"] = np.array([POSITIONAL_INDEX_VERSION], dtype=np.int64)
+        sections.update(self.terms.to_sections(f"{prefix}.terms"))
+        sections.update(self.chunk_ids.to_sections(f"{prefix}.chunk_ids"))
+        return sections
+
+    @classmethod
+    def from_sections(cls, sections: Dict[str, np.ndarray], prefix: str) -> Optional["PositionalIndex"]:
+        """Snapshot bölümlerinden kopyasız indeks; yoksa veya sürümü eskiyse None döner"""
+        version = sections.get(f"{prefix}.version")
+        if version is None or int(version[0]) != POSITIONAL_INDEX_VERSION:
+            return None
+        arrays = {name: sections[f"{prefix}.{name}"] for name in _ARRAY_NAMES}
+        return cls(arrays, StringTable.from_sections(sections, f"{prefix}.terms"),
+                   StringTable.from_sections(sections, f"{prefix}.chunk_ids"))
+
+    # ------------------------------------------------------------------ #
+    # Sorgular
+    # ------------------------------------------------------------------ #
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    def _postings(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = self.postings_offsets[term_id], self.postings_offsets[term_id + 1]
+        return self.postings_docs[start:end], self.postings_positions[start:end]
+
+    def _shifted_keys(self, term_id: int, shift: int) -> np.ndarray:
+        """Terimin pozisyonlarını `shift` kadar geri kaydırılmış (doküman, başlangıç) anahtarları"""
+        docs, positions = self._postings(term_id)
+        valid = positions >= shift
+        return docs[valid].astype(np.int64) * self.stride + (positions[valid].astype(np.int64) - shift)
+
+    def _result(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        docs, counts = np.unique(keys // self.stride, return_counts=True)
+        return docs, counts
+
+    def phrase(self, tokens: Sequence[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Token'ları ardışık olarak içeren dokümanlar.
+
+        Returns:
+            (doküman pozisyonları, ifadenin doküman içindeki geçiş sayısı)
+        """
+        empty = np.zeros(0, dtype=np.int64)
+        term_ids = [self.terms.index_of(token) for token in tokens]
+        if not term_ids or None in term_ids:
+            return empty, empty
+        # En seyrek terimden başla: kesişimler küçük kalır
+        order = sorted(range(len(term_ids)), key=lambda i: self.postings_offsets[term_ids[i] + 1]
+                       - self.postings_offsets[term_ids[i]])
+        keys = self._shifted_keys(term_ids[order[0]], order[0])
+        for i in order[1:]:
+            if not len(keys):
+                break
+            keys = np.intersect1d(keys, self._shifted_keys(term_ids[i], i), assume_unique=True)
+        return self._result(keys)
+
+    def longest_phrase(self, tokens: Sequence[str], min_length: int = 2,
+                       accept: Optional[Callable[[List[str]], bool]] = None
+                       ) -> Tuple[List[str], np.ndarray, np.ndarray]:
+        """
+        Sorgu token dizisinin indekste ifade olarak geçen en uzun alt dizisi.
+
+        Args:
+            tokens: Filtrelenmemiş sorgu token'ları.
+            min_length: İfadenin en az token sayısı.
+            accept: Verilirse sadece bunun kabul ettiği ifadeler sayılır
+                (ör. "ne zaman" gibi sadece stop-word'lerden oluşanlar elenir).
+
+        Returns:
+            (ifade token'ları, doküman pozisyonları, geçiş sayıları); en az
+            `min_length` token'lık bir ifade bulunamazsa boş ifade döner.
+        """
+        term_ids = [self.terms.index_of(token) for token in tokens]
+        best: Tuple[List[str], Optional[np.ndarray]] = ([], None)
+        for start in range(len(term_ids)):
+            if term_ids[start] is None or len(term_ids) - start <= max(len(best[0]), min_length - 1):
+                continue
+            keys = self._shifted_keys(term_ids[start], 0)
+            for end in range(start + 1, len(term_ids)):
+                if term_ids[end] is None:
+                    break
+                keys = np.intersect1d(keys, self._shifted_keys(term_ids[end], end - start), assume_unique=True)
+                if not len(keys):
+                    break
+                length = end - start + 1
+                if length >= min_length and length > len(best[0]):
+                    phrase = list(tokens[start:end + 1])
+                    if accept is None or accept(phrase):
+                        best = (phrase, keys)
+        if best[1] is None:
+            empty = np.zeros(0, dtype=np.int64)
+            return [], empty, empty
+        docs, counts = self._result(best[1])
+        return best[0], docs, counts
+
+    def near(self, tokens: Sequence[str], window: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Tüm token'ları en fazla `window` token'lık bir aralıkta içeren dokümanlar.
+
+        Returns:
+            (doküman pozisyonları, en kısa aralığın uzunluğu)
+        """
+        empty = np.zeros(0, dtype=np.int64)
+        term_ids = list(dict.fromkeys(self.terms.index_of(token) for token in tokens))
+        if not term_ids or None in term_ids:
+            return empty, empty
+        postings = [self._postings(term_id) for term_id in term_ids]
+        candidates = postings[0][0]
+        for docs, _ in postings[1:]:
+            candidates = np.intersect1d(candidates, docs)
+
+        found_docs, spans = [], []
+        for doc in candidates.tolist():
+            lists = []
+            for docs, positions in postings:
+                lo, hi = np.searchsorted(docs, doc, side="left"), np.searchsorted(docs, doc, side="right")
+                lists.append(positions[lo:hi].tolist())
+            span = _min_span(lists)
+            if span <= window:
+                found_docs.append(doc)
+                spans.append(span)
+        return np.array(found_docs, dtype=np.int64), np.array(spans, dtype=np.int64)
+
+
+def _min_span(position_lists: List[List[int]]) -> int:
+    """Her listeden en az bir pozisyon içeren en kısa aralığın token sayısı"""
+    heap = [(positions[0], i, 0) for i, positions in enumerate(position_lists)]
+    heapq.heapify(heap)
+    current_max = max(positions[0] for positions in position_lists)
+    best = current_max - heap[0][0] + 1
+    while True:
+        position, i, j = heapq.heappop(heap)
+        best = min(best, current_max - position + 1)
+        if j + 1 == len(position_lists[i]):
+            return best
+        following = position_lists[i][j + 1]
+        current_max = max(current_max, following)
+        heapq.heappush(heap, (following, i, j + 1))
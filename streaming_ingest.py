@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Sınırlı bellekle akış tabanlı (streaming) PDF ingestion hattı.
+
+sayfa → temizleme → chunk → toplu embedding → ChromaDB upsert + BM25 kaydı
+
+Her aşama bir generator'dır; bellekte aynı anda en fazla bir sayfa ve bir
+batch bulunur. Her batch yazıldıktan sonra bir checkpoint kaydedilir, böylece
+yarıda kesilen bir ingestion son tamamlanan batch'ten devam eder.
+"""
+
+import json
+import os
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from index_manifest import assign_chunk_ids
+from parallel_pdf_loader import ProgressCallback, clean_page_text, get_page_count, iter_pages
+
+CHECKPOINT_VERSION = 1
+
+
+def clean_pages(pages: Iterable[Document]) -> Iterator[Document]:
+    """Sayfa metinlerini main.process_pdf_for_rag ile aynı şekilde temizler"""
+    for page in pages:
+        yield Document(page_content=clean_page_text(page.page_content), metadata=page.metadata)
+
+
+def chunk_pages(pages: Iterable[Document], text_splitter: RecursiveCharacterTextSplitter,
+                start_page: int = 0, skip: int = 0) -> Iterator[Tuple[int, Document]]:
+    """
+    Sayfaları chunk'lara böler ve kararlı id'lerle işaretler.
+
+    Args:
+        pages: Sayfa Document'ları.
+        text_splitter: Kullanılacak splitter.
+        start_page: Devam edilen sayfa; bu sayfanın ilk `skip` chunk'ı atlanır.
+        skip: start_page'de daha önce kaydedilmiş chunk sayısı.
+
+    Yields:
+        (sayfa_numarası, chunk) ikilileri.
+    """
+    for page in pages:
+        page_number = page.metadata.get("page", 0)
+        chunks = assign_chunk_ids(text_splitter.split_documents([page]))
+        if page_number == start_page:
+            chunks = chunks[skip:]
+        for chunk in chunks:
+            yield page_number, chunk
+
+
+def batched(items: Iterable, batch_size: int) -> Iterator[List]:
+    """Bir iterable'ı en fazla batch_size uzunluğunda listelere böler"""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class StreamingIngestor:
+    """
+    Bir PDF'i batch'ler halinde ChromaDB'ye ve BM25 kayıt dosyasına yazar.
+
+    Args:
+        collection: ChromaDB koleksiyonu (`vectorstore._collection`).
+        embeddings: Doküman embedding'lerini üreten model.
+        splitter_kwargs: RecursiveCharacterTextSplitter ayarları.
+        checkpoint_path: Devam noktasının kaydedileceği dosya.
+        token_log_path: BM25 için chunk/token kayıtlarının eklendiği JSONL
+            dosyası (None ise BM25 tarafı atlanır).
+        tokenize: token_log_path verildiğinde kullanılacak tokenizer.
+        batch_size: Tek seferde embed edilip yazılacak chunk sayısı.
+        clean: Sayfa metinleri temizlensin mi.
+        page_store: Verilirse ve PDF daha önce çıkarıldıysa sayfalar
+            PDF yerine bu depodan (mmap) okunur.
+    """
+
+    def __init__(self, collection, embeddings, splitter_kwargs: Dict, checkpoint_path: str,
+                 token_log_path: Optional[str] = None,
+                 tokenize: Optional[Callable[[str], List[str]]] = None,
+                 batch_size: int = 64, clean: bool = False, page_store=None):
+        self.collection = collection
+        self.embeddings = embeddings
+        self.splitter_kwargs = splitter_kwargs
+        self.checkpoint_path = checkpoint_path
+        self.token_log_path = token_log_path
+        self.tokenize = tokenize
+        self.batch_size = batch_size
+        self.clean = clean
+        self.page_store = page_store
+
+    def _fingerprint(self, pdf_path: str, extra: Optional[Dict] = None) -> Dict:
+        """Checkpoint'in geçerli olup olmadığını belirleyen girdi özeti"""
+        stat = os.stat(pdf_path)
+        splitter = {k: v for k, v in self.splitter_kwargs.items() if k != "length_function"}
+        return {
+            "pdf_path": pdf_path,
+            "pdf_size": stat.st_size,
+            "pdf_mtime": stat.st_mtime,
+            "splitter": splitter,
+            "clean": self.clean,
+            "extra": extra or {},
+        }
+
+    def _load_checkpoint(self, fingerprint: Dict) -> Optional[Dict]:
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("version") != CHECKPOINT_VERSION or state.get("fingerprint") != fingerprint:
+            return None
+        return state
+
+    def _save_checkpoint(self, state: Dict):
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def can_resume(self, pdf_path: str, extra: Optional[Dict] = None) -> bool:
+        """Bu PDF için yarım kalmış bir ingestion var mı"""
+        state = self._load_checkpoint(self._fingerprint(pdf_path, extra))
+        return state is not None and not state["done"]
+
+    def _commit(self, chunks: List[Document], known_ids: Set[str]) -> int:
+        """Bir batch'i embed edip yazar; embed edilen chunk sayısını döndürür"""
+        new_chunks = [chunk for chunk in chunks if chunk.metadata["chunk_id"] not in known_ids]
+        if new_chunks:
+            vectors = self.embeddings.embed_documents([chunk.page_content for chunk in new_chunks])
+            self.collection.upsert(
+                ids=[chunk.metadata["chunk_id"] for chunk in new_chunks],
+                embeddings=vectors,
+                documents=[chunk.page_content for chunk in new_chunks],
+                metadatas=[chunk.metadata for chunk in new_chunks],
+            )
+
+        if self.token_log_path:
+            with open(self.token_log_path, "a", encoding="utf-8") as f:
+                for chunk in chunks:
+                    f.write(json.dumps({
+                        "id": chunk.metadata["chunk_id"],
+                        "text": chunk.page_content,
+                        "metadata": chunk.metadata,
+                        "tokens": self.tokenize(chunk.page_content),
+                    }, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+        return len(new_chunks)
+
+    def run(self, pdf_path: str, known_ids: Optional[Set[str]] = None,
+            extra: Optional[Dict] = None,
+            progress_callback: Optional[ProgressCallback] = None) -> Dict:
+        """
+        PDF'i akış halinde işler; geçerli bir checkpoint varsa oradan devam eder.
+
+        Args:
+            pdf_path: İşlenecek PDF.
+            known_ids: İndekste zaten bulunan (yeniden embed edilmeyecek) chunk id'leri.
+            extra: Checkpoint geçerliliğine dahil edilecek ek ayarlar (ör. model adı).
+            progress_callback: (tamamlanan_sayfa, toplam_sayfa) ile çağrılır.
+
+        Returns:
+            İşlem istatistikleri.
+        """
+        known_ids = known_ids or set()
+        fingerprint = self._fingerprint(pdf_path, extra)
+        state = self._load_checkpoint(fingerprint)
+        if state is None or state["done"]:
+            state = {
+                "version": CHECKPOINT_VERSION,
+                "fingerprint": fingerprint,
+                "page": 0,
+                "skip": 0,
+                "chunks": 0,
+                "embedded": 0,
+                "batches": 0,
+                "done": False,
+            }
+            if self.token_log_path and os.path.exists(self.token_log_path):
+                os.remove(self.token_log_path)
+        else:
+            print(f"♻️ Yarım kalan ingestion sayfa {state['page']} üzerinden devam ediyor...")
+            self.repair_log()
+        resumed_from = state["page"]
+
+        stored_pages = None
+        if self.page_store is not None:
+            stored_pages = self.page_store.load(pdf_path, "clean" if self.clean else "raw")
+        if stored_pages is not None:
+            page_count = len(stored_pages)
+            pages = stored_pages.iter_pages(state["page"])
+        else:
+            page_count = get_page_count(pdf_path)
+            pages = iter_pages(pdf_path, start=state["page"])
+            if self.clean:
+                pages = clean_pages(pages)
+        chunks = chunk_pages(pages, RecursiveCharacterTextSplitter(**self.splitter_kwargs),
+                             start_page=state["page"], skip=state["skip"])
+
+        for batch in batched(chunks, self.batch_size):
+            embedded = self._commit([chunk for _, chunk in batch], known_ids)
+
+            last_page, _ = batch[-1]
+            if last_page == state["page"]:
+                state["skip"] = state["skip"] + sum(1 for page, _ in batch if page == last_page)
+            else:
+                state["skip"] = sum(1 for page, _ in batch if page == last_page)
+            state["page"] = last_page
+            state["chunks"] += len(batch)
+            state["embedded"] += embedded
+            state["batches"] += 1
+            self._save_checkpoint(state)
+
+            if progress_callback:
+                progress_callback(last_page + 1, page_count)
+
+        if stored_pages is not None:
+            stored_pages.close()
+        cache = getattr(self.embeddings, "cache", None)
+        if cache is not None:
+            # CachedEmbeddings indeksini batch başına değil, ingestion sonunda yazar
+            cache.flush()
+        state["done"] = True
+        self._save_checkpoint(state)
+        return {
+            "pages": page_count,
+            "chunks": state["chunks"],
+            "embedded": state["embedded"],
+            "batches": state["batches"],
+            "resumed_from_page": resumed_from,
+        }
+
+    def repair_log(self) -> int:
+        """
+        Çökme sırasında yarım yazılmış son satırı keser; devam eden ingestion'ın
+        ilk kaydı o parçanın arkasına eklenip onunla birlikte kaybolmaz.
+
+        Returns:
+            Kesilen bayt sayısı.
+        """
+        if not self.token_log_path or not os.path.exists(self.token_log_path):
+            return 0
+        with open(self.token_log_path, "rb+") as f:
+            size = f.seek(0, os.SEEK_END)
+            end = size
+            while end > 0:
+                start = max(0, end - 65536)
+                f.seek(start)
+                newline = f.read(end - start).rfind(b"\n")
+                if newline >= 0:
+                    end = start + newline + 1
+                    break
+                end = start
+            if end < size:
+                f.truncate(end)
+        return size - end
+
+    def iter_log(self) -> Iterator[Dict]:
+        """BM25 kayıt dosyasındaki chunk'ları (id'ye göre tekilleştirilmiş) üretir"""
+        if not self.token_log_path or not os.path.exists(self.token_log_path):
+            return
+        seen = set()
+        with open(self.token_log_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # Çökme sırasında yarım yazılmış son satır
+                    continue
+                if record["id"] in seen:
+                    continue
+                seen.add(record["id"])
+                yield record
+
+    def clear(self):
+        """Başarıyla biten ingestion'ın checkpoint ve kayıt dosyalarını siler"""
+        for path in (self.checkpoint_path, self.token_log_path):
+            if path and os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from answer_cache import SemanticAnswerCache
+
+
+def test_put_replaces_same_question_and_evidence():
+    """Aynı soru (boşluk farkıyla) ve kanıt tekrar yazılınca tek girdi kalır"""
+    cache = SemanticAnswerCache(max_entries=4, ttl_seconds=None)
+    cache.put("TBMM ne zaman kuruldu?", [1.0, 0.0], ("c1", "c2"), "eski")
+    cache.put("  TBMM ne  zaman kuruldu? ", [1.0, 0.0], ("c1", "c2"), "yeni")
+    assert len(cache.entries) == 1
+    assert cache.lookup([1.0, 0.0], ("c1", "c2")) == "yeni"
+
+    # Kanıt farklıysa ayrı girdi
+    cache.put("TBMM ne zaman kuruldu?", [1.0, 0.0], ("c3",), "başka")
+    assert len(cache.entries) == 2
+    assert cache.evictions == 0
+
+
+if __name__ == "__main__":
+    test_put_replaces_same_question_and_evidence()
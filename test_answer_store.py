@@ -0,0 +1,23 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+
+from answer_store import AnswerStore
+
+
+def test_invalidate_keeps_content_hash_keys():
+    """Sadece indekste olmayan chunk id'lerine dayanan yanıtlar silinir"""
+    with tempfile.TemporaryDirectory() as directory:
+        store = AnswerStore(os.path.join(directory, "answers.db"), compact_interval=0)
+        store.put("soru 1", ["c1", "sha1:abc"], "model", "p", "yanıt 1")
+        store.put("soru 2", ["c2"], "model", "p", "yanıt 2")
+        assert store.invalidate(live_chunk_ids={"c1"}) == 1
+        assert store.get("soru 1", ["c1", "sha1:abc"], "model", "p") == "yanıt 1"
+        assert store.get("soru 2", ["c2"], "model", "p") is None
+        store.close()
+
+
+if __name__ == "__main__":
+    test_invalidate_keeps_content_hash_keys()
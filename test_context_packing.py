@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from langchain.schema import Document
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from context_packing import merge_chunks, pack_context
+from index_manifest import assign_chunk_ids
+
+
+def _chunk(text, index, page=1):
+    return Document(page_content=text, metadata={"page": page, "source": "nutuk.pdf",
+                                                 "chunk_index": index, "chunk_id": f"c{page}-{index}"})
+
+
+def test_short_overlap_is_not_cut():
+    """Ardışık chunk'larda tesadüfi kısa ortak kısım kesilmez, boşlukla birleştirilir"""
+    blocks = merge_chunks([_chunk("Kongre toplandı ve Ankara", 0), _chunk("ayrıca Erzurum da", 1)])
+    assert [block.page_content for block in blocks] == ["Kongre toplandı ve Ankara ayrıca Erzurum da"]
+
+
+def test_splitter_overlap_is_removed_once():
+    """Splitter'ın chunk_overlap'i bir kez yazılır, kelimeler bozulmaz"""
+    lines = [f"Satır {i}: Mustafa Kemal Paşa Samsun'a çıktıktan sonra Anadolu'da kongreler topladı."
+             for i in range(12)]
+    text = "\n".join(lines)
+    splitter = RecursiveCharacterTextSplitter(chunk_size=300, chunk_overlap=50,
+                                              separators=["\n\n", "\n", ".", "!", "?", " ", ""])
+    chunks = assign_chunk_ids(splitter.split_documents([Document(page_content=text, metadata={"page": 1})]))
+    packed = pack_context(chunks[::-1])
+    assert packed.stats["blocks"] == 1
+    words = set(text.split())
+    assert set(packed.text.split(": ", 1)[1].split()) <= words
+    for line in lines:
+        assert line in packed.text
+
+
+if __name__ == "__main__":
+    test_short_overlap_is_not_cut()
+    test_splitter_overlap_is_removed_once()
+    print("✅ Bağlam birleştirme testleri geçti")
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+
+from corpus_ingest import plan_corpus
+from page_text_store import file_sha256
+
+SETTINGS = {"embedding_model": "model", "chunk_size": 300, "chunk_overlap": 50}
+
+
+def _write_pdf(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(content)
+
+
+def _indexed(path):
+    return {"path": path, "sha256": file_sha256(path), "status": "indexed", "settings": SETTINGS}
+
+
+def test_sibling_directory_with_same_prefix_is_not_removed():
+    """"corpus" işlenirken "corpus2" altındaki belgeler silinmeye aday olmaz"""
+    with tempfile.TemporaryDirectory() as root:
+        corpus, corpus2 = os.path.join(root, "corpus"), os.path.join(root, "corpus2")
+        _write_pdf(os.path.join(corpus, "yeni.pdf"), b"yeni")
+        _write_pdf(os.path.join(corpus2, "eski.pdf"), b"eski")
+        documents = {
+            "yeni": _indexed(os.path.join(corpus, "yeni.pdf")),
+            "eski": _indexed(os.path.join(corpus2, "eski.pdf")),
+            "silinen": {"path": os.path.join(corpus, "silinen.pdf"), "status": "indexed"},
+        }
+        to_process, removed = plan_corpus(corpus, documents, SETTINGS)
+        assert to_process == []
+        assert removed == ["silinen"]
+
+
+def test_primary_pdf_is_excluded():
+    """Ana PDF corpus klasöründe olsa da corpus belgesi olarak eklenmez"""
+    with tempfile.TemporaryDirectory() as root:
+        _write_pdf(os.path.join(root, "nutuk.pdf"), b"nutuk")
+        _write_pdf(os.path.join(root, "ekler", "vesika.pdf"), b"vesika")
+        to_process, _ = plan_corpus(root, {}, SETTINGS, exclude=[os.path.join(root, "nutuk.pdf")])
+        assert [job["source_id"] for job in to_process] == ["ekler/vesika"]
+        assert to_process[0]["path"] == os.path.join(root, "ekler", "vesika.pdf")
+
+
+if __name__ == "__main__":
+    test_sibling_directory_with_same_prefix_is_not_removed()
+    test_primary_pdf_is_excluded()
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+
+from embedding_cache import EmbeddingCache
+
+
+def test_hits_do_not_rewrite_index():
+    """İsabetler indeks dosyasını yeniden yazdırmaz; yeni vektörler flush_interval'da bir yazılır"""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = EmbeddingCache("model", directory, flush_interval=3)
+        cache.put(["a", "b"], [[1.0, 0.0], [0.0, 1.0]])
+        cache.maybe_flush()
+        assert not os.path.exists(cache.index_path)
+        cache.put(["c"], [[1.0, 1.0]])
+        cache.maybe_flush()
+        written = os.stat(cache.index_path).st_mtime_ns
+
+        assert cache.get(["a", "c"]) == [[1.0, 0.0], [1.0, 1.0]]
+        assert not cache._dirty
+        cache.flush()
+        assert os.stat(cache.index_path).st_mtime_ns == written
+
+        reloaded = EmbeddingCache("model", directory)
+        assert reloaded.get(["b", "x"]) == [[0.0, 1.0], None]
+
+
+if __name__ == "__main__":
+    test_hits_do_not_rewrite_index()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from langchain.schema import Document
+
+from feature_reranker import rerank
+from inverted_index import InvertedIndex
+from positional_index import PositionalIndex
+from turkish_tokenizer import tokenize, tokenize_query, tokenize_raw
+
+TEXTS = [
+    "Mustafa Kemal Paşa 19 Mayıs 1919'da Samsun'a çıktı ve Anadolu'ya geçti.",
+    "Samsun'a çıktım; oradan Havza ve Amasya'ya gittim.",
+    "Erzurum Kongresi toplandı.",
+    "Sivas Kongresi'nde Heyet-i Temsiliye seçildi, Mustafa Kemal başkan oldu.",
+    "Kısa not.",
+    "Amasya Genelgesi ile milletin istiklalini yine milletin azim ve kararı kurtaracaktır denildi.",
+]
+QUERIES = ["Samsun'a çıktı", "Mustafa Kemal", "Erzurum Kongresi", "Amasya", "milletin azim ve kararı"]
+
+
+def _loop_rerank(query, documents, keyword_index, positional_index):
+    """Doküman başına döngü: tam ifade pozisyonel indeksten (indekste yoksa token dizisinden)"""
+    query_raw = tokenize_raw(query)
+    query_tokens = set(tokenize_query(query))
+    phrase_docs, _ = positional_index.phrase(query_raw)
+    phrase_ids = {positional_index.chunk_ids[int(p)] for p in phrase_docs}
+    scored = []
+    for doc in documents:
+        chunk_id = doc.metadata.get("chunk_id")
+        if chunk_id and keyword_index.position(chunk_id) is not None:
+            exact_match = chunk_id in phrase_ids
+        else:
+            tokens = tokenize_raw(doc.page_content)
+            exact_match = any(tokens[i:i + len(query_raw)] == query_raw for i in range(len(tokens)))
+        score = 10 if exact_match else 0
+        score += 2 * len(query_tokens.intersection(tokenize(doc.page_content)))
+        if len(doc.page_content) < 50:
+            score -= 2
+        scored.append((doc, score))
+    scored.sort(key=lambda item: item[1], reverse=True)
+    return [doc for doc, _ in scored]
+
+
+def test_vectorized_order_matches_loop():
+    """İndeksteki ve indekste olmayan dokümanlar aynı kurallarla, döngüyle aynı sırada"""
+    indexed = TEXTS[:4]
+    chunk_ids = [f"c{i}" for i in range(len(indexed))]
+    keyword_index = InvertedIndex.build(chunk_ids, indexed, [{} for _ in indexed],
+                                        [tokenize(text) for text in indexed])
+    positional_index = PositionalIndex.build(chunk_ids, [tokenize_raw(text) for text in indexed])
+    documents = [Document(page_content=text, metadata={"chunk_id": chunk_id})
+                 for chunk_id, text in zip(chunk_ids, indexed)]
+    # Aynı metinler indeks dışından da gelir (chunk id'siz), artı indekste olmayanlar
+    documents += [Document(page_content=text) for text in TEXTS]
+    for query in QUERIES:
+        expected = _loop_rerank(query, documents, keyword_index, positional_index)
+        assert rerank(query, documents, keyword_index, positional_index) == expected, query
+
+
+def test_phrase_is_not_a_substring_match():
+    """"Samsun'a çıktı", "…çıktım" içeren metinde tam ifade sayılmaz"""
+    keyword_index = InvertedIndex.build(["c0"], [TEXTS[2]], [{}], [tokenize(TEXTS[2])])
+    positional_index = PositionalIndex.build(["c0"], [tokenize_raw(TEXTS[2])])
+    documents = [Document(page_content=TEXTS[1]), Document(page_content=TEXTS[0])]
+    assert rerank("Samsun'a çıktı", documents, keyword_index, positional_index)[0] is documents[1]
+
+
+if __name__ == "__main__":
+    test_vectorized_order_matches_loop()
+    test_phrase_is_not_a_substring_match()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import random
+
+from inverted_index import InvertedIndex
+
+
+def _negative_idf_index():
+    """Sık geçen terimler çoğunlukta: ortalama IDF, dolayısıyla epsilon ile değiştirilen IDF'ler negatif"""
+    rng = random.Random(7)
+    common = [f"ortak{i}" for i in range(12)]
+    rare = [f"nadir{i}" for i in range(3)]
+    tokenized = []
+    for i in range(400):
+        tokens = [term for term in common if rng.random() < 0.9] * rng.randint(1, 3)
+        tokens += [term for term in rare if rng.random() < 0.2] * rng.randint(1, 3)
+        tokenized.append(tokens + ["dolgu"] * rng.randint(0, 40))
+    chunk_ids = [f"c{i}" for i in range(len(tokenized))]
+    return InvertedIndex.build(chunk_ids, [" ".join(tokens) for tokens in tokenized],
+                               [{} for _ in tokenized], tokenized)
+
+
+def test_pruned_matches_exhaustive_with_negative_idf():
+    index = _negative_idf_index()
+    assert index.idf.min() < 0 < index.idf.max()
+    for query in (["nadir0", "ortak1", "ortak2"], ["nadir1", "nadir2", "ortak3"], ["ortak0", "nadir2"]):
+        for k in (1, 5, 20):
+            pruned, _ = index.top_k_pruned(query, k)
+            assert pruned == index.top_k(query, k)
+
+
+if __name__ == "__main__":
+    test_pruned_matches_exhaustive_with_negative_idf()
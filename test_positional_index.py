@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from positional_index import PositionalIndex
+from turkish_tokenizer import tokenize, tokenize_raw
+
+TEXTS = [
+    "Kimse ne zaman toplanacaklarını bilmiyordu.",
+    "Büyük Millet Meclisi 23 Nisan 1920'de Ankara'da açıldı.",
+    "Ne zaman gelecekleri belli değildi.",
+]
+
+
+def _content_phrase(phrase):
+    return len(tokenize(" ".join(phrase))) >= 2
+
+
+def test_stop_word_phrase_is_not_a_match():
+    """Sadece "ne zaman" eşleşen sorguda ifade bulunmaz; yakınlık aramasına düşülür"""
+    index = PositionalIndex.build(["a", "b", "c"], [tokenize_raw(text) for text in TEXTS])
+    query = tokenize_raw("Meclis ne zaman açıldı?")
+    phrase, _, _ = index.longest_phrase(query)
+    assert phrase == ["ne", "zaman"]
+    phrase, docs, _ = index.longest_phrase(query, accept=_content_phrase)
+    assert phrase == [] and len(docs) == 0
+
+
+def test_content_phrase_is_found():
+    index = PositionalIndex.build(["a", "b", "c"], [tokenize_raw(text) for text in TEXTS])
+    phrase, docs, _ = index.longest_phrase(tokenize_raw("23 Nisan 1920 ne zaman"), accept=_content_phrase)
+    assert phrase == ["23", "nisan", "1920"]
+    assert [index.chunk_ids[int(position)] for position in docs] == ["b"]
+
+
+if __name__ == "__main__":
+    test_stop_word_phrase_is_not_a_match()
+    test_content_phrase_is_found()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import os
+import tempfile
+
+from langchain.schema import Document
+
+from streaming_ingest import StreamingIngestor
+
+
+def _chunk(chunk_id, text):
+    return Document(page_content=text, metadata={"chunk_id": chunk_id, "page": 0})
+
+
+def test_torn_log_line_does_not_swallow_resumed_record():
+    """Çökmede yarım kalan satır kesilir; devamda yazılan ilk kayıt okunabilir kalır"""
+    with tempfile.TemporaryDirectory() as directory:
+        log_path = os.path.join(directory, "ingest_tokens.jsonl")
+        ingestor = StreamingIngestor(None, None, {}, os.path.join(directory, "checkpoint.json"),
+                                     token_log_path=log_path, tokenize=str.split)
+        known = {"a", "b", "c"}  # Embedding/Chroma tarafı bu testin konusu değil
+        ingestor._commit([_chunk("a", "Sivas Kongresi")], known)
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write('{"id": "b", "text": "Erzu')  # Çökme: satır sonu yazılmadı
+
+        assert ingestor.repair_log() == len('{"id": "b", "text": "Erzu')
+        ingestor._commit([_chunk("b", "Erzurum Kongresi"), _chunk("c", "Amasya Genelgesi")], known)
+        assert [record["id"] for record in ingestor.iter_log()] == ["a", "b", "c"]
+        assert ingestor.repair_log() == 0
+
+
+if __name__ == "__main__":
+    test_torn_log_line_does_not_swallow_resumed_record()
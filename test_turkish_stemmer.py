@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+from turkish_stemmer import TurkishStemmer
+
+# Kök -> aynı köke inmesi gereken çekimli biçimler (tokenizer'ın katladığı biçimde)
+WORD_FORMS = {
+    "kongre": ["kongre", "kongresi", "kongreye", "kongrede", "kongresinin"],
+    "ankara": ["ankara", "ankaranin", "ankaraya", "ankarada", "ankaradan"],
+    "millet": ["millet", "millete", "milletin", "milletten", "milletler"],
+    "devlet": ["devlet", "devlete", "devletin", "devlette"],
+    "meclis": ["meclis", "meclisi", "meclisin", "meclisine", "mecliste", "meclisler"],
+    "samsun": ["samsun", "samsuna", "samsunun", "samsunda"],
+    "kadin": ["kadin", "kadinin", "kadinlar", "kadinlara"],
+    "ordu": ["ordu", "ordusu", "orduya", "ordunun", "ordular"],
+    "izmir": ["izmir", "izmire", "izmirin", "izmirden"],
+    "sepet": ["sepet", "sepette", "sepetten"],
+}
+
+
+def test_word_forms_share_their_root():
+    """Kelime ve çekimli biçimleri, corpus sözlüğüyle aynı köke iner"""
+    vocabulary = {form for forms in WORD_FORMS.values() for form in forms}
+    stemmer = TurkishStemmer(vocabulary=vocabulary)
+    wrong = {form: stemmer.stem(form) for root, forms in WORD_FORMS.items()
+             for form in forms if stemmer.stem(form) != root}
+    assert wrong == {}
+
+
+def test_rules_do_not_strip_root_letters():
+    """Sözlük olmadan kurallar kökün kendi harflerini ek saymaz"""
+    stemmer = TurkishStemmer()
+    assert stemmer.stem_tokens(["kongre", "kongreye", "kongresinin", "ankara", "ankarada"]) == \
+        ["kongre", "kongre", "kongre", "ankara", "ankara"]
+    # "-te" sadece ötümsüz ünsüzden sonra bulunma ekidir
+    assert stemmer.stem_tokens(["devlete", "millete", "sepette"]) == ["devlete", "millete", "sepet"]
+
+if __name__ == "__main__":
+    test_word_forms_share_their_root()
+    test_rules_do_not_strip_root_letters()
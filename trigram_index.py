@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+BM25 sözlüğü üzerinde karakter trigram indeksi.
+
+Türkçe eklemeli bir dil olduğu için "izmirden", "izmire" ve "izmir" ayrı BM25
+terimleridir. Bu indeks her sorgu token'ını, karakter trigramlarının Dice
+benzerliğine göre sözlükteki yakın terimlere genişletir. Genişletilen terimler
+keyword aramaya düşük ağırlıkla eklenir.
+
+İndeks sözlükten türetildiği için diske yazılmaz; keyword indeksi
+değiştikten sonraki ilk sorguda bellekte yeniden kurulur.
+"""
+
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+
+def trigrams(token: str) -> List[str]:
+    """Kelime sınırlarıyla ('$') doldurulmuş tekil karakter trigramları"""
+    padded = f"${token}$"
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+class TrigramIndex:
+    """
+    Trigram -> terim id posting'leri.
+
+    Args:
+        terms: BM25 sözlüğündeki terimler (InvertedIndex.terms ile aynı sıra).
+    """
+
+    def __init__(self, terms: Sequence[str]):
+        self.terms = list(terms)
+        gram_to_id: Dict[str, int] = {}
+        gram_ids = []
+        term_ids = []
+        gram_counts = np.zeros(len(self.terms), dtype=np.int32)
+        for term_id, term in enumerate(self.terms):
+            grams = trigrams(term)
+            gram_counts[term_id] = len(grams)
+            for gram in grams:
+                gram_id = gram_to_id.get(gram)
+                if gram_id is None:
+                    gram_id = gram_to_id[gram] = len(gram_to_id)
+                gram_ids.append(gram_id)
+                term_ids.append(term_id)
+
+        gram_ids = np.array(gram_ids, dtype=np.int64)
+        order = np.argsort(gram_ids, kind="stable")
+        self.gram_to_id = gram_to_id
+        self.postings = np.array(term_ids, dtype=np.int32)[order]
+        self.offsets = np.zeros(len(gram_to_id) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(gram_ids, minlength=len(gram_to_id)), out=self.offsets[1:])
+        self.gram_counts = gram_counts
+
+    def expand(self, token: str, limit: int, min_similarity: float = 0.5) -> List[Tuple[str, float]]:
+        """
+        Token'a en benzer sözlük terimleri (token'ın kendisi hariç).
+
+        Args:
+            token: Normalize edilmiş sorgu token'ı.
+            limit: En fazla kaç terim döneceği.
+            min_similarity: En düşük Dice benzerliği (0-1).
+
+        Returns:
+            Benzerliğe göre azalan (terim, benzerlik) listesi.
+        """
+        if limit <= 0 or not self.terms:
+            return []
+        grams = trigrams(token)
+        parts = []
+        for gram in grams:
+            gram_id = self.gram_to_id.get(gram)
+            if gram_id is not None:
+                parts.append(self.postings[self.offsets[gram_id]:self.offsets[gram_id + 1]])
+        if not parts:
+            return []
+        candidates, shared = np.unique(np.concatenate(parts), return_counts=True)
+        similarity = 2.0 * shared / (len(grams) + self.gram_counts[candidates])
+        keep = similarity >= min_similarity
+        candidates, similarity = candidates[keep], similarity[keep]
+
+        order = np.lexsort((candidates, -similarity))
+        expansions = []
+        for i in order:
+            term = self.terms[int(candidates[i])]
+            if term != token:
+                expansions.append((term, float(similarity[i])))
+                if len(expansions) == limit:
+                    break
+        return expansions
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+BM25 için kural tabanlı Türkçe ek ayıklayıcı (stemmer).
+
+Token'lar turkish_tokenizer tarafından küçük harfe çevrilmiş ve ASCII'ye
+katlanmış olarak gelir ("izmirden", "meclisine"). Sondan başa doğru hal,
+iyelik ve çoğul eklerinden en uzun eşleşen, kök en az `min_stem` harf kalacak
+şekilde birer kez soyulur. Tam bir morfolojik çözümleyici değildir; amaç aynı
+kelimenin çekimli biçimlerini tek bir BM25 terimine toplamaktır.
+
+Kurallar tek başına "ankara"nın sonundaki "a"nın kök mü yönelme eki mi
+olduğunu bilemez ("samsun" / "samsun-un" de öyle). Bu yüzden bir sözlük
+(corpus'taki yüzey biçimleri) verilirse, soyulan köklerden sadece sözlükte
+geçenler kabul edilir: "ankaraya" -> "ankara", ama "ankara" -> "ankar" olmaz.
+
+Her yüzey biçimi bir kez köklenir; sonuçlar lemma tablosunda saklanır.
+"""
+
+from typing import Container, Dict, Iterable, List, Optional, Set
+
+# Katlanmış (ç->c, ı->i, ...) biçimde ek grupları; kelimenin sonundan başa
+# doğru hal, iyelik ve çoğul ekleri sırayla, her gruptan en fazla bir tane soyulur
+CASE_SUFFIXES = (
+    "ndaki", "ndeki", "daki", "deki", "taki", "teki",
+    "ndan", "nden", "dan", "den", "tan", "ten",
+    "nda", "nde", "da", "de", "ta", "te",
+    "nin", "nun", "in", "un", "na", "ne",
+    "yla", "yle", "ya", "ye", "yi", "yu",
+    "a", "e", "i", "u",
+)
+POSSESSIVE_SUFFIXES = ("imiz", "umuz", "iniz", "unuz", "lari", "leri", "im", "um", "si", "su", "i", "u")
+# Hal ekinden önce kaynaştırma ünsüzü (n/y) olmadan gelebilen iyelik ekleri (1. ve 2. kişi):
+# "evimde" olur, ama 3. kişi iyelikten sonra hal eki "meclisinde" gibi n ile gelir
+NON_THIRD_PERSON_POSSESSIVES = frozenset(("imiz", "umuz", "iniz", "unuz", "im", "um"))
+PLURAL_SUFFIXES = ("lar", "ler")
+SUFFIX_GROUPS = tuple(
+    tuple(sorted(group, key=lambda suffix: (-len(suffix), suffix)))
+    for group in (CASE_SUFFIXES, POSSESSIVE_SUFFIXES, PLURAL_SUFFIXES)
+)
+
+_VOWELS = frozenset("aeiou")
+# Katlanmış ötümsüz ünsüzler (ç -> c, ş -> s); "-te/-ta" sadece bunlardan sonra gelir
+_VOICELESS = frozenset("cfhkpst")
+
+
+class TurkishStemmer:
+    """
+    Lemma tablolu ek ayıklayıcı.
+
+    Args:
+        min_stem: Kökte kalması gereken en az harf sayısı (tek ünlülük ekler
+            için bir fazlası gerekir: "ordu" -> "ord" olmaz).
+        vocabulary: Corpus'taki yüzey biçimleri (ör. keyword indeksinin
+            terimleri). Verilirse soyulan kök ancak sözlükte geçiyorsa kabul
+            edilir; None ise sadece kurallar uygulanır.
+    """
+
+    def __init__(self, min_stem: int = 3, vocabulary: Optional[Container[str]] = None):
+        self.min_stem = min_stem
+        self.vocabulary = vocabulary
+        self.lemmas: Dict[str, str] = {}  # yüzey biçimi -> kök
+        self.hits = 0
+        self.misses = 0
+
+    def _matches(self, token: str, group, allowed=None, bare_vowels: bool = True) -> List[str]:
+        """Gruptaki, kökü yeterince uzun bırakan ekler, en uzundan başlayarak"""
+        matches = []
+        for suffix in group:
+            if not token.endswith(suffix) or (allowed is not None and suffix not in allowed):
+                continue
+            stem = token[:-len(suffix)]
+            if suffix in _VOWELS:
+                if not bare_vowels:
+                    continue
+                # Tek ünlülük ek sadece ünsüzden sonra gelir; ünlüden sonra "-ye", "-yi", "-si" olur
+                if len(stem) < self.min_stem + 1 or stem[-1] in _VOWELS:
+                    continue
+            elif len(stem) < self.min_stem:
+                continue
+            if suffix[0] == "t" and stem[-1] not in _VOICELESS:
+                # "devlete" = "devlet" + "e"; "-te" bulunma eki değil
+                continue
+            matches.append(suffix)
+        return matches
+
+    def _match(self, token: str, group, allowed=None) -> str:
+        """Gruptaki en uzun uygun ek ('' yoksa); tek ünlülük ekler hariç"""
+        matches = self._matches(token, group, allowed, bare_vowels=False)
+        return matches[0] if matches else ""
+
+    @staticmethod
+    def _possessives_after(case: str):
+        # "meclisi"nden "i" hal eki soyulduysa "meclis"in "si"si iyelik değildir
+        return None if not case or case[0] in "ny" else NON_THIRD_PERSON_POSSESSIVES
+
+    def _rule_stem(self, token: str) -> str:
+        """
+        Sadece kurallarla: her gruptan en uzun ek.
+
+        Sözlük olmadan "kongre"nin "e"si kök mü ek mi bilinemez; tek ünlülük
+        ekler hiç soyulmaz ("kongreye" -> "kongre", ama "millete" olduğu gibi kalır).
+        """
+        case_group, possessive_group, plural_group = SUFFIX_GROUPS
+        case = self._match(token, case_group)
+        if case:
+            token = token[:-len(case)]
+        for group, allowed in ((possessive_group, self._possessives_after(case)), (plural_group, None)):
+            suffix = self._match(token, group, allowed)
+            if suffix:
+                token = token[:-len(suffix)]
+        return token
+
+    def _candidate_stems(self, token: str) -> Set[str]:
+        """
+        Kuralların izin verdiği tüm soyma yollarındaki kökler.
+
+        "samsuna" hem "samsu" + "na" hem "samsun" + "a" olarak okunabilir;
+        hangisinin doğru olduğuna sözlük karar verir.
+        """
+        case_group, possessive_group, plural_group = SUFFIX_GROUPS
+        stems = set()
+        for case in self._matches(token, case_group) + [""]:
+            base = token[:-len(case)] if case else token
+            for possessive in self._matches(base, possessive_group, self._possessives_after(case)) + [""]:
+                stem = base[:-len(possessive)] if possessive else base
+                for plural in self._matches(stem, plural_group) + [""]:
+                    stems.add(stem[:-len(plural)] if plural else stem)
+        stems.discard(token)
+        return stems
+
+    def _strip(self, token: str) -> str:
+        if self.vocabulary is None:
+            return self._rule_stem(token)
+        attested = [stem for stem in self._candidate_stems(token) if stem in self.vocabulary]
+        # Sözlükte geçen en kısa kök; hiçbiri geçmiyorsa token olduğu gibi kalır
+        return min(attested, key=lambda stem: (len(stem), stem)) if attested else token
+
+    def stem(self, token: str) -> str:
+        """Token'ın kökü (lemma tablosundan veya kurallarla)"""
+        lemma = self.lemmas.get(token)
+        if lemma is None:
+            lemma = self.lemmas[token] = self._strip(token)
+            self.misses += 1
+        else:
+            self.hits += 1
+        return lemma
+
+    def stem_tokens(self, tokens: Iterable[str]) -> List[str]:
+        stem = self.stem
+        return [stem(token) for token in tokens]
+
+    def stem_batch(self, tokenized_texts: Iterable[Iterable[str]]) -> List[List[str]]:
+        """Tokenize edilmiş metin listesini köklere çevirir"""
+        return [self.stem_tokens(tokens) for tokens in tokenized_texts]
+
+    def stats(self) -> dict:
+        return {"lemmas": len(self.lemmas), "hits": self.hits, "misses": self.misses}
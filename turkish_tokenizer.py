@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+BM25 indeksi ve reranking için Türkçe tokenizer.
+
+Çıktısı ImprovedNutukRAGSystem'in eski `_tokenize_turkish` metoduyla birebir
+aynıdır (mevcut indeksler geçerli kalır), ancak:
+
+- Türkçe karakterler tek bir çeviri tablosuyla normalize edilir,
+- regex'ler modül yüklenirken derlenir,
+- stop-word kümesi modül seviyesinde donmuş bir kümedir,
+- tekrar eden sorgu metinleri sınırlı bir önbellekten döner.
+"""
+
+import re
+from functools import lru_cache
+from typing import Iterable, List, Tuple
+
+# Küçük harfe çevrildikten sonra uygulanan Türkçe karakter normalizasyonu
+_TURKISH_TABLE = str.maketrans("çğıöşü", "cgiosu")
+
+# Harf/rakam dışındaki her karakter ayırıcıdır; kalan harf-rakam dizileri token olur
+_TOKEN_PATTERN = re.compile(r"[a-zA-Z0-9]+")
+
+# Temel Türkçe stop words (eski tokenizer ile aynı küme)
+STOP_WORDS = frozenset({
+    've', 'bir', 'bu', 'o', 'şu', 'de', 'da', 'den', 'dan', 'ile', 'için',
+    'ne', 'ki', 'ya', 'yada', 'veya', 'ama', 'fakat', 'ancak', 'lakin',
+    'gibi', 'kadar', 'sonra', 'önce', 'üzere', 'doğru', 'karşı', 'rağmen'
+})
+
+QUERY_CACHE_SIZE = 4096
+
+
+def tokenize(text: str) -> List[str]:
+    """Türkçe metni küçük harfli, normalize edilmiş token'lara ayırır"""
+    normalized = text.lower().translate(_TURKISH_TABLE)
+    return [token for token in _TOKEN_PATTERN.findall(normalized)
+            if len(token) > 2 and token not in STOP_WORDS]
+
+
+def tokenize_batch(texts: Iterable[str]) -> List[List[str]]:
+    """Birden fazla metni tokenize eder (indeksleme için)"""
+    table, findall, stop_words = _TURKISH_TABLE, _TOKEN_PATTERN.findall, STOP_WORDS
+    return [
+        [token for token in findall(text.lower().translate(table))
+         if len(token) > 2 and token not in stop_words]
+        for text in texts
+    ]
+
+
+def tokenize_raw(text: str) -> List[str]:
+    """Stop-word ve uzunluk filtresi uygulanmamış token akışı (ifade araması için)"""
+    return _TOKEN_PATTERN.findall(text.lower().translate(_TURKISH_TABLE))
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def tokenize_query(query: str) -> Tuple[str, ...]:
+    """Sorgu token'ları; aynı sorgu metni tekrar tokenize edilmez"""
+    return tuple(tokenize(query))
+
+
+def query_cache_info():
+    """Sorgu önbelleğinin isabet/ıska istatistikleri"""
+    return tokenize_query.cache_info()